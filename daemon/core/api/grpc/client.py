@@ -431,6 +431,39 @@ class CoreGrpcClient:
         )
         return self.stub.AddSessionServer(request)
 
+    def get_session_profile(self, session_id: int) -> core_pb2.GetSessionProfileResponse:
+        """
+        Retrieve timings recorded during session instantiation.
+
+        :param session_id: id of session
+        :return: response with timing stats and slowest timings for each category
+        :raises grpc.RpcError: when session doesn't exist
+        """
+        request = core_pb2.GetSessionProfileRequest(session_id=session_id)
+        return self.stub.GetSessionProfile(request)
+
+    def partition_session(
+        self,
+        session_id: int,
+        nodes: List[core_pb2.Node] = None,
+        links: List[core_pb2.Link] = None,
+    ) -> core_pb2.PartitionSessionResponse:
+        """
+        Propose an assignment of nodes to session distributed servers, balancing
+        node weight while minimizing links between servers.
+
+        :param session_id: id of session
+        :param nodes: nodes to partition, defaults to the current session nodes
+        :param links: links between provided nodes
+        :return: response with server names by node id, "" for the local host, and
+            the number of links between servers
+        :raises grpc.RpcError: when session doesn't exist
+        """
+        request = core_pb2.PartitionSessionRequest(
+            session_id=session_id, nodes=nodes, links=links
+        )
+        return self.stub.PartitionSession(request)
+
     def events(
         self,
         session_id: int,
@@ -451,18 +484,52 @@ class CoreGrpcClient:
         start_streamer(stream, handler)
         return stream
 
+    def batch_events(
+        self,
+        session_id: int,
+        handler: Callable[[core_pb2.Event], None],
+        events: List[core_pb2.Event] = None,
+        max_events: int = 0,
+    ) -> Any:
+        """
+        Listen for session events, received in batches.
+
+        :param session_id: id of session
+        :param handler: handler for received events
+        :param events: events to listen to, defaults to all
+        :param max_events: max events per batch, 0 for the server default
+        :return: stream processing events, can be used to cancel stream
+        :raises grpc.RpcError: when session doesn't exist
+        """
+
+        def handle_batch(batch: core_pb2.EventBatch) -> None:
+            for data in batch.events:
+                handler(core_pb2.Event.FromString(data))
+
+        request = core_pb2.BatchEventsRequest(
+            session_id=session_id, events=events, max_events=max_events
+        )
+        stream = self.stub.BatchEvents(request)
+        start_streamer(stream, handle_batch)
+        return stream
+
     def throughputs(
-        self, session_id: int, handler: Callable[[core_pb2.ThroughputsEvent], None]
+        self,
+        session_id: int,
+        handler: Callable[[core_pb2.ThroughputsEvent], None],
+        interval: float = 0,
     ) -> Any:
         """
         Listen for throughput events with information for interfaces and bridges.
 
         :param session_id: session id
         :param handler: handler for every event
+        :param interval: time in seconds between events, at least 0.1, 0 for the
+            server default
         :return: stream processing events, can be used to cancel stream
         :raises grpc.RpcError: when session doesn't exist
         """
-        request = core_pb2.ThroughputsRequest(session_id=session_id)
+        request = core_pb2.ThroughputsRequest(session_id=session_id, interval=interval)
         stream = self.stub.Throughputs(request)
         start_streamer(stream, handler)
         return stream
@@ -536,6 +603,23 @@ class CoreGrpcClient:
         """
         return self.stub.MoveNodes(move_iterator)
 
+    def batch_move_nodes(
+        self, session_id: int, moves: List[core_pb2.NodeMove], source: str = None
+    ) -> core_pb2.BatchMoveNodesResponse:
+        """
+        Move a batch of nodes at once, updating ranges once for the batch.
+
+        :param session_id: session id
+        :param moves: node moves, the last move for a node is used
+        :param source: source of moves
+        :return: response with ids of nodes that moved
+        :raises grpc.RpcError: when session or nodes do not exist
+        """
+        request = core_pb2.BatchMoveNodesRequest(
+            session_id=session_id, moves=moves, source=source
+        )
+        return self.stub.BatchMoveNodes(request)
+
     def delete_node(self, session_id: int, node_id: int) -> core_pb2.DeleteNodeResponse:
         """
         Delete node from session.
@@ -1,6 +1,8 @@
 import logging
-from queue import Empty, Queue
-from typing import Iterable
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set
 
 from core.api.grpc import core_pb2
 from core.api.grpc.grpcutils import convert_link
@@ -12,8 +14,19 @@ from core.emulator.data import (
     LinkData,
     NodeData,
 )
+from core.emulator.enumerations import MessageFlags
 from core.emulator.session import Session
 
+DEFAULT_MAX_EVENTS: int = 1000
+SESSION_HANDLERS: Dict[int, str] = {
+    core_pb2.EventType.NODE: "node_handlers",
+    core_pb2.EventType.LINK: "link_handlers",
+    core_pb2.EventType.CONFIG: "config_handlers",
+    core_pb2.EventType.FILE: "file_handlers",
+    core_pb2.EventType.EXCEPTION: "exception_handlers",
+    core_pb2.EventType.SESSION: "event_handlers",
+}
+
 
 def handle_node_event(event: NodeData) -> core_pb2.NodeEvent:
     """
@@ -126,87 +139,274 @@ def handle_file_event(event: FileData) -> core_pb2.FileEvent:
     )
 
 
+def get_event_type(data: Any) -> Optional[int]:
+    """
+    Determine the grpc event type for session event data.
+
+    :param data: session event data
+    :return: grpc event type, None for unknown data
+    """
+    if isinstance(data, NodeData):
+        return core_pb2.EventType.NODE
+    elif isinstance(data, LinkData):
+        return core_pb2.EventType.LINK
+    elif isinstance(data, EventData):
+        return core_pb2.EventType.SESSION
+    elif isinstance(data, ConfigData):
+        return core_pb2.EventType.CONFIG
+    elif isinstance(data, ExceptionData):
+        return core_pb2.EventType.EXCEPTION
+    elif isinstance(data, FileData):
+        return core_pb2.EventType.FILE
+    else:
+        return None
+
+
+def convert_event(session_id: int, data: Any) -> Optional[core_pb2.Event]:
+    """
+    Convert session event data to a grpc event.
+
+    :param session_id: id of session event is from
+    :param data: session event data
+    :return: grpc event, None for unknown data
+    """
+    event = core_pb2.Event(session_id=session_id)
+    if isinstance(data, NodeData):
+        event.node_event.CopyFrom(handle_node_event(data))
+    elif isinstance(data, LinkData):
+        event.link_event.CopyFrom(handle_link_event(data))
+    elif isinstance(data, EventData):
+        event.session_event.CopyFrom(handle_session_event(data))
+    elif isinstance(data, ConfigData):
+        event.config_event.CopyFrom(handle_config_event(data))
+    elif isinstance(data, ExceptionData):
+        event.exception_event.CopyFrom(handle_exception_event(data))
+    elif isinstance(data, FileData):
+        event.file_event.CopyFrom(handle_file_event(data))
+    else:
+        logging.error("unknown event: %s", data)
+        event = None
+    return event
+
+
+class BrokerEvent:
+    """
+    A converted session event shared by all subscribers, serialized at most once.
+    """
+
+    def __init__(
+        self,
+        event_type: int,
+        event: core_pb2.Event,
+        key: Optional[int] = None,
+        coalesce: bool = True,
+    ) -> None:
+        """
+        Create a BrokerEvent instance.
+
+        :param event_type: grpc event type
+        :param event: grpc event
+        :param key: key for events that must stay ordered with other events
+            using the same key
+        :param coalesce: True if event may be superseded by later events with
+            the same key, False if it must be delivered
+        """
+        self.event_type: int = event_type
+        self.event: core_pb2.Event = event
+        self.key: Optional[int] = key
+        self.coalesce: bool = coalesce
+        self._data: Optional[bytes] = None
+
+    @property
+    def data(self) -> bytes:
+        """
+        Serialized grpc event.
+
+        :return: serialized event
+        """
+        if self._data is None:
+            self._data = self.event.SerializeToString()
+        return self._data
+
+
 class EventStreamer:
     """
-    Processes session events to generate grpc events.
+    Bounded queue of broker events for a single grpc stream. Pending node updates
+    are replaced by newer updates for the same node, unless other events for the
+    node were queued after them, and the oldest events are dropped when the queue
+    is full.
     """
 
     def __init__(
-        self, session: Session, event_types: Iterable[core_pb2.EventType]
+        self, event_types: Iterable[int], maxsize: int = DEFAULT_MAX_EVENTS
     ) -> None:
         """
         Create a EventStreamer instance.
 
-        :param session: session to process events for
         :param event_types: types of events to process
+        :param maxsize: max number of events to queue
         """
-        self.session = session
-        self.event_types = event_types
-        self.queue = Queue()
-        self.add_handlers()
+        self.event_types: Set[int] = set(event_types)
+        self.maxsize: int = maxsize
+        self.condition: threading.Condition = threading.Condition()
+        self.events: Deque[List[BrokerEvent]] = deque()
+        self.pending: Dict[int, List[BrokerEvent]] = {}
+        self.dropped: int = 0
+        self.coalesced: int = 0
 
-    def add_handlers(self) -> None:
+    def _pop(self) -> BrokerEvent:
+        holder = self.events.popleft()
+        event = holder[0]
+        if event.key is not None and self.pending.get(event.key) is holder:
+            self.pending.pop(event.key)
+        return event
+
+    def put(self, event: BrokerEvent) -> None:
         """
-        Add a session event handler for desired event types.
+        Queue an event for this stream.
 
+        :param event: event to queue
         :return: nothing
         """
-        if core_pb2.EventType.NODE in self.event_types:
-            self.session.node_handlers.append(self.queue.put)
-        if core_pb2.EventType.LINK in self.event_types:
-            self.session.link_handlers.append(self.queue.put)
-        if core_pb2.EventType.CONFIG in self.event_types:
-            self.session.config_handlers.append(self.queue.put)
-        if core_pb2.EventType.FILE in self.event_types:
-            self.session.file_handlers.append(self.queue.put)
-        if core_pb2.EventType.EXCEPTION in self.event_types:
-            self.session.exception_handlers.append(self.queue.put)
-        if core_pb2.EventType.SESSION in self.event_types:
-            self.session.event_handlers.append(self.queue.put)
-
-    def process(self) -> core_pb2.Event:
+        with self.condition:
+            if event.key is not None:
+                if event.coalesce:
+                    holder = self.pending.get(event.key)
+                    if holder is not None:
+                        holder[0] = event
+                        self.coalesced += 1
+                        return
+                else:
+                    # later events must not be moved ahead of this event
+                    self.pending.pop(event.key, None)
+            if len(self.events) >= self.maxsize:
+                self._pop()
+                self.dropped += 1
+            holder = [event]
+            self.events.append(holder)
+            if event.key is not None and event.coalesce:
+                self.pending[event.key] = holder
+            self.condition.notify()
+
+    def get(self, max_events: int = 1, timeout: float = 1) -> List[BrokerEvent]:
+        """
+        Retrieve queued events, waiting for at least one event.
+
+        :param max_events: max number of events to retrieve
+        :param timeout: time in seconds to wait for an event
+        :return: queued events, empty on timeout
+        """
+        with self.condition:
+            end = time.monotonic() + timeout
+            while not self.events:
+                remaining = end - time.monotonic()
+                if remaining <= 0:
+                    return []
+                self.condition.wait(remaining)
+            events = []
+            while self.events and len(events) < max_events:
+                events.append(self._pop())
+            return events
+
+    def process(self) -> Optional[core_pb2.Event]:
         """
         Process the next event in the queue.
 
-        :return: grpc event, or None when invalid event or queue timeout
-        """
-        event = core_pb2.Event(session_id=self.session.id)
-        try:
-            data = self.queue.get(timeout=1)
-            if isinstance(data, NodeData):
-                event.node_event.CopyFrom(handle_node_event(data))
-            elif isinstance(data, LinkData):
-                event.link_event.CopyFrom(handle_link_event(data))
-            elif isinstance(data, EventData):
-                event.session_event.CopyFrom(handle_session_event(data))
-            elif isinstance(data, ConfigData):
-                event.config_event.CopyFrom(handle_config_event(data))
-            elif isinstance(data, ExceptionData):
-                event.exception_event.CopyFrom(handle_exception_event(data))
-            elif isinstance(data, FileData):
-                event.file_event.CopyFrom(handle_file_event(data))
-            else:
-                logging.error("unknown event: %s", data)
-                event = None
-        except Empty:
-            event = None
-        return event
+        :return: grpc event, or None on queue timeout
+        """
+        events = self.get()
+        if events:
+            return events[0].event
+        return None
+
+
+class EventBroker:
+    """
+    Processes session events to generate grpc events once, for all streams.
+    """
+
+    def __init__(self, session: Session) -> None:
+        """
+        Create a EventBroker instance.
+
+        :param session: session to process events for
+        """
+        self.session: Session = session
+        self.lock: threading.Lock = threading.Lock()
+        self.streamers: List[EventStreamer] = []
+
+    def subscribe(
+        self, event_types: Iterable[int], maxsize: int = DEFAULT_MAX_EVENTS
+    ) -> EventStreamer:
+        """
+        Create a stream for desired event types, adding session event handlers
+        when needed.
+
+        :param event_types: types of events to process
+        :param maxsize: max number of events to queue for stream
+        :return: event streamer
+        """
+        streamer = EventStreamer(event_types, maxsize)
+        with self.lock:
+            if not self.streamers:
+                self.add_handlers()
+            self.streamers.append(streamer)
+        return streamer
+
+    def unsubscribe(self, streamer: EventStreamer) -> bool:
+        """
+        Remove a stream, removing session event handlers when no streams remain.
+
+        :param streamer: event streamer to remove
+        :return: True if there are no remaining streams, False otherwise
+        """
+        with self.lock:
+            if streamer in self.streamers:
+                self.streamers.remove(streamer)
+                if not self.streamers:
+                    self.remove_handlers()
+            return not self.streamers
+
+    def add_handlers(self) -> None:
+        """
+        Add session event handlers for all event types.
+
+        :return: nothing
+        """
+        for name in SESSION_HANDLERS.values():
+            getattr(self.session, name).append(self.handle)
 
     def remove_handlers(self) -> None:
         """
-        Remove session event handlers for events being watched.
+        Remove session event handlers for all event types.
+
+        :return: nothing
+        """
+        for name in SESSION_HANDLERS.values():
+            handlers = getattr(self.session, name)
+            if self.handle in handlers:
+                handlers.remove(self.handle)
+
+    def handle(self, data: Any) -> None:
+        """
+        Convert session event data once and provide it to interested streams.
 
+        :param data: session event data
         :return: nothing
         """
-        if core_pb2.EventType.NODE in self.event_types:
-            self.session.node_handlers.remove(self.queue.put)
-        if core_pb2.EventType.LINK in self.event_types:
-            self.session.link_handlers.remove(self.queue.put)
-        if core_pb2.EventType.CONFIG in self.event_types:
-            self.session.config_handlers.remove(self.queue.put)
-        if core_pb2.EventType.FILE in self.event_types:
-            self.session.file_handlers.remove(self.queue.put)
-        if core_pb2.EventType.EXCEPTION in self.event_types:
-            self.session.exception_handlers.remove(self.queue.put)
-        if core_pb2.EventType.SESSION in self.event_types:
-            self.session.event_handlers.remove(self.queue.put)
+        event_type = get_event_type(data)
+        with self.lock:
+            streamers = [x for x in self.streamers if event_type in x.event_types]
+        if not streamers:
+            return
+        event = convert_event(self.session.id, data)
+        if event is None:
+            return
+        key = None
+        coalesce = True
+        if event_type == core_pb2.EventType.NODE:
+            key = data.id
+            coalesce = data.message_type in (None, MessageFlags.NONE)
+        broker_event = BrokerEvent(event_type, event, key, coalesce)
+        for streamer in streamers:
+            streamer.put(broker_event)
@@ -1,12 +1,9 @@
-import logging
-import time
 from typing import Any, Dict, List, Tuple, Type
 
 import grpc
 import netaddr
 from grpc import ServicerContext
 
-from core import utils
 from core.api.grpc import common_pb2, core_pb2
 from core.api.grpc.services_pb2 import NodeServiceData, ServiceConfig
 from core.config import ConfigurableOptions
@@ -14,6 +11,8 @@ from core.emane.nodes import EmaneNet
 from core.emulator.data import LinkData
 from core.emulator.emudata import InterfaceData, LinkOptions, NodeOptions
 from core.emulator.enumerations import LinkTypes, NodeTypes
+from core.emulator.executor import LINK_STAGE, NODE_STAGE
+from core.emulator.partition import PartitionGraph, partition_weight
 from core.emulator.session import Session
 from core.nodes.base import CoreNode, NodeBase
 from core.nodes.interface import CoreInterface
@@ -122,13 +121,41 @@ def create_nodes(
         _class = session.get_node_class(_type)
         args = (_class, _id, options)
         funcs.append((session.add_node, args, {}))
-    start = time.monotonic()
-    results, exceptions = utils.threadpool(funcs)
-    total = time.monotonic() - start
-    logging.debug("grpc created nodes time: %s", total)
+    results, exceptions = session.executor.run(NODE_STAGE, funcs)
     return results, exceptions
 
 
+def partition_graph(
+    session: Session, node_protos: List[core_pb2.Node], link_protos: List[core_pb2.Link]
+) -> PartitionGraph:
+    """
+    Create a partition graph from node and link proto messages. Nodes with a
+    server provided, or that cannot be moved, are pinned to their server.
+
+    :param session: session nodes will be created in
+    :param node_protos: node proto messages
+    :param link_protos: link proto messages
+    :return: partition graph
+    """
+    graph = PartitionGraph()
+    for node_proto in node_protos:
+        _class = session.get_node_class(NodeTypes(node_proto.type))
+        services = node_proto.services
+        if not services:
+            services = session.services.default_services.get(node_proto.model, [])
+        services = len(services) + len(node_proto.config_services)
+        weight = partition_weight(_class, services)
+        if weight is None:
+            graph.add_node(node_proto.id, 0, node_proto.server)
+        elif node_proto.server:
+            graph.add_node(node_proto.id, weight, node_proto.server)
+        else:
+            graph.add_node(node_proto.id, weight)
+    for link_proto in link_protos:
+        graph.add_link(link_proto.node_one_id, link_proto.node_two_id)
+    return graph
+
+
 def create_links(
     session: Session, link_protos: List[core_pb2.Link]
 ) -> Tuple[List[NodeBase], List[Exception]]:
@@ -146,10 +173,7 @@ def create_links(
         interface_one, interface_two, options = add_link_data(link_proto)
         args = (node_one_id, node_two_id, interface_one, interface_two, options)
         funcs.append((session.add_link, args, {}))
-    start = time.monotonic()
-    results, exceptions = utils.threadpool(funcs)
-    total = time.monotonic() - start
-    logging.debug("grpc created links time: %s", total)
+    results, exceptions = session.executor.run(LINK_STAGE, funcs)
     return results, exceptions
 
 
@@ -170,13 +194,25 @@ def edit_links(
         interface_one, interface_two, options = add_link_data(link_proto)
         args = (node_one_id, node_two_id, interface_one.id, interface_two.id, options)
         funcs.append((session.update_link, args, {}))
-    start = time.monotonic()
-    results, exceptions = utils.threadpool(funcs)
-    total = time.monotonic() - start
-    logging.debug("grpc edit links time: %s", total)
+    results, exceptions = session.executor.run(LINK_STAGE, funcs)
     return results, exceptions
 
 
+def get_profile(session: Session) -> Dict[str, core_pb2.ProfileCategory]:
+    """
+    Convert session profile timings to protobuf categories.
+
+    :param session: session to get profile for
+    :return: dict of category name to protobuf category
+    """
+    profile = {}
+    for name, category in session.get_profile().items():
+        stats = core_pb2.ProfileTiming(**category["stats"])
+        slowest = [core_pb2.ProfileTiming(**x) for x in category["slowest"]]
+        profile[name] = core_pb2.ProfileCategory(stats=stats, slowest=slowest)
+    return profile
+
+
 def convert_value(value: Any) -> str:
     """
     Convert value into string.
@@ -362,27 +398,6 @@ def convert_link(link_data: LinkData) -> core_pb2.Link:
     )
 
 
-def get_net_stats() -> Dict[str, Dict]:
-    """
-    Retrieve status about the current interfaces in the system
-
-    :return: send and receive status of the interfaces in the system
-    """
-    with open("/proc/net/dev", "r") as f:
-        data = f.readlines()[2:]
-
-    stats = {}
-    for line in data:
-        line = line.strip()
-        if not line:
-            continue
-        line = line.split()
-        line[0] = line[0].strip(":")
-        stats[line[0]] = {"rx": float(line[1]), "tx": float(line[9])}
-
-    return stats
-
-
 def session_location(session: Session, location: core_pb2.SessionLocation) -> None:
     """
     Set session location based on location proto.
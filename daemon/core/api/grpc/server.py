@@ -1,12 +1,12 @@
 import atexit
 import logging
 import os
-import re
 import tempfile
 import threading
 import time
 from concurrent import futures
-from typing import Iterable, Type
+from queue import Empty, Queue
+from typing import Iterable, Tuple, Type
 
 import grpc
 from grpc import ServicerContext
@@ -56,12 +56,11 @@ from core.api.grpc.emane_pb2 import (
     SetEmaneModelConfigRequest,
     SetEmaneModelConfigResponse,
 )
-from core.api.grpc.events import EventStreamer
+from core.api.grpc.events import EventBroker, EventStreamer
 from core.api.grpc.grpcutils import (
     get_config_options,
     get_emane_model_id,
     get_links,
-    get_net_stats,
 )
 from core.api.grpc.mobility_pb2 import (
     GetMobilityConfigRequest,
@@ -97,6 +96,7 @@ from core.api.grpc.services_pb2 import (
     SetServiceDefaultsRequest,
     SetServiceDefaultsResponse,
 )
+from core.api.grpc.throughputs import ThroughputSampler
 from core.api.grpc.wlan_pb2 import (
     GetWlanConfigRequest,
     GetWlanConfigResponse,
@@ -107,6 +107,7 @@ from core.api.grpc.wlan_pb2 import (
     WlanLinkRequest,
     WlanLinkResponse,
 )
+from core.emulator import partition
 from core.emulator.coreemu import CoreEmu
 from core.emulator.data import LinkData
 from core.emulator.emudata import LinkOptions, NodeOptions
@@ -119,7 +120,9 @@ from core.nodes.network import WlanNode
 from core.services.coreservices import ServiceManager
 
 _ONE_DAY_IN_SECONDS = 60 * 60 * 24
-_INTERFACE_REGEX = re.compile(r"veth(?P<node>[0-9a-fA-F]+)")
+_THROUGHPUT_INTERVAL = 3.0
+_THROUGHPUT_MIN_INTERVAL = 0.1
+_BATCH_MAX_EVENTS = 100
 
 
 class CoreGrpcServer(core_pb2_grpc.CoreApiServicer):
@@ -134,6 +137,10 @@ class CoreGrpcServer(core_pb2_grpc.CoreApiServicer):
         self.coreemu = coreemu
         self.running = True
         self.server = None
+        self.samplers_lock = threading.Lock()
+        self.samplers = {}
+        self.brokers_lock = threading.Lock()
+        self.brokers = {}
         atexit.register(self._exit_handler)
 
     def _exit_handler(self) -> None:
@@ -143,6 +150,70 @@ class CoreGrpcServer(core_pb2_grpc.CoreApiServicer):
     def _is_running(self, context) -> bool:
         return self.running and context.is_active()
 
+    def add_streamer(
+        self, session: Session, event_types: Iterable[int]
+    ) -> Tuple[EventBroker, EventStreamer]:
+        """
+        Subscribe to the event broker shared by streams for a session, creating it
+        when needed.
+
+        :param session: session to stream events for
+        :param event_types: types of events to stream
+        :return: event broker and event streamer
+        """
+        with self.brokers_lock:
+            broker = self.brokers.get(session.id)
+            if broker is None or broker.session is not session:
+                broker = EventBroker(session)
+                self.brokers[session.id] = broker
+            return broker, broker.subscribe(event_types)
+
+    def remove_streamer(self, broker: EventBroker, streamer: EventStreamer) -> None:
+        """
+        Unsubscribe from an event broker, removing it once no streams remain.
+
+        :param broker: event broker
+        :param streamer: event streamer to remove
+        :return: nothing
+        """
+        with self.brokers_lock:
+            if broker.unsubscribe(streamer):
+                if self.brokers.get(broker.session.id) is broker:
+                    self.brokers.pop(broker.session.id)
+
+    def add_sampler(
+        self, session: Session, interval: float
+    ) -> Tuple[ThroughputSampler, Queue]:
+        """
+        Subscribe to the throughput sampler shared by streams for a session and
+        interval, creating it when needed.
+
+        :param session: session to sample
+        :param interval: time in seconds between samples
+        :return: throughput sampler and subscriber queue
+        """
+        key = (session.id, interval)
+        with self.samplers_lock:
+            sampler = self.samplers.get(key)
+            if sampler is None or sampler.session is not session:
+                sampler = ThroughputSampler(session, interval)
+                self.samplers[key] = sampler
+            return sampler, sampler.subscribe()
+
+    def remove_sampler(self, sampler: ThroughputSampler, subscriber: Queue) -> None:
+        """
+        Unsubscribe from a throughput sampler, removing it once no streams remain.
+
+        :param sampler: throughput sampler
+        :param subscriber: subscriber queue to remove
+        :return: nothing
+        """
+        with self.samplers_lock:
+            if sampler.unsubscribe(subscriber):
+                key = (sampler.session.id, sampler.interval)
+                if self.samplers.get(key) is sampler:
+                    self.samplers.pop(key)
+
     def _cancel_stream(self, context) -> None:
         context.abort(grpc.StatusCode.CANCELLED, "server stopping")
 
@@ -236,6 +307,13 @@ class CoreGrpcServer(core_pb2_grpc.CoreApiServicer):
             state = EventTypes(hook.state)
             session.add_hook(state, hook.file, hook.data)
 
+        # assign nodes to distributed servers
+        if session.options.get_config("partition") == "1":
+            graph = grpcutils.partition_graph(session, request.nodes, request.links)
+            servers = session.distributed.partition(graph)
+            for node_proto in request.nodes:
+                node_proto.server = servers[node_proto.id]
+
         # create nodes
         _, exceptions = grpcutils.create_nodes(session, request.nodes)
         if exceptions:
@@ -571,19 +649,87 @@ class CoreGrpcServer(core_pb2_grpc.CoreApiServicer):
         session.distributed.add_server(request.name, request.host)
         return core_pb2.AddSessionServerResponse(result=True)
 
+    def GetSessionProfile(
+        self, request: core_pb2.GetSessionProfileRequest, context: ServicerContext
+    ) -> core_pb2.GetSessionProfileResponse:
+        """
+        Retrieve timings recorded during session instantiation.
+
+        :param request: get session profile request
+        :param context: context object
+        :return: get session profile response
+        """
+        logging.debug("get session profile: %s", request)
+        session = self.get_session(request.session_id, context)
+        profile = grpcutils.get_profile(session)
+        return core_pb2.GetSessionProfileResponse(**profile)
+
+    def PartitionSession(
+        self, request: core_pb2.PartitionSessionRequest, context: ServicerContext
+    ) -> core_pb2.PartitionSessionResponse:
+        """
+        Propose an assignment of nodes to the session distributed servers, for the
+        provided nodes and links or the current session topology.
+
+        :param request: partition session request
+        :param context: context object
+        :return: partition session response
+        """
+        logging.debug("partition session: %s", request)
+        session = self.get_session(request.session_id, context)
+        if request.nodes:
+            graph = grpcutils.partition_graph(session, request.nodes, request.links)
+        else:
+            graph = partition.session_graph(session)
+        servers = session.distributed.partition(graph)
+        return core_pb2.PartitionSessionResponse(
+            servers=servers, cross_links=graph.cut(servers)
+        )
+
     def Events(self, request: core_pb2.EventsRequest, context: ServicerContext) -> None:
         session = self.get_session(request.session_id, context)
         event_types = set(request.events)
         if not event_types:
             event_types = set(core_pb2.EventType.Enum.values())
 
-        streamer = EventStreamer(session, event_types)
-        while self._is_running(context):
-            event = streamer.process()
-            if event:
-                yield event
+        broker, streamer = self.add_streamer(session, event_types)
+        try:
+            while self._is_running(context):
+                event = streamer.process()
+                if event:
+                    yield event
+        finally:
+            self.remove_streamer(broker, streamer)
+        self._cancel_stream(context)
+
+    def BatchEvents(
+        self, request: core_pb2.BatchEventsRequest, context: ServicerContext
+    ) -> None:
+        """
+        Stream batches of serialized session events, each event is serialized once
+        for all streams.
 
-        streamer.remove_handlers()
+        :param request: batch events request
+        :param context: context object
+        :return: nothing
+        """
+        session = self.get_session(request.session_id, context)
+        event_types = set(request.events)
+        if not event_types:
+            event_types = set(core_pb2.EventType.Enum.values())
+        max_events = request.max_events or _BATCH_MAX_EVENTS
+        broker, streamer = self.add_streamer(session, event_types)
+        try:
+            while self._is_running(context):
+                events = streamer.get(max_events)
+                if events:
+                    yield core_pb2.EventBatch(
+                        session_id=session.id,
+                        events=[x.data for x in events],
+                        dropped=streamer.dropped,
+                    )
+        finally:
+            self.remove_streamer(broker, streamer)
         self._cancel_stream(context)
 
     def Throughputs(
@@ -597,64 +743,21 @@ class CoreGrpcServer(core_pb2_grpc.CoreApiServicer):
         :return: nothing
         """
         session = self.get_session(request.session_id, context)
-        delay = 3
-        last_check = None
-        last_stats = None
-
-        while self._is_running(context):
-            now = time.monotonic()
-            stats = get_net_stats()
-
-            # calculate average
-            if last_check is not None:
-                interval = now - last_check
-                throughputs_event = core_pb2.ThroughputsEvent(session_id=session.id)
-                for key in stats:
-                    current_rxtx = stats[key]
-                    previous_rxtx = last_stats.get(key)
-                    if not previous_rxtx:
-                        continue
-                    rx_kbps = (
-                        (current_rxtx["rx"] - previous_rxtx["rx"]) * 8.0 / interval
-                    )
-                    tx_kbps = (
-                        (current_rxtx["tx"] - previous_rxtx["tx"]) * 8.0 / interval
-                    )
-                    throughput = rx_kbps + tx_kbps
-                    if key.startswith("veth"):
-                        key = key.split(".")
-                        node_id = _INTERFACE_REGEX.search(key[0]).group("node")
-                        node_id = int(node_id, base=16)
-                        interface_id = int(key[1], base=16)
-                        session_id = int(key[2], base=16)
-                        if session.id != session_id:
-                            continue
-                        interface_throughput = (
-                            throughputs_event.interface_throughputs.add()
-                        )
-                        interface_throughput.node_id = node_id
-                        interface_throughput.interface_id = interface_id
-                        interface_throughput.throughput = throughput
-                    elif key.startswith("b."):
-                        try:
-                            key = key.split(".")
-                            node_id = int(key[1], base=16)
-                            session_id = int(key[2], base=16)
-                            if session.id != session_id:
-                                continue
-                            bridge_throughput = (
-                                throughputs_event.bridge_throughputs.add()
-                            )
-                            bridge_throughput.node_id = node_id
-                            bridge_throughput.throughput = throughput
-                        except ValueError:
-                            pass
-
-                yield throughputs_event
-
-            last_check = now
-            last_stats = stats
-            time.sleep(delay)
+        interval = request.interval or _THROUGHPUT_INTERVAL
+        if interval < _THROUGHPUT_MIN_INTERVAL:
+            context.abort(
+                grpc.StatusCode.INVALID_ARGUMENT,
+                f"throughput interval must be at least {_THROUGHPUT_MIN_INTERVAL}",
+            )
+        sampler, subscriber = self.add_sampler(session, interval)
+        try:
+            while self._is_running(context):
+                try:
+                    yield subscriber.get(timeout=1)
+                except Empty:
+                    pass
+        finally:
+            self.remove_sampler(sampler, subscriber)
 
     def AddNode(
         self, request: core_pb2.AddNodeRequest, context: ServicerContext
@@ -714,7 +817,6 @@ class CoreGrpcServer(core_pb2_grpc.CoreApiServicer):
             options = NodeOptions()
             has_geo = request.HasField("geo")
             if has_geo:
-                logging.info("has geo")
                 lat = request.geo.lat
                 lon = request.geo.lon
                 alt = request.geo.alt
@@ -722,7 +824,6 @@ class CoreGrpcServer(core_pb2_grpc.CoreApiServicer):
             else:
                 x = request.position.x
                 y = request.position.y
-                logging.info("has pos: %s,%s", x, y)
                 options.set_position(x, y)
             session.edit_node(node.id, options)
             source = request.source if request.source else None
@@ -730,6 +831,38 @@ class CoreGrpcServer(core_pb2_grpc.CoreApiServicer):
                 session.broadcast_node(node, source=source)
         return core_pb2.MoveNodesResponse()
 
+    def BatchMoveNodes(
+        self, request: core_pb2.BatchMoveNodesRequest, context: ServicerContext
+    ) -> core_pb2.BatchMoveNodesResponse:
+        """
+        Move a batch of nodes, updating ranges once for the batch
+
+        :param request: batch move nodes request
+        :param context: context object
+        :return: batch move nodes response
+        """
+        session = self.get_session(request.session_id, context)
+        moves = []
+        for move in request.moves:
+            options = NodeOptions()
+            if move.HasField("geo"):
+                options.set_location(move.geo.lat, move.geo.lon, move.geo.alt)
+            elif move.HasField("position"):
+                options.set_position(move.position.x, move.position.y)
+            else:
+                context.abort(
+                    grpc.StatusCode.INVALID_ARGUMENT,
+                    f"node({move.node_id}) move must provide a move type",
+                )
+            moves.append((move.node_id, options))
+        source = request.source if request.source else None
+        try:
+            moved = session.move_nodes(moves, source)
+        except CoreError as e:
+            context.abort(grpc.StatusCode.NOT_FOUND, str(e))
+        node_ids = [x.id for x in moved]
+        return core_pb2.BatchMoveNodesResponse(node_ids=node_ids)
+
     def EditNode(
         self, request: core_pb2.EditNodeRequest, context: ServicerContext
     ) -> core_pb2.EditNodeResponse:
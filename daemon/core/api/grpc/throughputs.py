@@ -0,0 +1,187 @@
+"""
+Defines the throughput sampler, calculating session interface and bridge
+throughputs shared by all throughput stream subscribers.
+"""
+
+import logging
+import threading
+import time
+from queue import Empty, Full, Queue
+from typing import Dict, List, Optional, Tuple
+
+from core.api.grpc import core_pb2
+from core.emulator.session import Session
+from core.nodes.base import CoreNodeBase
+from core.nodes.network import CoreNetwork
+
+NET_DEV_FILE: str = "/proc/net/dev"
+
+
+def read_net_stats(names: Dict[str, Tuple[int, int]]) -> Dict[str, Tuple[int, int]]:
+    """
+    Read received and transmitted bytes for the provided interfaces, only parsing
+    the counters of lines for those interfaces.
+
+    :param names: interface names to read stats for
+    :return: dict of interface name to received and transmitted bytes
+    """
+    with open(NET_DEV_FILE, "r") as f:
+        data = f.readlines()[2:]
+    stats = {}
+    for line in data:
+        name, _, values = line.partition(":")
+        name = name.strip()
+        if name not in names:
+            continue
+        values = values.split()
+        stats[name] = (int(values[0]), int(values[8]))
+    return stats
+
+
+class ThroughputSampler:
+    """
+    Samples throughput for the interfaces and bridges of a session at an interval,
+    using a single thread, and fans out the resulting events to all subscribers.
+    """
+
+    def __init__(self, session: Session, interval: float) -> None:
+        """
+        Create a ThroughputSampler instance.
+
+        :param session: session to sample throughputs for
+        :param interval: time in seconds between samples
+        """
+        self.session: Session = session
+        self.interval: float = interval
+        self.lock: threading.Lock = threading.Lock()
+        self.subscribers: List[Queue] = []
+        self.stop_event: Optional[threading.Event] = None
+
+    def subscribe(self) -> Queue:
+        """
+        Subscribe to throughput events, starting sampling when needed.
+
+        :return: queue throughput events will be provided on
+        """
+        subscriber = Queue(maxsize=1)
+        with self.lock:
+            self.subscribers.append(subscriber)
+            if self.stop_event is None:
+                self.stop_event = threading.Event()
+                thread = threading.Thread(
+                    target=self.run, args=(self.stop_event,), daemon=True
+                )
+                thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber: Queue) -> bool:
+        """
+        Unsubscribe from throughput events, sampling stops when there are no
+        subscribers left.
+
+        :param subscriber: subscriber queue to remove
+        :return: True if there are no remaining subscribers, False otherwise
+        """
+        with self.lock:
+            if subscriber in self.subscribers:
+                self.subscribers.remove(subscriber)
+            if not self.subscribers:
+                if self.stop_event is not None:
+                    self.stop_event.set()
+                    self.stop_event = None
+                return True
+            return False
+
+    def interfaces(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Map the host interface names of the session to their node id and
+        interface id, bridges use an interface id of -1.
+
+        :return: dict of interface name to node and interface id
+        """
+        names = {}
+        for node in list(self.session.nodes.values()):
+            if isinstance(node, CoreNetwork):
+                names[node.brname] = (node.id, -1)
+            elif isinstance(node, CoreNodeBase):
+                for netif in node.netifs():
+                    names[netif.localname] = (node.id, node.getifindex(netif))
+        return names
+
+    def create_event(
+        self,
+        names: Dict[str, Tuple[int, int]],
+        stats: Dict[str, Tuple[int, int]],
+        last_stats: Dict[str, Tuple[int, int]],
+        interval: float,
+    ) -> core_pb2.ThroughputsEvent:
+        """
+        Create a throughputs event from the change between two samples.
+
+        :param names: interface name to node and interface id
+        :param stats: current interface stats
+        :param last_stats: previous interface stats
+        :param interval: time in seconds between samples
+        :return: throughputs event
+        """
+        event = core_pb2.ThroughputsEvent(session_id=self.session.id)
+        for name, (rx, tx) in stats.items():
+            previous = last_stats.get(name)
+            if previous is None:
+                continue
+            last_rx, last_tx = previous
+            throughput = ((rx - last_rx) + (tx - last_tx)) * 8.0 / interval
+            node_id, interface_id = names[name]
+            if interface_id == -1:
+                event.bridge_throughputs.add(node_id=node_id, throughput=throughput)
+            else:
+                event.interface_throughputs.add(
+                    node_id=node_id, interface_id=interface_id, throughput=throughput
+                )
+        return event
+
+    def publish(self, event: core_pb2.ThroughputsEvent) -> None:
+        """
+        Provide event to all subscribers, replacing any event a slow subscriber
+        has not consumed yet.
+
+        :param event: event to publish
+        :return: nothing
+        """
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.get_nowait()
+            except Empty:
+                pass
+            try:
+                subscriber.put_nowait(event)
+            except Full:
+                pass
+
+    def run(self, stop_event: threading.Event) -> None:
+        """
+        Sample throughputs until there are no subscribers left.
+
+        :param stop_event: event set when sampling should stop
+        :return: nothing
+        """
+        last_check = None
+        last_stats = {}
+        while not stop_event.is_set():
+            now = time.monotonic()
+            names = self.interfaces()
+            try:
+                stats = read_net_stats(names)
+            except IOError:
+                logging.exception("error reading interface stats")
+                stats = {}
+            if last_check is not None and not stop_event.is_set():
+                event = self.create_event(names, stats, last_stats, now - last_check)
+                self.publish(event)
+            last_check = now
+            last_stats = stats
+            delay = self.interval - (time.monotonic() - now)
+            if delay > 0:
+                stop_event.wait(delay)
@@ -1,16 +1,23 @@
 import abc
 import enum
+import hashlib
 import inspect
 import logging
 import pathlib
+import threading
 import time
-from typing import Any, Dict, List
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import partial
+from typing import Any, Callable, Dict, List, Tuple, Type
 
 from mako import exceptions
 from mako.lookup import TemplateLookup
 from mako.template import Template
 
 from core.config import Configuration
+from core.emulator.profiler import SERVICE
+from core.emulator.validator import readiness_checks
 from core.errors import CoreCommandError, CoreError
 from core.nodes.base import CoreNode
 
@@ -27,6 +34,140 @@ class ConfigServiceBootError(Exception):
     pass
 
 
+class TemplateCache:
+    """
+    Process wide cache of compiled templates, shared by all nodes using a service.
+    File templates are looked up using a template lookup per service class and
+    text templates are cached using their name and a hash of their content,
+    evicting the least recently used templates once full.
+    """
+
+    def __init__(self, maxsize: int = 512) -> None:
+        """
+        Create a TemplateCache instance.
+
+        :param maxsize: max number of compiled templates to keep
+        """
+        self.maxsize: int = maxsize
+        self.lock: threading.Lock = threading.Lock()
+        self.lookups: Dict[Type["ConfigService"], TemplateLookup] = {}
+        self.templates: "OrderedDict[Tuple[Any, ...], Template]" = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @staticmethod
+    def text_key(
+        service_class: Type["ConfigService"], name: str, text: str
+    ) -> Tuple[Any, ...]:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return service_class, name, digest
+
+    def get_lookup(self, service_class: Type["ConfigService"]) -> TemplateLookup:
+        """
+        Retrieve the template lookup for the templates directory of a service class.
+
+        :param service_class: service class to get lookup for
+        :return: template lookup
+        """
+        with self.lock:
+            lookup = self.lookups.get(service_class)
+            if lookup is None:
+                class_file = inspect.getfile(service_class)
+                path = pathlib.Path(class_file).parent.joinpath(TEMPLATES_DIR)
+                lookup = TemplateLookup(directories=path)
+                self.lookups[service_class] = lookup
+            return lookup
+
+    def _get(self, key: Tuple[Any, ...], create: Callable[[], Template]) -> Template:
+        with self.lock:
+            template = self.templates.get(key)
+            if template is not None:
+                self.hits += 1
+                self.templates.move_to_end(key)
+                return template
+            self.misses += 1
+        template = create()
+        with self.lock:
+            self.templates[key] = template
+            self.templates.move_to_end(key)
+            while len(self.templates) > self.maxsize:
+                self.templates.popitem(last=False)
+        return template
+
+    def get_file_template(
+        self, service_class: Type["ConfigService"], basename: str
+    ) -> Template:
+        """
+        Retrieve a compiled file template for a service class.
+
+        :param service_class: service class to get template for
+        :param basename: base name of template file
+        :return: compiled template
+        """
+        lookup = self.get_lookup(service_class)
+        key = (service_class, basename)
+        return self._get(key, lambda: lookup.get_template(basename))
+
+    def get_text_template(
+        self, service_class: Type["ConfigService"], name: str, text: str
+    ) -> Template:
+        """
+        Retrieve a compiled text template for a service class.
+
+        :param service_class: service class to get template for
+        :param name: name of file template is for
+        :param text: template text
+        :return: compiled template
+        """
+        key = self.text_key(service_class, name, text)
+        return self._get(key, lambda: Template(text))
+
+    def invalidate(
+        self, service_class: Type["ConfigService"], name: str, text: str
+    ) -> None:
+        """
+        Remove a compiled text template from the cache.
+
+        :param service_class: service class template is for
+        :param name: name of file template is for
+        :param text: template text
+        :return: nothing
+        """
+        key = self.text_key(service_class, name, text)
+        with self.lock:
+            self.templates.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Remove all compiled templates and reset counters.
+
+        :return: nothing
+        """
+        with self.lock:
+            self.lookups.clear()
+            self.templates.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Retrieve cache counters, for tuning cache size.
+
+        :return: dict of hits, misses, current size, and max size
+        """
+        with self.lock:
+            return dict(
+                hits=self.hits,
+                misses=self.misses,
+                size=len(self.templates),
+                maxsize=self.maxsize,
+            )
+
+
+# compiled templates shared across all config service instances
+TEMPLATE_CACHE: TemplateCache = TemplateCache()
+
+
 class ConfigService(abc.ABC):
     """
     Base class for creating configurable services.
@@ -38,6 +179,10 @@ class ConfigService(abc.ABC):
     # time to wait in seconds for determining if service started successfully
     validation_timer = 5
 
+    # files, such as pidfiles, and ports expected once the service is ready
+    validation_files: Tuple[str, ...] = ()
+    validation_ports: Tuple[int, ...] = ()
+
     def __init__(self, node: CoreNode) -> None:
         """
         Create ConfigService instance.
@@ -45,9 +190,7 @@ class ConfigService(abc.ABC):
         :param node: node this service is assigned to
         """
         self.node = node
-        class_file = inspect.getfile(self.__class__)
-        templates_path = pathlib.Path(class_file).parent.joinpath(TEMPLATES_DIR)
-        self.templates = TemplateLookup(directories=templates_path)
+        self.templates = TEMPLATE_CACHE.get_lookup(self.__class__)
         self.config = {}
         self.custom_templates = {}
         self.custom_config = {}
@@ -133,16 +276,38 @@ class ConfigService(abc.ABC):
         :return: nothing
         :raises ConfigServiceBootError: when there is an error starting service
         """
+        self.boot().result()
+
+    def boot(self, create_files: bool = True) -> Future:
+        """
+        Creates services files/directories, runs startup, and schedules validation
+        based on validation mode.
+
+        :param create_files: True to create service files, False when they have
+            already been created
+        :return: future completed once the service has been validated, raising
+            ConfigServiceBootError when validation fails
+        :raises ConfigServiceBootError: when there is an error starting service
+        """
         logging.info("node(%s) service(%s) starting...", self.node.name, self.name)
+        name = f"{self.node.name}:{self.name}"
+        start = time.monotonic()
         self.create_dirs()
-        self.create_files()
+        if create_files:
+            self.create_files()
         wait = self.validation_mode == ConfigServiceMode.BLOCKING
         self.run_startup(wait)
-        if not wait:
-            if self.validation_mode == ConfigServiceMode.TIMER:
-                self.wait_validation()
-            else:
-                self.run_validation()
+        if wait:
+            future = self.wait_ready()
+        elif self.validation_mode == ConfigServiceMode.TIMER:
+            future = self.wait_validation()
+        else:
+            future = self.run_validation()
+        profiler = self.node.session.profiler
+        future.add_done_callback(
+            lambda x: profiler.record(SERVICE, name, time.monotonic() - start)
+        )
+        return future
 
     def stop(self) -> None:
         """
@@ -200,6 +365,10 @@ class ConfigService(abc.ABC):
         :param template: custom template to render
         :return: nothing
         """
+        previous = self.custom_templates.get(name)
+        if previous is not None and previous != template:
+            text = self.clean_text(previous)
+            TEMPLATE_CACHE.invalidate(self.__class__, name, text)
         self.custom_templates[name] = template
 
     def get_text_template(self, name: str) -> str:
@@ -243,12 +412,12 @@ class ConfigService(abc.ABC):
             basename = pathlib.Path(name).name
             if name in self.custom_templates:
                 text = self.custom_templates[name]
-                rendered = self.render_text(text, data)
+                rendered = self.render_text(text, data, name)
             elif self.templates.has_template(basename):
                 rendered = self.render_template(basename, data)
             else:
                 text = self.get_text_template(name)
-                rendered = self.render_text(text, data)
+                rendered = self.render_text(text, data, name)
             logging.debug(
                 "node(%s) service(%s) template(%s): \n%s",
                 self.node.name,
@@ -275,41 +444,77 @@ class ConfigService(abc.ABC):
                     f"node({self.node.name}) service({self.name}) failed startup: {e}"
                 )
 
-    def wait_validation(self) -> None:
+    def wait_validation(self) -> Future:
         """
-        Waits for a period of time to consider service started successfully.
+        Waits for a period of time to consider service started successfully, or
+        until readiness checks for expected files and ports pass.
 
-        :return: nothing
+        :return: future completed once the service is considered started
         """
-        time.sleep(self.validation_timer)
+        validator = self.node.session.validator
+        checks = readiness_checks(
+            self.node, self.validation_files, self.validation_ports
+        )
+        if not checks:
+            return validator.timer(self.validation_timer)
+        return validator.validate(
+            checks, self.validation_timer, self.validation_period
+        )
 
-    def run_validation(self) -> None:
+    def wait_ready(self) -> Future:
         """
-        Runs validation commands for service on node.
+        Waits for readiness checks for expected files and ports to pass, after
+        startup commands have completed.
 
-        :return: nothing
-        :raises ConfigServiceBootError: if there is a validation failure
+        :return: future completed once the service is ready, raising
+            ConfigServiceBootError if readiness checks do not pass in time
         """
-        start = time.monotonic()
-        cmds = self.validate[:]
-        index = 0
-        while cmds:
-            cmd = cmds[index]
-            try:
-                self.node.cmd(cmd)
-                del cmds[index]
-                index += 1
-            except CoreCommandError:
-                logging.debug(
-                    f"node({self.node.name}) service({self.name}) "
-                    f"validate command failed: {cmd}"
-                )
-                time.sleep(self.validation_period)
+        checks = readiness_checks(
+            self.node, self.validation_files, self.validation_ports
+        )
+        error = ConfigServiceBootError(
+            f"node({self.node.name}) service({self.name}) failed to become ready"
+        )
+        return self.node.session.validator.validate(
+            checks, self.validation_timer, self.validation_period, error
+        )
 
-            if cmds and time.monotonic() - start > self.validation_timer:
-                raise ConfigServiceBootError(
-                    f"node({self.node.name}) service({self.name}) failed to validate"
-                )
+    def run_validation(self) -> Future:
+        """
+        Runs validation commands and readiness checks for service on node, which
+        are retried every validation period until they pass or the validation
+        timer is reached.
+
+        :return: future completed once the service is validated, raising
+            ConfigServiceBootError if there is a validation failure
+        """
+        checks = [partial(self._validate_cmd, x) for x in self.validate]
+        checks.extend(
+            readiness_checks(self.node, self.validation_files, self.validation_ports)
+        )
+        error = ConfigServiceBootError(
+            f"node({self.node.name}) service({self.name}) failed to validate"
+        )
+        return self.node.session.validator.validate(
+            checks, self.validation_timer, self.validation_period, error
+        )
+
+    def _validate_cmd(self, cmd: str) -> bool:
+        """
+        Run a validation command for service on node.
+
+        :param cmd: validation command to run
+        :return: True if command was successful, False otherwise
+        """
+        try:
+            self.node.cmd(cmd)
+            return True
+        except CoreCommandError:
+            logging.debug(
+                f"node({self.node.name}) service({self.name}) "
+                f"validate command failed: {cmd}"
+            )
+            return False
 
     def _render(self, template: Template, data: Dict[str, Any] = None) -> str:
         """
@@ -325,17 +530,21 @@ class ConfigService(abc.ABC):
             node=self.node, config=self.render_config(), **data
         )
 
-    def render_text(self, text: str, data: Dict[str, Any] = None) -> str:
+    def render_text(
+        self, text: str, data: Dict[str, Any] = None, name: str = None
+    ) -> str:
         """
         Renders text based template providing all associated data to template.
 
         :param text: text to render
         :param data: service specific defined data for template
+        :param name: name of file text is a template for, used to cache the
+            compiled template
         :return: rendered template
         """
         text = self.clean_text(text)
         try:
-            template = Template(text)
+            template = TEMPLATE_CACHE.get_text_template(self.__class__, name, text)
             return self._render(template, data)
         except Exception:
             raise CoreError(
@@ -352,7 +561,7 @@ class ConfigService(abc.ABC):
         :return: rendered template
         """
         try:
-            template = self.templates.get_template(basename)
+            template = TEMPLATE_CACHE.get_file_template(self.__class__, basename)
             return self._render(template, data)
         except Exception:
             raise CoreError(
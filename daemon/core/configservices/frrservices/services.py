@@ -71,6 +71,7 @@ class FRRZebra(ConfigService):
     dependencies = []
     startup = ["sh frrboot.sh zebra"]
     validate = ["pidof zebra"]
+    validation_ports = (2601,)
     shutdown = ["killall zebra"]
     validation_mode = ConfigServiceMode.BLOCKING
     default_configs = []
@@ -157,6 +158,7 @@ class FRROspfv2(FrrService, ConfigService):
     startup = ()
     shutdown = ["killall ospfd"]
     validate = ["pidof ospfd"]
+    validation_ports = (2604,)
     ipv4_routing = True
 
     def frr_config(self) -> str:
@@ -197,6 +199,7 @@ class FRROspfv3(FrrService, ConfigService):
     name = "FRROSPFv3"
     shutdown = ["killall ospf6d"]
     validate = ["pidof ospf6d"]
+    validation_ports = (2606,)
     ipv4_routing = True
     ipv6_routing = True
 
@@ -236,6 +239,7 @@ class FRRBgp(FrrService, ConfigService):
     name = "FRRBGP"
     shutdown = ["killall bgpd"]
     validate = ["pidof bgpd"]
+    validation_ports = (2605,)
     custom_needed = True
     ipv4_routing = True
     ipv6_routing = True
@@ -266,6 +270,7 @@ class FRRRip(FrrService, ConfigService):
     name = "FRRRIP"
     shutdown = ["killall ripd"]
     validate = ["pidof ripd"]
+    validation_ports = (2602,)
     ipv4_routing = True
 
     def frr_config(self) -> str:
@@ -291,6 +296,7 @@ class FRRRipng(FrrService, ConfigService):
     name = "FRRRIPNG"
     shutdown = ["killall ripngd"]
     validate = ["pidof ripngd"]
+    validation_ports = (2603,)
     ipv6_routing = True
 
     def frr_config(self) -> str:
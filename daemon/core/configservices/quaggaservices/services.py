@@ -71,6 +71,7 @@ class Zebra(ConfigService):
     dependencies = []
     startup = ["sh quaggaboot.sh zebra"]
     validate = ["pidof zebra"]
+    validation_ports = (2601,)
     shutdown = ["killall zebra"]
     validation_mode = ConfigServiceMode.BLOCKING
     default_configs = []
@@ -156,6 +157,7 @@ class Ospfv2(QuaggaService, ConfigService):
 
     name = "OSPFv2"
     validate = ["pidof ospfd"]
+    validation_ports = (2604,)
     shutdown = ["killall ospfd"]
     ipv4_routing = True
 
@@ -197,6 +199,7 @@ class Ospfv3(QuaggaService, ConfigService):
     name = "OSPFv3"
     shutdown = ("killall ospf6d",)
     validate = ("pidof ospf6d",)
+    validation_ports = (2606,)
     ipv4_routing = True
     ipv6_routing = True
 
@@ -271,6 +274,7 @@ class Bgp(QuaggaService, ConfigService):
     name = "BGP"
     shutdown = ["killall bgpd"]
     validate = ["pidof bgpd"]
+    validation_ports = (2605,)
     ipv4_routing = True
     ipv6_routing = True
 
@@ -300,6 +304,7 @@ class Rip(QuaggaService, ConfigService):
     name = "RIP"
     shutdown = ["killall ripd"]
     validate = ["pidof ripd"]
+    validation_ports = (2602,)
     ipv4_routing = True
 
     def quagga_config(self) -> str:
@@ -325,6 +330,7 @@ class Ripng(QuaggaService, ConfigService):
     name = "RIPNG"
     shutdown = ["killall ripngd"]
     validate = ["pidof ripngd"]
+    validation_ports = (2603,)
     ipv6_routing = True
 
     def quagga_config(self) -> str:
@@ -6,7 +6,7 @@ import logging
 import os
 import threading
 from collections import OrderedDict
-from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple, Type
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple, Type
 
 from core import utils
 from core.config import ConfigGroup, Configuration, ModelManager
@@ -20,6 +20,7 @@ from core.emane.nodes import EmaneNet
 from core.emane.rfpipe import EmaneRfPipeModel
 from core.emane.tdma import EmaneTdmaModel
 from core.emulator.data import LinkData
+from core.emulator.executor import NODE_STAGE
 from core.emulator.enumerations import (
     ConfigDataTypes,
     LinkTypes,
@@ -87,6 +88,7 @@ class EmaneManager(ModelManager):
         self.session = session
         self._emane_nets = {}
         self._emane_node_lock = threading.Lock()
+        self._nem_index: Dict[int, Tuple[EmaneNet, CoreInterface]] = {}
         # port numbers are allocated from these counters
         self.platformport = self.session.options.get_config_int(
             "emane_platform_port", 8100
@@ -400,6 +402,7 @@ class EmaneManager(ModelManager):
         """
         with self._emane_node_lock:
             self._emane_nets.clear()
+            self._nem_index.clear()
 
         self.platformport = self.session.options.get_config_int(
             "emane_platform_port", 8100
@@ -466,46 +469,78 @@ class EmaneManager(ModelManager):
             model_class = self.models[model_name]
             emane_node.setmodel(model_class, config)
 
-    def nemlookup(self, nemid) -> Tuple[Optional[EmaneNet], Optional[CoreInterface]]:
+    def index_nem(self, nemid: int, emane_net: EmaneNet, netif: CoreInterface) -> None:
         """
-        Look for the given numerical NEM ID and return the first matching
-        EMANE network and NEM interface.
+        Index the EMANE network and interface for a numerical NEM ID.
+
+        :param nemid: nem id to index
+        :param emane_net: emane network nem belongs to
+        :param netif: interface for nem
+        :return: nothing
         """
-        emane_node = None
-        netif = None
+        self._nem_index[nemid] = (emane_net, netif)
 
-        for node_id in self._emane_nets:
-            emane_node = self._emane_nets[node_id]
-            netif = emane_node.getnemnetif(nemid)
-            if netif is not None:
-                break
-            else:
-                emane_node = None
+    def unindex_nem(self, nemid: int, netif: CoreInterface) -> None:
+        """
+        Remove the index for a numerical NEM ID, when it maps to the interface.
+
+        :param nemid: nem id to remove
+        :param netif: interface for nem
+        :return: nothing
+        """
+        value = self._nem_index.get(nemid)
+        if value is not None and value[1] is netif:
+            self._nem_index.pop(nemid)
 
-        return emane_node, netif
+    def nemlookup(self, nemid) -> Tuple[Optional[EmaneNet], Optional[CoreInterface]]:
+        """
+        Look for the given numerical NEM ID and return the matching
+        EMANE network and NEM interface.
+        """
+        return self._nem_index.get(nemid, (None, None))
 
     def get_nem_link(
         self, nem1: int, nem2: int, flags: MessageFlags = MessageFlags.NONE
     ) -> Optional[LinkData]:
-        emane1, netif = self.nemlookup(nem1)
-        if not emane1 or not netif:
-            logging.error("invalid nem: %s", nem1)
-            return None
-        node1 = netif.node
-        emane2, netif = self.nemlookup(nem2)
-        if not emane2 or not netif:
-            logging.error("invalid nem: %s", nem2)
-            return None
-        node2 = netif.node
-        color = self.session.get_link_color(emane1.id)
-        return LinkData(
-            message_type=flags,
-            node1_id=node1.id,
-            node2_id=node2.id,
-            network_id=emane1.id,
-            link_type=LinkTypes.WIRELESS,
-            color=color,
-        )
+        links = self.get_nem_links([(nem1, nem2)], flags)
+        if links:
+            return links[0]
+        return None
+
+    def get_nem_links(
+        self,
+        nem_pairs: Iterable[Tuple[int, int]],
+        flags: MessageFlags = MessageFlags.NONE,
+    ) -> List[LinkData]:
+        """
+        Create link data for many NEM pairs at once, ignoring invalid NEMs.
+
+        :param nem_pairs: nem id pairs to create links for
+        :param flags: link message flags
+        :return: link data for valid nem pairs
+        """
+        links = []
+        colors = {}
+        for nem1, nem2 in nem_pairs:
+            emane1, netif1 = self._nem_index.get(nem1, (None, None))
+            emane2, netif2 = self._nem_index.get(nem2, (None, None))
+            if netif1 is None or netif2 is None:
+                logging.error("invalid nem link: %s - %s", nem1, nem2)
+                continue
+            color = colors.get(emane1.id)
+            if color is None:
+                color = self.session.get_link_color(emane1.id)
+                colors[emane1.id] = color
+            link = LinkData(
+                message_type=flags,
+                node1_id=netif1.node.id,
+                node2_id=netif2.node.id,
+                network_id=emane1.id,
+                link_type=LinkTypes.WIRELESS,
+                color=color,
+            )
+            links.append(link)
+        return links
 
     def numnems(self) -> int:
         """
@@ -535,9 +570,13 @@ class EmaneManager(ModelManager):
         """
         Builds the nem, mac, and phy xml files for each EMANE network.
         """
+        funcs = []
         for key in sorted(self._emane_nets):
             emane_net = self._emane_nets[key]
-            emanexml.build_xml_files(self, emane_net)
+            funcs.append((emanexml.build_xml_files, (self, emane_net), {}))
+        _, exceptions = self.session.executor.run(NODE_STAGE, funcs)
+        if exceptions:
+            raise exceptions[0]
 
     def buildeventservicexml(self) -> None:
         """
@@ -564,10 +603,14 @@ class EmaneManager(ModelManager):
             return
 
         dev = self.get_config("eventservicedevice")
-        emanexml.create_event_service_xml(group, port, dev, self.session.session_dir)
+        session_dir = self.session.session_dir
+        manifest = self.session.manifest
+        emanexml.create_event_service_xml(
+            group, port, dev, session_dir, manifest=manifest
+        )
         self.session.distributed.execute(
             lambda x: emanexml.create_event_service_xml(
-                group, port, dev, self.session.session_dir, x
+                group, port, dev, session_dir, x, manifest
             )
         )
 
@@ -597,44 +640,32 @@ class EmaneManager(ModelManager):
         eventservicenetidx = self.session.get_control_net_index(eventdev)
 
         run_emane_on_host = False
+        funcs = []
         for node in self.getnodes():
             if isinstance(node, Rj45Node):
                 run_emane_on_host = True
                 continue
-            path = self.session.session_dir
-            n = node.id
-
-            # control network not yet started here
-            self.session.add_remove_control_interface(
-                node, 0, remove=False, conf_required=False
+            args = (
+                node,
+                emanecmd,
+                otagroup,
+                otadev,
+                otanetidx,
+                eventgroup,
+                eventdev,
+                eventservicenetidx,
             )
-
-            if otanetidx > 0:
-                logging.info("adding ota device ctrl%d", otanetidx)
-                self.session.add_remove_control_interface(
-                    node, otanetidx, remove=False, conf_required=False
-                )
-
-            if eventservicenetidx >= 0:
-                logging.info("adding event service device ctrl%d", eventservicenetidx)
-                self.session.add_remove_control_interface(
-                    node, eventservicenetidx, remove=False, conf_required=False
-                )
-
-            # multicast route is needed for OTA data
-            node.node_net_client.create_route(otagroup, otadev)
-
-            # multicast route is also needed for event data if on control network
-            if eventservicenetidx >= 0 and eventgroup != otagroup:
-                node.node_net_client.create_route(eventgroup, eventdev)
-
-            # start emane
-            log_file = os.path.join(path, f"emane{n}.log")
-            platform_xml = os.path.join(path, f"platform{n}.xml")
-            args = f"{emanecmd} -f {log_file} {platform_xml}"
-            output = node.cmd(args)
-            logging.info("node(%s) emane daemon running: %s", node.name, args)
-            logging.debug("node(%s) emane daemon output: %s", node.name, output)
+            funcs.append((self.startdaemon, args, {}))
+        if funcs:
+            # create control networks before adding node interfaces in parallel
+            for net_index in {0, otanetidx, eventservicenetidx}:
+                if net_index >= 0:
+                    self.session.add_remove_control_net(
+                        net_index, remove=False, conf_required=False
+                    )
+            _, exceptions = self.session.executor.run(NODE_STAGE, funcs)
+            if exceptions:
+                raise exceptions[0]
 
         if not run_emane_on_host:
             return
@@ -647,6 +678,56 @@ class EmaneManager(ModelManager):
         self.session.distributed.execute(lambda x: x.remote_cmd(emanecmd, cwd=path))
         logging.info("host emane daemon running: %s", emanecmd)
 
+    def startdaemon(
+        self,
+        node: CoreNode,
+        emanecmd: str,
+        otagroup: str,
+        otadev: str,
+        otanetidx: int,
+        eventgroup: str,
+        eventdev: str,
+        eventservicenetidx: int,
+    ) -> None:
+        """
+        Add control interfaces and multicast routes to a node, then start its
+        EMANE daemon.
+        """
+        path = self.session.session_dir
+        n = node.id
+
+        # control network not yet started here
+        self.session.add_remove_control_interface(
+            node, 0, remove=False, conf_required=False
+        )
+
+        if otanetidx > 0:
+            logging.info("adding ota device ctrl%d", otanetidx)
+            self.session.add_remove_control_interface(
+                node, otanetidx, remove=False, conf_required=False
+            )
+
+        if eventservicenetidx >= 0:
+            logging.info("adding event service device ctrl%d", eventservicenetidx)
+            self.session.add_remove_control_interface(
+                node, eventservicenetidx, remove=False, conf_required=False
+            )
+
+        # multicast route is needed for OTA data
+        node.node_net_client.create_route(otagroup, otadev)
+
+        # multicast route is also needed for event data if on control network
+        if eventservicenetidx >= 0 and eventgroup != otagroup:
+            node.node_net_client.create_route(eventgroup, eventdev)
+
+        # start emane
+        log_file = os.path.join(path, f"emane{n}.log")
+        platform_xml = os.path.join(path, f"platform{n}.xml")
+        args = f"{emanecmd} -f {log_file} {platform_xml}"
+        output = node.cmd(args)
+        logging.info("node(%s) emane daemon running: %s", node.name, args)
+        logging.debug("node(%s) emane daemon output: %s", node.name, output)
+
     def stopdaemons(self) -> None:
         """
         Kill the appropriate EMANE daemons.
@@ -679,10 +760,13 @@ class EmaneManager(ModelManager):
         Install TUN/TAP virtual interfaces into their proper namespaces
         now that the EMANE daemons are running.
         """
+        futures = []
         for key in sorted(self._emane_nets.keys()):
             emane_node = self._emane_nets[key]
             logging.info("emane install netifs for node: %d", key)
-            emane_node.installnetifs()
+            futures.extend(emane_node.installnetifs())
+        for future in futures:
+            future.result()
 
     def deinstallnetifs(self) -> None:
         """
@@ -780,6 +864,7 @@ class EmaneManager(ModelManager):
         """
         events = LocationEvent()
         events.restore(data)
+        locations = []
         for event in events:
             txnemid, attrs = event
             if (
@@ -795,7 +880,15 @@ class EmaneManager(ModelManager):
             lon = attrs["longitude"]
             alt = attrs["altitude"]
             logging.debug("emane location event: %s,%s,%s", lat, lon, alt)
-            self.handlelocationeventtoxyz(txnemid, lat, lon, alt)
+            locations.append((txnemid, lat, lon, alt))
+        if not locations:
+            return
+
+        # convert all locations from lat/long/alt to x,y,z coordinates at once
+        nemids, lats, lons, alts = zip(*locations)
+        xs, ys, zs = self.session.location.getxyz_many(lats, lons, alts)
+        for nemid, lat, lon, alt, x, y, z in zip(nemids, lats, lons, alts, xs, ys, zs):
+            self.setnemlocation(nemid, lat, lon, alt, x, y, z)
 
     def handlelocationeventtoxyz(
         self, nemid: int, lat: float, lon: float, alt: float
@@ -805,6 +898,24 @@ class EmaneManager(ModelManager):
         into a node and x,y,z coordinate values, sending a Node Message.
         Returns True if successfully parsed and a Node Message was sent.
         """
+        x, y, z = self.session.location.getxyz(lat, lon, alt)
+        return self.setnemlocation(nemid, lat, lon, alt, x, y, z)
+
+    def setnemlocation(
+        self,
+        nemid: int,
+        lat: float,
+        lon: float,
+        alt: float,
+        x: float,
+        y: float,
+        z: float,
+    ) -> bool:
+        """
+        Set the node position for a NEM from a received location event, already
+        converted to x,y,z coordinate values, sending a Node Message.
+        Returns True if successfully parsed and a Node Message was sent.
+        """
         # convert nemid to node number
         _emanenode, netif = self.nemlookup(nemid)
         if netif is None:
@@ -812,8 +923,6 @@ class EmaneManager(ModelManager):
             return False
 
         n = netif.node.id
-        # convert from lat/long/alt to x,y,z coordinates
-        x, y, z = self.session.location.getxyz(lat, lon, alt)
         x = int(x)
         y = int(y)
         z = int(z)
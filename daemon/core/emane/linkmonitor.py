@@ -2,7 +2,8 @@ import logging
 import sched
 import threading
 import time
-from typing import TYPE_CHECKING, Dict, List, Tuple
+from concurrent import futures
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 import netaddr
 from lxml import etree
@@ -29,6 +30,7 @@ EMANE_80211 = "ieee80211abgmaclayer"
 EMANE_TDMA = "tdmaeventschedulerradiomodel"
 SINR_TABLE = "NeighborStatusTable"
 NEM_SELF = 65535
+MAX_POLL_WORKERS = 16
 
 
 class LossTable:
@@ -53,6 +55,8 @@ class LossTable:
 
 
 class EmaneLink:
+    __slots__ = ("from_nem", "to_nem", "sinr", "last_seen", "updated")
+
     def __init__(self, from_nem: int, to_nem: int, sinr: float) -> None:
         self.from_nem = from_nem
         self.to_nem = to_nem
@@ -62,7 +66,8 @@ class EmaneLink:
         self.touch()
 
     def update(self, sinr: float) -> None:
-        self.updated = self.sinr != sinr
+        # only changes visible within link labels are considered updates
+        self.updated = self.updated or round(self.sinr, 1) != round(sinr, 1)
         self.sinr = sinr
         self.touch()
 
@@ -76,6 +81,33 @@ class EmaneLink:
         return f"EmaneLink({self.from_nem}, {self.to_nem}, {self.sinr})"
 
 
+class PollMetrics:
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.last = 0.0
+        self.max = 0.0
+        self.total = 0.0
+
+    def record(self, latency: float) -> None:
+        self.count += 1
+        self.last = latency
+        self.max = max(self.max, latency)
+        self.total += latency
+
+    def to_dict(self) -> Dict[str, float]:
+        average = self.total / self.count if self.count else 0.0
+        return dict(
+            count=self.count,
+            errors=self.errors,
+            timeouts=self.timeouts,
+            last=self.last,
+            max=self.max,
+            average=average,
+        )
+
+
 class EmaneClient:
     def __init__(self, address: str) -> None:
         self.address = address
@@ -108,6 +140,16 @@ class EmaneClient:
     def check_links(
         self, links: Dict[Tuple[int, int], EmaneLink], loss_threshold: int
     ) -> None:
+        for from_nem, to_nem, sinr in self.get_links(loss_threshold):
+            link_key = (from_nem, to_nem)
+            link = links.get(link_key)
+            if link:
+                link.update(sinr)
+            else:
+                links[link_key] = EmaneLink(from_nem, to_nem, sinr)
+
+    def get_links(self, loss_threshold: int) -> List[Tuple[int, int, float]]:
+        links = []
         for from_nem, loss_table in self.nems.items():
             tables = self.client.getStatisticTable(loss_table.mac_id, (SINR_TABLE,))
             table = tables[SINR_TABLE][1:][0]
@@ -124,15 +166,10 @@ class EmaneClient:
                     continue
 
                 # check if valid link loss
-                link_key = (from_nem, to_nem)
                 loss = loss_table.get_loss(sinr)
                 if loss < loss_threshold:
-                    link = links.get(link_key)
-                    if link:
-                        link.update(sinr)
-                    else:
-                        link = EmaneLink(from_nem, to_nem, sinr)
-                        links[link_key] = link
+                    links.append((from_nem, to_nem, sinr))
+        return links
 
     def handle_tdma(self, config: Dict[str, Tuple]):
         pcr = config["pcrcurveuri"][0][0]
@@ -183,6 +220,9 @@ class EmaneLinkMonitor:
         self.link_timeout = None
         self.scheduler = None
         self.running = False
+        self.pool: Optional[futures.ThreadPoolExecutor] = None
+        self.polls: Dict[str, futures.Future] = {}
+        self.metrics: Dict[str, PollMetrics] = {}
 
     def start(self) -> None:
         self.loss_threshold = int(self.emane_manager.get_config("loss_threshold"))
@@ -221,21 +261,65 @@ class EmaneLinkMonitor:
                     break
         return addresses
 
-    def check_links(self) -> None:
-        # check for new links
-        previous_links = set(self.links.keys())
+    def poll_client(self, client: EmaneClient) -> List[Tuple[int, int, float]]:
+        metrics = self.metrics.setdefault(client.address, PollMetrics())
+        start = time.monotonic()
+        try:
+            return client.get_links(self.loss_threshold)
+        except Exception:
+            metrics.errors += 1
+            raise
+        finally:
+            metrics.record(time.monotonic() - start)
+
+    def poll_clients(self) -> List[Tuple[int, int, float]]:
+        if self.pool is None:
+            workers = max(1, min(len(self.clients), MAX_POLL_WORKERS))
+            self.pool = futures.ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="emane-links"
+            )
+
+        # poll clients concurrently, skipping clients still handling a prior poll
         for client in self.clients:
+            if client.address not in self.polls:
+                future = self.pool.submit(self.poll_client, client)
+                self.polls[client.address] = future
+        futures.wait(list(self.polls.values()), timeout=self.link_interval)
+
+        rows = []
+        for address, future in list(self.polls.items()):
+            if not future.done():
+                self.metrics.setdefault(address, PollMetrics()).timeouts += 1
+                logging.debug("link monitor poll timeout: %s", address)
+                continue
+            self.polls.pop(address)
             try:
-                client.check_links(self.links, self.loss_threshold)
+                rows.extend(future.result())
             except shell.ControlPortException:
                 if self.running:
-                    logging.exception("link monitor error")
+                    logging.exception("link monitor error: %s", address)
+        return rows
+
+    def get_metrics(self) -> Dict[str, Dict[str, float]]:
+        return {x: self.metrics[x].to_dict() for x in self.metrics}
+
+    def check_links(self) -> None:
+        # check for new links
+        previous_links = set(self.links.keys())
+        for from_nem, to_nem, sinr in self.poll_clients():
+            link_id = (from_nem, to_nem)
+            link = self.links.get(link_id)
+            if link:
+                link.update(sinr)
+            else:
+                self.links[link_id] = EmaneLink(from_nem, to_nem, sinr)
 
         # find new links
         current_links = set(self.links.keys())
         new_links = current_links - previous_links
 
         # find updated and dead links
+        updated_links = []
         dead_links = []
         for link_id, link in self.links.items():
             complete_id = self.get_complete_id(link_id)
@@ -243,24 +327,31 @@ class EmaneLinkMonitor:
                 dead_links.append(link_id)
             elif link.updated and complete_id in self.complete_links:
                 link.updated = False
-                self.send_link(MessageFlags.NONE, complete_id)
+                if complete_id not in updated_links:
+                    updated_links.append(complete_id)
+        self.send_links(MessageFlags.NONE, updated_links)
 
         # announce dead links
+        deleted_links = []
         for link_id in dead_links:
             complete_id = self.get_complete_id(link_id)
             if complete_id in self.complete_links:
                 self.complete_links.remove(complete_id)
-                self.send_link(MessageFlags.DELETE, complete_id)
+                deleted_links.append((complete_id, self.get_link_label(complete_id)))
+        for link_id in dead_links:
             del self.links[link_id]
+        self.send_labeled_links(MessageFlags.DELETE, deleted_links)
 
         # announce new links
+        added_links = []
         for link_id in new_links:
             complete_id = self.get_complete_id(link_id)
             if complete_id in self.complete_links:
                 continue
             if self.is_complete_link(link_id):
                 self.complete_links.add(complete_id)
-                self.send_link(MessageFlags.ADD, complete_id)
+                added_links.append(complete_id)
+        self.send_links(MessageFlags.ADD, added_links)
 
         if self.running:
             self.scheduler.enter(self.link_interval, 0, self.check_links)
@@ -284,12 +375,31 @@ class EmaneLinkMonitor:
         return f"{source_link.sinr:.1f} / {dest_link.sinr:.1f}"
 
     def send_link(self, message_type: MessageFlags, link_id: Tuple[int, int]) -> None:
-        nem_one, nem_two = link_id
-        link = self.emane_manager.get_nem_link(nem_one, nem_two, message_type)
-        if link:
-            label = self.get_link_label(link_id)
-            link.label = label
-            self.emane_manager.session.broadcast_link(link)
+        self.send_links(message_type, [link_id])
+
+    def send_links(
+        self, message_type: MessageFlags, link_ids: List[Tuple[int, int]]
+    ) -> None:
+        labeled = [(x, self.get_link_label(x)) for x in link_ids]
+        self.send_labeled_links(message_type, labeled)
+
+    def send_labeled_links(
+        self, message_type: MessageFlags, links: List[Tuple[Tuple[int, int], str]]
+    ) -> None:
+        if not links:
+            return
+        # ignore links for nems that are no longer known
+        emane_manager = self.emane_manager
+        links = [
+            x
+            for x in links
+            if emane_manager.nemlookup(x[0][0])[1] is not None
+            and emane_manager.nemlookup(x[0][1])[1] is not None
+        ]
+        link_datas = emane_manager.get_nem_links([x[0] for x in links], message_type)
+        for link_data, (_, label) in zip(link_datas, links):
+            link_data.label = label
+            emane_manager.session.broadcast_link(link_data)
 
     def send_message(
         self,
@@ -313,6 +423,10 @@ class EmaneLinkMonitor:
 
     def stop(self) -> None:
         self.running = False
+        if self.pool is not None:
+            self.pool.shutdown(wait=False)
+            self.pool = None
+        self.polls.clear()
         for client in self.clients:
             client.stop()
         self.clients.clear()
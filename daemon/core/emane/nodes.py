@@ -4,6 +4,8 @@ share the same MAC+PHY model.
 """
 
 import logging
+from concurrent.futures import Future
+from functools import partial
 from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Type
 
 from core.emulator.data import LinkData
@@ -16,6 +18,8 @@ from core.emulator.enumerations import (
     RegisterTlvs,
     TransportType,
 )
+from core.emulator.validator import device_ready
+from core.errors import CoreError
 from core.nodes.base import CoreNetworkBase
 from core.nodes.interface import CoreInterface
 
@@ -33,6 +37,10 @@ except ImportError:
     except ImportError:
         logging.debug("compatible emane python bindings not installed")
 
+# time in seconds to wait for emane to create tap devices, and time between checks
+TAP_TIMEOUT: float = 10.0
+TAP_PERIOD: float = 0.05
+
 
 class EmaneNet(CoreNetworkBase):
     """
@@ -56,7 +64,8 @@ class EmaneNet(CoreNetworkBase):
     ) -> None:
         super().__init__(session, _id, name, start, server)
         self.conf = ""
-        self.nemidmap = {}
+        self.nemidmap: Dict[CoreInterface, int] = {}
+        self.nemnetifs: Dict[int, CoreInterface] = {}
         self.model = None
         self.mobility = None
 
@@ -109,26 +118,43 @@ class EmaneNet(CoreNetworkBase):
         Record an interface to numerical ID mapping. The Emane controller
         object manages and assigns these IDs for all NEMs.
         """
+        self.clearnemid(netif)
         self.nemidmap[netif] = nemid
+        self.nemnetifs[nemid] = netif
+        self.session.emane.index_nem(nemid, self, netif)
+
+    def clearnemid(self, netif: CoreInterface) -> None:
+        """
+        Remove the numerical ID mapping for an interface, if one exists.
+        """
+        nemid = self.nemidmap.pop(netif, None)
+        if nemid is None:
+            return
+        if self.nemnetifs.get(nemid) is netif:
+            self.nemnetifs.pop(nemid)
+        self.session.emane.unindex_nem(nemid, netif)
 
     def getnemid(self, netif: CoreInterface) -> Optional[int]:
         """
         Given an interface, return its numerical ID.
         """
-        if netif not in self.nemidmap:
-            return None
-        else:
-            return self.nemidmap[netif]
+        return self.nemidmap.get(netif)
 
     def getnemnetif(self, nemid: int) -> Optional[CoreInterface]:
         """
-        Given a numerical NEM ID, return its interface. This returns the
-        first interface that matches the given NEM ID.
+        Given a numerical NEM ID, return its interface.
         """
-        for netif in self.nemidmap:
-            if self.nemidmap[netif] == nemid:
-                return netif
-        return None
+        return self.nemnetifs.get(nemid)
+
+    def detach(self, netif: CoreInterface) -> None:
+        """
+        Detach network interface, removing its numerical ID mapping.
+
+        :param netif: network interface to detach
+        :return: nothing
+        """
+        super().detach(netif)
+        self.clearnemid(netif)
 
     def netifs(self, sort: bool = True) -> List[CoreInterface]:
         """
@@ -136,11 +162,14 @@ class EmaneNet(CoreNetworkBase):
         """
         return sorted(self._netif.values(), key=lambda ifc: ifc.node.id)
 
-    def installnetifs(self) -> None:
+    def installnetifs(self) -> List[Future]:
         """
         Install TAP devices into their namespaces. This is done after
         EMANE daemons have been started, because that is their only chance
-        to bind to the TAPs.
+        to bind to the TAPs. Addresses are set for each TAP as soon as it
+        appears within its node.
+
+        :return: futures completing once each TAP has been installed
         """
         if (
             self.session.emane.genlocationevents()
@@ -150,12 +179,11 @@ class EmaneNet(CoreNetworkBase):
             warntxt += "Python bindings failed to load"
             logging.error(warntxt)
 
+        external = self.session.emane.get_config("external", self.id, self.model.name)
+        futures = []
         for netif in self.netifs():
-            external = self.session.emane.get_config(
-                "external", self.id, self.model.name
-            )
             if external == "0":
-                netif.setaddrs()
+                futures.append(self.installnetif(netif))
 
             if not self.session.emane.genlocationevents():
                 netif.poshook = None
@@ -165,6 +193,31 @@ class EmaneNet(CoreNetworkBase):
             # EMANE location events
             netif.poshook = self.setnemposition
             netif.setposition()
+        return futures
+
+    def installnetif(self, netif: CoreInterface) -> Future:
+        """
+        Wait for a TAP device to appear within its node and set its addresses.
+
+        :param netif: interface to install
+        :return: future completing once the interface has been installed
+        """
+        validator = self.session.validator
+        check = partial(device_ready, netif.node, netif.name)
+        error = CoreError(
+            f"node({netif.node.name}) emane device({netif.name}) failed to exist"
+        )
+        steps = [
+            partial(validator.validate, [check], TAP_TIMEOUT, TAP_PERIOD, error),
+            partial(self._setaddrs, netif),
+        ]
+        return validator.run_steps(steps)
+
+    def _setaddrs(self, netif: CoreInterface) -> Future:
+        netif.setaddrs()
+        future = Future()
+        future.set_result(True)
+        return future
 
     def deinstallnetifs(self) -> None:
         """
@@ -186,20 +239,42 @@ class EmaneNet(CoreNetworkBase):
         :param netif: interface to get nem emane position for
         :return: nem position tuple, None otherwise
         """
-        nemid = self.getnemid(netif)
-        ifname = netif.localname
-        if nemid is None:
-            logging.info("nemid for %s is unknown", ifname)
-            return
-        node = netif.node
-        x, y, z = node.getposition()
-        lat, lon, alt = self.session.location.getgeo(x, y, z)
-        if node.position.alt is not None:
-            alt = node.position.alt
-        node.position.set_geo(lon, lat, alt)
-        # altitude must be an integer or warning is printed
-        alt = int(round(alt))
-        return nemid, lon, lat, alt
+        positions = self._nem_positions([netif])
+        if positions:
+            return positions[0]
+        return None
+
+    def _nem_positions(
+        self, netifs: List[CoreInterface]
+    ) -> List[Tuple[int, float, float, float]]:
+        """
+        Creates nem positions for emane events for given interfaces, converting
+        all positions to geo at once.
+
+        :param netifs: interfaces to get nem emane positions for
+        :return: nem position tuples, for interfaces with a known nem
+        """
+        nems = []
+        for netif in netifs:
+            nemid = self.getnemid(netif)
+            if nemid is None:
+                logging.info("nemid for %s is unknown", netif.localname)
+                continue
+            nems.append((nemid, netif.node))
+        if not nems:
+            return []
+        xs, ys, zs = zip(*[node.getposition() for _, node in nems])
+        lats, lons, alts = self.session.location.getgeo_many(xs, ys, zs)
+        positions = []
+        for (nemid, node), lat, lon, alt in zip(nems, lats, lons, alts):
+            lat, lon, alt = float(lat), float(lon), float(alt)
+            if node.position.alt is not None:
+                alt = node.position.alt
+            node.position.set_geo(lon, lat, alt)
+            # altitude must be an integer or warning is printed
+            alt = int(round(alt))
+            positions.append((nemid, lon, lat, alt))
+        return positions
 
     def setnemposition(self, netif: CoreInterface) -> None:
         """
@@ -232,11 +307,8 @@ class EmaneNet(CoreNetworkBase):
             return
 
         event = LocationEvent()
-        for netif in moved_netifs:
-            position = self._nem_position(netif)
-            if position:
-                nemid, lon, lat, alt = position
-                event.append(nemid, latitude=lat, longitude=lon, altitude=alt)
+        for nemid, lon, lat, alt in self._nem_positions(moved_netifs):
+            event.append(nemid, latitude=lat, longitude=lon, altitude=alt)
         self.session.emane.service.publish(0, event)
 
     def all_link_data(self, flags: MessageFlags = MessageFlags.NONE) -> List[LinkData]:
@@ -246,6 +318,7 @@ class EmaneNet(CoreNetworkBase):
         emane_manager = self.session.emane
         emane_links = emane_manager.link_monitor.links
         considered = set()
+        nem_pairs = []
         for link_key in emane_links:
             considered_key = tuple(sorted(link_key))
             if considered_key in considered:
@@ -258,7 +331,6 @@ class EmaneNet(CoreNetworkBase):
             # ignore incomplete links
             if (nem2, nem1) not in emane_links:
                 continue
-            link = emane_manager.get_nem_link(nem1, nem2)
-            if link:
-                links.append(link)
+            nem_pairs.append((nem1, nem2))
+        links.extend(emane_manager.get_nem_links(nem_pairs))
         return links
@@ -2,20 +2,30 @@
 Defines distributed server functionality.
 """
 
+import base64
+import io
 import logging
 import os
+import queue
 import threading
+import uuid
 from collections import OrderedDict
+from contextlib import contextmanager
 from tempfile import NamedTemporaryFile
-from typing import TYPE_CHECKING, Callable, Dict, Tuple
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Set, Tuple
 
 import netaddr
 from fabric import Connection
 from invoke import UnexpectedExit
 
 from core import utils
-from core.errors import CoreCommandError
-from core.nodes.interface import GreTap
+from core.emulator import partition
+from core.emulator.executor import DISTRIBUTED_STAGE, LINK_STAGE
+from core.emulator.partition import PartitionGraph
+from core.errors import CoreCommandError, CoreError
+from core.nodes.base import CoreNetworkBase
+from core.nodes.interface import CoreInterface, GreTap, Vxlan
+from core.nodes.netclient import LinuxNetClient
 from core.nodes.network import CoreNetwork, CtrlNet
 
 if TYPE_CHECKING:
@@ -23,6 +33,8 @@ if TYPE_CHECKING:
 
 LOCK = threading.Lock()
 CMD_HIDE = True
+MAX_VLAN_ID = 4094
+DEFAULT_CONNECTIONS = 4
 
 
 class DistributedServer:
@@ -30,20 +42,56 @@ class DistributedServer:
     Provides distributed server interactions.
     """
 
-    def __init__(self, name: str, host: str) -> None:
+    def __init__(
+        self, name: str, host: str, connections: int = DEFAULT_CONNECTIONS
+    ) -> None:
         """
         Create a DistributedServer instance.
 
         :param name: convenience name to associate with host
         :param host: host to connect to
+        :param connections: maximum number of connections used concurrently
         """
         self.name: str = name
         self.host: str = host
         self.conn: Connection = Connection(host, user="root")
         self.lock: threading.Lock = threading.Lock()
+        self.max_connections: int = max(connections, 1)
+        self.connections: queue.LifoQueue = queue.LifoQueue()
+        self.connections.put(self.conn)
+        self.connection_count: int = 1
+
+    @contextmanager
+    def connection(self) -> Iterator[Connection]:
+        """
+        Borrow a connection from the server pool, creating a new connection when
+        all are in use and the pool has not reached its maximum size.
+
+        :return: connection to use
+        """
+        try:
+            conn = self.connections.get_nowait()
+        except queue.Empty:
+            with self.lock:
+                create = self.connection_count < self.max_connections
+                if create:
+                    self.connection_count += 1
+            if create:
+                conn = Connection(self.host, user="root")
+            else:
+                conn = self.connections.get()
+        try:
+            yield conn
+        finally:
+            self.connections.put(conn)
 
     def remote_cmd(
-        self, cmd: str, env: Dict[str, str] = None, cwd: str = None, wait: bool = True
+        self,
+        cmd: str,
+        env: Dict[str, str] = None,
+        cwd: str = None,
+        wait: bool = True,
+        data: bytes = None,
     ) -> str:
         """
         Run command remotely using server connection.
@@ -53,31 +101,104 @@ class DistributedServer:
         :param cwd: directory to run command in, defaults to None, which is the
             user's home directory
         :param wait: True to wait for status, False to background process
+        :param data: data to provide as standard input, default is None, sent
+            base64 encoded since remote input streams are text
         :return: stdout when success
         :raises CoreCommandError: when a non-zero exit status occurs
         """
 
         replace_env = env is not None
+        kwargs = dict(hide=CMD_HIDE, env=env, replace_env=replace_env)
+        if data is not None:
+            cmd = f"base64 -d | {cmd}"
+            kwargs["in_stream"] = io.StringIO(base64.encodebytes(data).decode())
         if not wait:
             cmd += " &"
         logging.debug(
             "remote cmd server(%s) cwd(%s) wait(%s): %s", self.host, cwd, wait, cmd
         )
         try:
-            if cwd is None:
-                result = self.conn.run(
-                    cmd, hide=CMD_HIDE, env=env, replace_env=replace_env
-                )
-            else:
-                with self.conn.cd(cwd):
-                    result = self.conn.run(
-                        cmd, hide=CMD_HIDE, env=env, replace_env=replace_env
-                    )
+            with self.connection() as conn:
+                if cwd is None:
+                    result = conn.run(cmd, **kwargs)
+                else:
+                    with conn.cd(cwd):
+                        result = conn.run(cmd, **kwargs)
             return result.stdout.strip()
         except UnexpectedExit as e:
             stdout, stderr = e.streams_for_display()
             raise CoreCommandError(e.result.exited, cmd, stdout, stderr)
 
+    def remote_batch(
+        self, cmds: List[str], env: Dict[str, str] = None, cwd: str = None
+    ) -> List[Tuple[int, str]]:
+        """
+        Run several commands remotely within a single round trip, collecting the
+        exit status and combined output of each command. A failing command does
+        not prevent following commands from running.
+
+        :param cmds: commands to run
+        :param env: environment for remote commands, default is None
+        :param cwd: directory to run commands in, defaults to None, which is the
+            user's home directory
+        :return: exit status and output for each command
+        """
+        if not cmds:
+            return []
+        marker = f"core-{uuid.uuid4().hex}"
+        script = "\n".join(
+            f'( {cmd} ) 2>&1; status=$?; echo; echo "{marker} $status"'
+            for cmd in cmds
+        )
+        replace_env = env is not None
+        logging.debug(
+            "remote batch server(%s) cwd(%s): %s", self.host, cwd, " ; ".join(cmds)
+        )
+        with self.connection() as conn:
+            if cwd is None:
+                result = conn.run(
+                    script, hide=CMD_HIDE, env=env, replace_env=replace_env, warn=True
+                )
+            else:
+                with conn.cd(cwd):
+                    result = conn.run(
+                        script,
+                        hide=CMD_HIDE,
+                        env=env,
+                        replace_env=replace_env,
+                        warn=True,
+                    )
+        results = []
+        lines = []
+        for line in result.stdout.splitlines():
+            if line.startswith(f"{marker} "):
+                status = int(line.split()[1])
+                results.append((status, "\n".join(lines).strip()))
+                lines = []
+            else:
+                lines.append(line)
+        if len(results) != len(cmds):
+            raise CoreCommandError(
+                result.exited, "; ".join(cmds), result.stdout, result.stderr
+            )
+        return results
+
+    def close(self) -> None:
+        """
+        Close all pooled connections to the server, which reconnect on next use.
+
+        :return: nothing
+        """
+        conns = []
+        while True:
+            try:
+                conns.append(self.connections.get_nowait())
+            except queue.Empty:
+                break
+        for conn in conns:
+            conn.close()
+            self.connections.put(conn)
+
     def remote_put(self, source: str, destination: str) -> None:
         """
         Push file to remote server.
@@ -86,8 +207,8 @@ class DistributedServer:
         :param destination: destination file location
         :return: nothing
         """
-        with self.lock:
-            self.conn.put(source, destination)
+        with self.connection() as conn:
+            conn.put(source, destination)
 
     def remote_put_temp(self, destination: str, data: str) -> None:
         """
@@ -98,14 +219,68 @@ class DistributedServer:
         :param data: data to store in remote file
         :return: nothing
         """
-        with self.lock:
-            temp = NamedTemporaryFile(delete=False)
-            temp.write(data.encode("utf-8"))
-            temp.close()
-            self.conn.put(temp.name, destination)
+        temp = NamedTemporaryFile(delete=False)
+        temp.write(data.encode("utf-8"))
+        temp.close()
+        try:
+            with self.connection() as conn:
+                conn.put(temp.name, destination)
+        finally:
             os.unlink(temp.name)
 
 
+class DistributedOverlay:
+    """
+    Multiplexed VXLAN overlay between the local host and a distributed server,
+    carrying each network spanning both on its own VLAN.
+    """
+
+    def __init__(self, local: Vxlan, remote: Vxlan) -> None:
+        """
+        Create a DistributedOverlay instance.
+
+        :param local: local VXLAN device
+        :param remote: VXLAN device on the distributed server
+        """
+        self.local: Vxlan = local
+        self.remote: Vxlan = remote
+        self.lock: threading.Lock = threading.Lock()
+        self.vlans: Dict[int, int] = {}
+
+    def add_network(self, node: CoreNetwork) -> int:
+        """
+        Carry a network over the overlay, adding a VLAN sub interface to its
+        bridge on both ends.
+
+        :param node: network to add
+        :return: VLAN id used for network
+        :raises CoreError: when no VLAN ids remain
+        """
+        with self.lock:
+            vlan_id = self.vlans.get(node.id)
+            if vlan_id is not None:
+                return vlan_id
+            vlan_id = len(self.vlans) + 1
+            if vlan_id > MAX_VLAN_ID:
+                raise CoreError(
+                    f"overlay({self.local.localname}) out of vlans for "
+                    f"node({node.name})"
+                )
+            self.local.add_vlan(vlan_id, node.brname)
+            self.remote.add_vlan(vlan_id, node.brname)
+            self.vlans[node.id] = vlan_id
+            return vlan_id
+
+    def shutdown(self) -> None:
+        """
+        Shutdown overlay devices on both ends.
+
+        :return: nothing
+        """
+        self.local.shutdown()
+        self.remote.shutdown()
+
+
 class DistributedController:
     """
     Provides logic for dealing with remote tunnels and distributed servers.
@@ -120,6 +295,9 @@ class DistributedController:
         self.session: "Session" = session
         self.servers: Dict[str, DistributedServer] = OrderedDict()
         self.tunnels: Dict[int, Tuple[GreTap, GreTap]] = {}
+        self.overlays: Dict[str, DistributedOverlay] = {}
+        self.tunnels_lock: threading.Lock = threading.Lock()
+        self.started: bool = False
         self.address: str = self.session.options.get_config(
             "distributed_address", default=None
         )
@@ -132,11 +310,34 @@ class DistributedController:
         :param host: distributed server host address
         :return: nothing
         """
-        server = DistributedServer(name, host)
+        connections = self.session.options.get_config_int(
+            "distributed_connections", default=DEFAULT_CONNECTIONS
+        )
+        server = DistributedServer(name, host, connections)
         self.servers[name] = server
         cmd = f"mkdir -p {self.session.session_dir}"
         server.remote_cmd(cmd)
 
+    def partition(self, graph: PartitionGraph = None) -> Dict[int, str]:
+        """
+        Propose an assignment of nodes to the local host and distributed servers,
+        balancing node weight per server while minimizing links between servers.
+
+        :param graph: graph of nodes to partition, defaults to the session topology
+        :return: mapping of node ids to server names, "" for the local host
+        """
+        if graph is None:
+            graph = partition.session_graph(self.session)
+        servers = [""] + list(self.servers)
+        assignment = partition.partition(graph, servers)
+        logging.info(
+            "partitioned nodes(%s) across servers(%s) with cross server links(%s)",
+            len(assignment),
+            len(servers),
+            graph.cut(assignment),
+        )
+        return assignment
+
     def execute(self, func: Callable[[DistributedServer], None]) -> None:
         """
         Convenience for executing logic against all distributed servers.
@@ -144,9 +345,16 @@ class DistributedController:
         :param func: function to run, that takes a DistributedServer as a parameter
         :return: nothing
         """
-        for name in self.servers:
-            server = self.servers[name]
-            func(server)
+        servers = list(self.servers.values())
+        if len(servers) <= 1:
+            for server in servers:
+                func(server)
+            return
+        # run against all servers in parallel
+        funcs = [(func, (server,), {}) for server in servers]
+        _, exceptions = self.session.executor.run(DISTRIBUTED_STAGE, funcs)
+        if exceptions:
+            raise exceptions[0]
 
     def shutdown(self) -> None:
         """
@@ -155,36 +363,165 @@ class DistributedController:
 
         :return: nothing
         """
-        # shutdown all tunnels
-        for key in self.tunnels:
-            tunnels = self.tunnels[key]
-            for tunnel in tunnels:
-                tunnel.shutdown()
-
-        # remove all remote session directories
-        for name in self.servers:
-            server = self.servers[name]
-            cmd = f"rm -rf {self.session.session_dir}"
-            server.remote_cmd(cmd)
+        # shutdown local tunnel devices, remote devices are removed per server
+        remote = {}
+        for local_tap, remote_tap in self.tunnels.values():
+            local_tap.shutdown()
+            remote.setdefault(remote_tap.server, []).append(remote_tap)
+        for overlay in self.overlays.values():
+            overlay.local.shutdown()
+            remote.setdefault(overlay.remote.server, []).append(overlay.remote)
+
+        # remove remote devices and session directories, one round trip per server
+        self.execute(lambda x: self.shutdown_server(x, remote.get(x, [])))
 
         # clear tunnels
         self.tunnels.clear()
+        self.overlays.clear()
+        self.started = False
+
+    def shutdown_server(
+        self, server: DistributedServer, devices: List[CoreInterface]
+    ) -> None:
+        """
+        Remove tunnel devices and the session directory from a distributed server,
+        along with manifest entries for the directory, within a single round trip.
+        Failures are logged and do not prevent following commands from running.
+
+        :param server: server to shutdown
+        :param devices: tunnel devices on server to remove
+        :return: nothing
+        """
+        cmds = []
+        net_client = LinuxNetClient(cmds.append)
+        for device in devices:
+            net_client.delete_device(device.localname)
+            device.localname = None
+        cmds.append(f"rm -rf {self.session.session_dir}")
+        results = server.remote_batch(cmds)
+        self.session.manifest.invalidate(self.session.session_dir, server)
+        for cmd, (status, output) in zip(cmds, results):
+            if status != 0:
+                logging.error(
+                    "server(%s) shutdown command failed(%s): %s %s",
+                    server.name,
+                    status,
+                    cmd,
+                    output,
+                )
+        server.close()
 
     def start(self) -> None:
         """
-        Start distributed network tunnels.
+        Start distributed network tunnels, only for networks with interfaces on
+        two or more hosts. Tunnels are created in parallel for each server.
 
         :return: nothing
         """
-        for node_id in self.session.nodes:
-            node = self.session.nodes[node_id]
-            if not isinstance(node, CoreNetwork):
-                continue
-            if isinstance(node, CtrlNet) and node.serverintf is not None:
+        self.started = True
+        server_nets = {}
+        for node in list(self.session.nodes.values()):
+            if not self.is_tunneled(node):
                 continue
-            for name in self.servers:
-                server = self.servers[name]
-                self.create_gre_tunnel(node, server)
+            for server in self.network_servers(node):
+                server_nets.setdefault(server, []).append(node)
+        funcs = []
+        for server, nets in server_nets.items():
+            funcs.append((self.create_tunnels, (nets, server), {}))
+        _, exceptions = self.session.executor.run(LINK_STAGE, funcs)
+        if exceptions:
+            raise exceptions[0]
+
+    def update_tunnels(self, node: CoreNetworkBase) -> None:
+        """
+        Create any tunnels a network needs after interfaces have been attached,
+        once tunnels have been started.
+
+        :param node: network to update tunnels for
+        :return: nothing
+        """
+        if not self.started or not self.is_tunneled(node):
+            return
+        for server in self.network_servers(node):
+            self.create_tunnel(node, server)
+
+    def is_tunneled(self, node: CoreNetworkBase) -> bool:
+        """
+        Determine if a network is bridged to servers using tunnels.
+
+        :param node: node to check
+        :return: True if network uses tunnels, False otherwise
+        """
+        if not isinstance(node, CoreNetwork) or node.is_direct:
+            return False
+        return not (isinstance(node, CtrlNet) and node.serverintf is not None)
+
+    def network_servers(self, node: CoreNetwork) -> Set[DistributedServer]:
+        """
+        Determine the distributed servers a network needs tunnels to, being the
+        servers of its interfaces when they span two or more hosts, including the
+        local host.
+
+        :param node: network to get servers for
+        :return: servers to tunnel network to, empty when network lives on one host
+        """
+        hosts = {x.server for x in node.netifs()}
+        if len(hosts) < 2:
+            return set()
+        hosts.discard(None)
+        return hosts
+
+    def create_tunnels(self, nodes: List[CoreNetwork], server: DistributedServer) -> None:
+        """
+        Create tunnels between the local and a remote server for networks.
+
+        :param nodes: networks to create tunnels for
+        :param server: server to create tunnels for
+        :return: nothing
+        """
+        for node in nodes:
+            self.create_tunnel(node, server)
+
+    def create_tunnel(self, node: CoreNetwork, server: DistributedServer) -> None:
+        """
+        Tunnel a network between the local and a remote server, using the
+        server overlay when enabled, otherwise a dedicated gre tunnel.
+
+        :param node: network to create tunnel for
+        :param server: server to create tunnel for
+        :return: nothing
+        """
+        if self.session.options.get_config("distributed_overlay") == "1":
+            overlay = self.create_overlay(server)
+            overlay.add_network(node)
+        else:
+            self.create_gre_tunnel(node, server)
+
+    def create_overlay(self, server: DistributedServer) -> DistributedOverlay:
+        """
+        Create the VXLAN overlay between the local and a remote server, when
+        it does not already exist.
+
+        :param server: server to create overlay for
+        :return: overlay for server
+        """
+        with self.tunnels_lock:
+            overlay = self.overlays.get(server.name)
+            if overlay is not None:
+                return overlay
+            index = list(self.servers).index(server.name) + 1
+            vni = ((self.session.id & 0xFFFF) << 8) | (index & 0xFF)
+            logging.info(
+                "overlay to remote(%s) from local(%s) vni(%s)",
+                server.host,
+                self.address,
+                vni,
+            )
+            local = Vxlan(self.session, index, server.host, vni)
+            remote = Vxlan(self.session, index, self.address, vni, server=server)
+            overlay = DistributedOverlay(local, remote)
+            self.overlays[server.name] = overlay
+            return overlay
 
     def create_gre_tunnel(
         self, node: CoreNetwork, server: DistributedServer
@@ -199,7 +536,8 @@ class DistributedController:
         """
         host = server.host
         key = self.tunnel_key(node.id, netaddr.IPAddress(host).value)
-        tunnel = self.tunnels.get(key)
+        with self.tunnels_lock:
+            tunnel = self.tunnels.get(key)
         if tunnel is not None:
             return tunnel
 
@@ -221,7 +559,8 @@ class DistributedController:
 
         # save tunnels for shutdown
         tunnel = (local_tap, remote_tap)
-        self.tunnels[key] = tunnel
+        with self.tunnels_lock:
+            self.tunnels[key] = tunnel
         return tunnel
 
     def tunnel_key(self, n1_id: int, n2_id: int) -> int:
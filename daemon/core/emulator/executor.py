@@ -0,0 +1,175 @@
+"""
+Defines the session executor, providing shared thread pools used to run session
+stages in parallel.
+"""
+
+import concurrent.futures
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Tuple
+
+if TYPE_CHECKING:
+    from core.emulator.session import Session
+
+# stages with their own pool, sized by the session option "<stage>_workers"
+NODE_STAGE: str = "node"
+LINK_STAGE: str = "link"
+SERVICE_STAGE: str = "service"
+SHUTDOWN_STAGE: str = "shutdown"
+DISTRIBUTED_STAGE: str = "distributed"
+DEFAULT_WORKERS: int = 10
+
+
+class StageTiming:
+    """
+    Tracks the time spent running a stage.
+    """
+
+    def __init__(self) -> None:
+        """
+        Create a StageTiming instance.
+        """
+        self.count: int = 0
+        self.total: float = 0.0
+        self.last: float = 0.0
+        self.max: float = 0.0
+
+    def add(self, duration: float) -> None:
+        """
+        Record time taken for a stage run.
+
+        :param duration: time in seconds
+        :return: nothing
+        """
+        self.count += 1
+        self.total += duration
+        self.last = duration
+        self.max = max(self.max, duration)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert timing to a dict.
+
+        :return: timing dict
+        """
+        return dict(count=self.count, total=self.total, last=self.last, max=self.max)
+
+
+class SessionExecutor:
+    """
+    Provides thread pools shared across a session, one per stage, that are
+    created on first use and sized using session options.
+    """
+
+    def __init__(self, session: "Session") -> None:
+        """
+        Create a SessionExecutor instance.
+
+        :param session: session the executor is for
+        """
+        self.session: "Session" = session
+        self.lock: threading.Lock = threading.Lock()
+        self.pools: Dict[str, concurrent.futures.ThreadPoolExecutor] = {}
+        self.pool_workers: Dict[str, int] = {}
+        self.timings: Dict[str, StageTiming] = {}
+
+    def workers(self, stage: str) -> int:
+        """
+        Retrieve the number of workers configured for a stage.
+
+        :param stage: stage to get workers for
+        :return: number of workers
+        """
+        workers = self.session.options.get_config_int(
+            f"{stage}_workers", default=DEFAULT_WORKERS
+        )
+        return max(workers, 1)
+
+    def _thread_prefix(self, stage: str) -> str:
+        return f"session-{self.session.id}-{stage}"
+
+    def get_pool(self, stage: str) -> concurrent.futures.ThreadPoolExecutor:
+        """
+        Retrieve the pool for a stage, creating it when needed or when the number
+        of configured workers has changed.
+
+        :param stage: stage to get pool for
+        :return: stage thread pool
+        """
+        workers = self.workers(stage)
+        with self.lock:
+            pool = self.pools.get(stage)
+            if pool is not None and self.pool_workers[stage] != workers:
+                pool.shutdown(wait=False)
+                pool = None
+            if pool is None:
+                pool = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix=self._thread_prefix(stage)
+                )
+                self.pools[stage] = pool
+                self.pool_workers[stage] = workers
+            return pool
+
+    def run(
+        self, stage: str, funcs: Iterable[Tuple[Callable, Iterable[Any], Dict[Any, Any]]]
+    ) -> Tuple[List[Any], List[Exception]]:
+        """
+        Run provided functions, arguments, and keywords within the pool for a stage,
+        collecting results and exceptions. Functions are run directly when called
+        from within a thread of the same stage, to avoid waiting on its own pool.
+
+        :param stage: stage to run functions for
+        :param funcs: iterable that provides a func, args, kwargs
+        :return: results and exceptions from running functions with args and kwargs
+        """
+        start = time.monotonic()
+        results = []
+        exceptions = []
+        current = threading.current_thread().name
+        if current.startswith(f"{self._thread_prefix(stage)}_"):
+            for func, args, kwargs in funcs:
+                try:
+                    results.append(func(*args, **kwargs))
+                except Exception as e:
+                    logging.exception("stage(%s) exception", stage)
+                    exceptions.append(e)
+        else:
+            pool = self.get_pool(stage)
+            futures = []
+            for func, args, kwargs in funcs:
+                future = pool.submit(func, *args, **kwargs)
+                futures.append(future)
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logging.exception("stage(%s) exception", stage)
+                    exceptions.append(e)
+        duration = time.monotonic() - start
+        with self.lock:
+            self.timings.setdefault(stage, StageTiming()).add(duration)
+        logging.debug("session(%s) stage(%s) time: %s", self.session.id, stage, duration)
+        return results, exceptions
+
+    def get_timings(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Retrieve timing recorded for each stage that has been run.
+
+        :return: dict of stage to timing values
+        """
+        with self.lock:
+            return {x: y.to_dict() for x, y in self.timings.items()}
+
+    def shutdown(self) -> None:
+        """
+        Shutdown all stage pools, pools will be recreated when used again.
+
+        :return: nothing
+        """
+        with self.lock:
+            pools = list(self.pools.values())
+            self.pools.clear()
+            self.pool_workers.clear()
+        for pool in pools:
+            pool.shutdown(wait=True)
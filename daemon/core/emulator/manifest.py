@@ -0,0 +1,194 @@
+"""
+Defines the file manifest, tracking content hashes of generated files to skip
+writing files that have not changed within a session. The manifest is kept in
+memory for the life of a session, the saved manifest file is only a report and
+is never loaded.
+
+Directories removed on shutdown invalidate their entries, so node files are
+written again on every node start. Files are reused when they are regenerated
+while their directory remains, such as EMANE XML within the session directory
+when a session is instantiated again after being cleared, and service files
+when services are reconfigured within a running session.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from core.emulator.distributed import DistributedServer
+
+
+class FileManifest:
+    """
+    Tracks content hashes of files written by a session, for reuse within the
+    session. Local files must also match their recorded size and modification
+    time to be considered unchanged, remote files are trusted until invalidated.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Create a FileManifest instance.
+
+        :param path: path to save manifest to
+        """
+        self.path: str = path
+        self.lock: threading.Lock = threading.Lock()
+        self.entries: Dict[str, List] = {}
+        self.written: int = 0
+        self.reused: int = 0
+
+    def _key(self, path: str, server: Optional["DistributedServer"]) -> str:
+        if server is None:
+            return path
+        return f"{server.name}:{path}"
+
+    def _stat(self, path: str) -> Optional[List[int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def unchanged(
+        self, path: str, data: bytes, server: "DistributedServer" = None
+    ) -> bool:
+        """
+        Check if a file was previously written with the same data.
+
+        :param path: path of file
+        :param data: data for file
+        :param server: server file is on, None for localhost
+        :return: True if file is unchanged, False otherwise
+        """
+        key = self._key(path, server)
+        digest = hashlib.sha256(data).hexdigest()
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry is None or entry[0] != digest:
+            return False
+        if server is None:
+            return entry[1:] == self._stat(path)
+        return True
+
+    def update(self, path: str, data: bytes, server: "DistributedServer" = None) -> None:
+        """
+        Record data written to a file.
+
+        :param path: path of file
+        :param data: data written to file
+        :param server: server file is on, None for localhost
+        :return: nothing
+        """
+        key = self._key(path, server)
+        entry = [hashlib.sha256(data).hexdigest()]
+        if server is None:
+            entry.extend(self._stat(path) or [])
+        with self.lock:
+            self.entries[key] = entry
+
+    def write(
+        self,
+        path: str,
+        data: bytes,
+        func: Callable[[], None],
+        server: "DistributedServer" = None,
+    ) -> bool:
+        """
+        Write a file using the provided function, unless it is unchanged.
+
+        :param path: path of file
+        :param data: data identifying file contents
+        :param func: function writing file
+        :param server: server file is on, None for localhost
+        :return: True if file was written, False if it was reused
+        """
+        if self.unchanged(path, data, server):
+            with self.lock:
+                self.reused += 1
+            return False
+        func()
+        self.update(path, data, server)
+        with self.lock:
+            self.written += 1
+        return True
+
+    def write_many(
+        self,
+        files: List[Tuple[str, bytes]],
+        func: Callable[[List[int]], None],
+        server: "DistributedServer" = None,
+    ) -> List[int]:
+        """
+        Write several files at once using the provided function, skipping files
+        that are unchanged.
+
+        :param files: path and data identifying contents of each file
+        :param func: function writing files, given indexes of the files to write
+        :param server: server files are on, None for localhost
+        :return: indexes of files written
+        """
+        indexes = [
+            i
+            for i, (path, data) in enumerate(files)
+            if not self.unchanged(path, data, server)
+        ]
+        if indexes:
+            func(indexes)
+        for index in indexes:
+            path, data = files[index]
+            self.update(path, data, server)
+        with self.lock:
+            self.written += len(indexes)
+            self.reused += len(files) - len(indexes)
+        return indexes
+
+    def invalidate(self, prefix: str, server: "DistributedServer" = None) -> None:
+        """
+        Remove entries for files within a directory, such as when it is removed.
+
+        :param prefix: directory files are within
+        :param server: server directory is on, None for localhost
+        :return: nothing
+        """
+        prefix = self._key(os.path.join(prefix, ""), server)
+        with self.lock:
+            for key in [x for x in self.entries if x.startswith(prefix)]:
+                self.entries.pop(key)
+
+    def reset_stats(self) -> None:
+        """
+        Reset written and reused file counts.
+
+        :return: nothing
+        """
+        with self.lock:
+            self.written = 0
+            self.reused = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Retrieve written and reused file counts.
+
+        :return: dict of file counts
+        """
+        with self.lock:
+            return dict(written=self.written, reused=self.reused)
+
+    def save(self) -> None:
+        """
+        Save manifest entries and file counts to the manifest path, as a report
+        of the last instantiation.
+
+        :return: nothing
+        """
+        with self.lock:
+            data = dict(entries=self.entries, written=self.written, reused=self.reused)
+            try:
+                with open(self.path, "w") as f:
+                    json.dump(data, f, indent=2)
+            except IOError:
+                logging.exception("error writing file manifest: %s", self.path)
@@ -0,0 +1,241 @@
+"""
+Partitions session topologies across distributed servers, balancing node weight
+per server while minimizing links between servers.
+"""
+
+import heapq
+from collections import defaultdict
+from typing import TYPE_CHECKING, Dict, List, Optional, Type
+
+from core.errors import CoreError
+from core.nodes.base import CoreNetworkBase, CoreNode, NodeBase
+from core.nodes.network import CtrlNet, HubNode, PtpNet, SwitchNode, WlanNode
+
+if TYPE_CHECKING:
+    from core.emulator.session import Session
+
+# allowed fraction over an even share of weight per server
+IMBALANCE: float = 0.1
+# maximum number of refinement passes over all nodes
+PASSES: int = 10
+# networks that may be placed on any server, following their nodes
+PARTITION_NETS = (SwitchNode, HubNode, WlanNode, PtpNet)
+
+
+def partition_weight(cls: Type[NodeBase], services: int) -> Optional[int]:
+    """
+    Determine the weight of a node for partitioning, based on its services.
+
+    :param cls: node class
+    :param services: number of services for node
+    :return: node weight, None when node must remain on its current server
+    """
+    if issubclass(cls, CoreNode):
+        return 1 + services
+    elif issubclass(cls, PARTITION_NETS):
+        return 0
+    return None
+
+
+class PartitionGraph:
+    """
+    Weighted graph of nodes and links to partition, where nodes may be pinned to
+    a server.
+    """
+
+    def __init__(self) -> None:
+        """
+        Create a PartitionGraph instance.
+        """
+        self.weights: Dict[int, int] = {}
+        self.pinned: Dict[int, str] = {}
+        self.edges: Dict[int, Dict[int, int]] = {}
+
+    def add_node(self, node_id: int, weight: int, server: str = None) -> None:
+        """
+        Add a node to the graph.
+
+        :param node_id: id of node
+        :param weight: weight of node
+        :param server: server to pin node to, "" for localhost, None to allow
+            any server
+        :return: nothing
+        """
+        self.weights[node_id] = weight
+        self.edges.setdefault(node_id, {})
+        if server is not None:
+            self.pinned[node_id] = server
+
+    def add_link(self, node_one: int, node_two: int, weight: int = 1) -> None:
+        """
+        Add a link between two nodes, ignoring links for unknown nodes.
+
+        :param node_one: id of first node
+        :param node_two: id of second node
+        :param weight: weight of link
+        :return: nothing
+        """
+        if node_one == node_two:
+            return
+        if node_one not in self.weights or node_two not in self.weights:
+            return
+        edges = self.edges[node_one]
+        edges[node_two] = edges.get(node_two, 0) + weight
+        edges = self.edges[node_two]
+        edges[node_one] = edges.get(node_one, 0) + weight
+
+    def cut(self, assignment: Dict[int, str]) -> int:
+        """
+        Calculate the weight of links between servers for an assignment.
+
+        :param assignment: mapping of node ids to servers
+        :return: weight of links between servers
+        """
+        cut = 0
+        for node_one, edges in self.edges.items():
+            for node_two, weight in edges.items():
+                if node_one < node_two and assignment[node_one] != assignment[node_two]:
+                    cut += weight
+        return cut
+
+
+def session_graph(session: "Session") -> PartitionGraph:
+    """
+    Create a partition graph from the nodes and links of a session, allowing nodes
+    that can be moved to be placed on any server.
+
+    :param session: session to create graph for
+    :return: partition graph
+    """
+    graph = PartitionGraph()
+    with session._nodes_lock:
+        nodes = [x for x in session.nodes.values() if not isinstance(x, CtrlNet)]
+    for node in nodes:
+        services = 0
+        if isinstance(node, CoreNode):
+            services = len(node.services) + len(node.config_services)
+        weight = partition_weight(node.__class__, services)
+        if weight is None:
+            server = node.server.name if node.server else ""
+            graph.add_node(node.id, 0, server)
+        else:
+            graph.add_node(node.id, weight)
+    for net in nodes:
+        if not isinstance(net, CoreNetworkBase):
+            continue
+        for netif in net.netifs():
+            if netif.node is not None:
+                graph.add_link(net.id, netif.node.id)
+            elif netif.othernet is not None:
+                graph.add_link(net.id, netif.othernet.id)
+    return graph
+
+
+def partition(
+    graph: PartitionGraph, servers: List[str], imbalance: float = IMBALANCE
+) -> Dict[int, str]:
+    """
+    Partition graph nodes across servers. Nodes are first assigned by growing
+    each server's partition from connected nodes, then moved between servers while
+    doing so reduces the weight of links between servers or improves balance.
+
+    :param graph: graph to partition
+    :param servers: names of servers to assign nodes to, "" for localhost
+    :param imbalance: allowed fraction over an even share of weight per server,
+        while always allowing a single node over an even share
+    :return: mapping of node ids to servers
+    :raises CoreError: when no servers are provided
+    """
+    if not servers:
+        raise CoreError("no servers provided to partition nodes across")
+    assignment = dict(graph.pinned)
+    loads = {x: 0 for x in servers}
+    for node_id, server in graph.pinned.items():
+        if server in loads:
+            loads[server] += graph.weights[node_id]
+    total = sum(graph.weights.values())
+    target = total / len(servers)
+    # allow at least a single node over an even share, for coarse weights
+    largest = max(graph.weights.values(), default=0)
+    limit = max(target * (1 + imbalance), target + largest)
+    _grow(graph, servers, assignment, loads, target)
+    _refine(graph, servers, assignment, loads, limit)
+    return assignment
+
+
+def _grow(
+    graph: PartitionGraph,
+    servers: List[str],
+    assignment: Dict[int, str],
+    loads: Dict[str, int],
+    target: float,
+) -> None:
+    order = sorted(x for x in graph.weights if x not in assignment)
+    remaining = len(order)
+    seeds = iter(order)
+    for index, server in enumerate(servers):
+        last = index == len(servers) - 1
+        connections = defaultdict(int)
+        heap = []
+
+        def connect(node_id: int) -> None:
+            for peer, weight in graph.edges[node_id].items():
+                if peer not in assignment:
+                    connections[peer] += weight
+                    heapq.heappush(heap, (-connections[peer], peer))
+
+        for node_id, pinned in graph.pinned.items():
+            if pinned == server:
+                connect(node_id)
+        while remaining and (last or loads[server] < target):
+            node_id = None
+            while heap:
+                connection, peer = heapq.heappop(heap)
+                if peer not in assignment and -connection == connections[peer]:
+                    node_id = peer
+                    break
+            if node_id is None:
+                node_id = next(x for x in seeds if x not in assignment)
+            assignment[node_id] = server
+            loads[server] += graph.weights[node_id]
+            connect(node_id)
+            remaining -= 1
+
+
+def _refine(
+    graph: PartitionGraph,
+    servers: List[str],
+    assignment: Dict[int, str],
+    loads: Dict[str, int],
+    limit: float,
+) -> None:
+    movable = sorted(x for x in graph.weights if x not in graph.pinned)
+    for _ in range(PASSES):
+        moved = False
+        for node_id in movable:
+            current = assignment[node_id]
+            weight = graph.weights[node_id]
+            links = defaultdict(int)
+            for peer, link_weight in graph.edges[node_id].items():
+                links[assignment[peer]] += link_weight
+            overloaded = loads[current] > limit
+            best = None
+            best_key = None
+            for server in servers:
+                if server == current:
+                    continue
+                if weight and loads[server] + weight > limit:
+                    continue
+                gain = links[server] - links[current]
+                balances = weight > 0 and loads[server] + weight < loads[current]
+                if gain > 0 or ((gain == 0 or overloaded) and balances):
+                    key = (gain, -loads[server])
+                    if best_key is None or key > best_key:
+                        best, best_key = server, key
+            if best is not None:
+                assignment[node_id] = best
+                loads[current] -= weight
+                loads[best] += weight
+                moved = True
+        if not moved:
+            break
@@ -0,0 +1,154 @@
+"""
+Defines the session profiler, recording time spent booting a session.
+"""
+
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+# categories of timings recorded
+PHASE: str = "phases"
+NODE: str = "nodes"
+SERVICE: str = "services"
+COMMAND: str = "commands"
+CATEGORIES: List[str] = [PHASE, NODE, SERVICE, COMMAND]
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """
+    Calculate a percentile using the nearest rank method.
+
+    :param values: sorted values to calculate percentile for
+    :param percent: percentile to calculate, 0-100
+    :return: percentile value, 0 when there are no values
+    """
+    if not values:
+        return 0.0
+    index = max(math.ceil(percent / 100.0 * len(values)) - 1, 0)
+    return values[index]
+
+
+def summarize(name: str, values: List[float]) -> Dict[str, Any]:
+    """
+    Summarize a list of timings.
+
+    :param name: name for timings
+    :param values: timings in seconds
+    :return: dict of timing summary values
+    """
+    values = sorted(values)
+    return dict(
+        name=name,
+        count=len(values),
+        total=sum(values),
+        p50=percentile(values, 50),
+        p99=percentile(values, 99),
+        max=values[-1] if values else 0.0,
+    )
+
+
+class SessionProfiler:
+    """
+    Records wall time for session boot phases, node boots, service starts and
+    commands, while active during session instantiation.
+    """
+
+    def __init__(self) -> None:
+        """
+        Create a SessionProfiler instance.
+        """
+        self.lock: threading.Lock = threading.Lock()
+        self.active: bool = False
+        self.timings: Dict[str, Dict[str, List[float]]] = {x: {} for x in CATEGORIES}
+
+    def start(self) -> None:
+        """
+        Start recording, clearing any previous timings. Has no effect when already
+        started, as instantiation may be resumed, such as after emane configuration.
+
+        :return: nothing
+        """
+        with self.lock:
+            if self.active:
+                return
+            self.active = True
+            for category in self.timings.values():
+                category.clear()
+
+    def stop(self) -> None:
+        """
+        Stop recording, keeping timings recorded.
+
+        :return: nothing
+        """
+        with self.lock:
+            self.active = False
+
+    def record(self, category: str, name: str, duration: float) -> None:
+        """
+        Record a timing, when active.
+
+        :param category: category to record timing within
+        :param name: name to record timing for
+        :param duration: time in seconds
+        :return: nothing
+        """
+        with self.lock:
+            if not self.active:
+                return
+            self.timings[category].setdefault(name, []).append(duration)
+
+    @contextmanager
+    def timer(self, category: str, name: str) -> Iterator[None]:
+        """
+        Context manager recording the time spent within it.
+
+        :param category: category to record timing within
+        :param name: name to record timing for
+        :return: nothing
+        """
+        if not self.active:
+            yield
+            return
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record(category, name, time.monotonic() - start)
+
+    def summary(self, limit: int = 10) -> Dict[str, Dict[str, Any]]:
+        """
+        Summarize recorded timings, providing stats across each category and the
+        slowest names within each category.
+
+        :param limit: max number of slowest names to provide for each category
+        :return: dict of category to stats and slowest timings
+        """
+        with self.lock:
+            timings = {x: dict(y) for x, y in self.timings.items()}
+        summary = {}
+        for category, names in timings.items():
+            values = [x for y in names.values() for x in y]
+            slowest = [summarize(x, y) for x, y in names.items()]
+            slowest.sort(key=lambda x: x["max"], reverse=True)
+            summary[category] = dict(
+                stats=summarize(category, values), slowest=slowest[:limit]
+            )
+        return summary
+
+    def write(self, path: str, **extra: Any) -> None:
+        """
+        Write a summary of recorded timings to a json file.
+
+        :param path: path to write file to
+        :param extra: additional values to include within the file
+        :return: nothing
+        :raises IOError: when the file can not be written
+        """
+        data = self.summary()
+        data.update(extra)
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
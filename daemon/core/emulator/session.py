@@ -15,6 +15,7 @@ import time
 from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type, TypeVar
 
 from core import constants, utils
+from core.configservice.base import TEMPLATE_CACHE
 from core.configservice.manager import ConfigServiceManager
 from core.emane.emanemanager import EmaneManager
 from core.emane.nodes import EmaneNet
@@ -35,7 +36,11 @@ from core.emulator.enumerations import (
     MessageFlags,
     NodeTypes,
 )
+from core.emulator.executor import NODE_STAGE, SHUTDOWN_STAGE, SessionExecutor
+from core.emulator.manifest import FileManifest
+from core.emulator.profiler import NODE, PHASE, SessionProfiler
 from core.emulator.sessionconfig import SessionConfig
+from core.emulator.validator import ServiceValidator
 from core.errors import CoreError
 from core.location.event import EventLoop
 from core.location.geo import GeoLocation
@@ -46,6 +51,7 @@ from core.nodes.interface import CoreInterface
 from core.nodes.lxd import LxcNode
 from core.nodes.network import (
     CtrlNet,
+    DirectPtpNet,
     GreTapBridge,
     HubNode,
     PtpNet,
@@ -76,6 +82,7 @@ NODES = {
     NodeTypes.LXC: LxcNode,
 }
 NODES_TYPE = {NODES[x]: x for x in NODES}
+NODES_TYPE[DirectPtpNet] = NodeTypes.PEER_TO_PEER
 CONTAINER_NODES = {DockerNode, LxcNode}
 CTRL_NET_ID = 9001
 LINK_COLORS = ["green", "blue", "orange", "purple", "turquoise"]
@@ -144,6 +151,22 @@ class Session:
             self.options.set_config(key, value)
         self.metadata: Dict[str, str] = {}
 
+        # shared thread pools for running session stages
+        self.executor: SessionExecutor = SessionExecutor(self)
+
+        # scheduling of service validation
+        self.validator: ServiceValidator = ServiceValidator(self)
+
+        # timing of session instantiation
+        self.profiler: SessionProfiler = SessionProfiler()
+        self._profile_file: str = os.path.join(self.session_dir, "profile.json")
+
+        # content hashes of generated files, to skip rewriting unchanged files
+        # within this session
+        self.manifest: FileManifest = FileManifest(
+            os.path.join(self.session_dir, "manifest.json")
+        )
+
         # distributed support and logic
         self.distributed: DistributedController = DistributedController(self)
 
@@ -243,6 +266,22 @@ class Session:
         )
         return node_one, node_two, net_one, net_two
 
+    def _direct_ptp(self, node_one: NodeBase, node_two: NodeBase) -> bool:
+        """
+        Determine if nodes should be linked directly using a single veth pair,
+        which requires the option to be enabled and both nodes to be namespace
+        nodes on the same server.
+
+        :param node_one: node one
+        :param node_two: node two
+        :return: True to link nodes directly, False to use a bridge
+        """
+        if self.options.get_config("ptp_veth") != "1":
+            return False
+        if not isinstance(node_one, CoreNode) or not isinstance(node_two, CoreNode):
+            return False
+        return node_one.server == node_two.server
+
     def _link_wireless(self, objects: Iterable[CoreNodeBase], connect: bool) -> None:
         """
         Objects to deal with when connecting/disconnecting wireless links.
@@ -334,7 +373,10 @@ class Session:
                         node_two.name,
                     )
                     start = self.state.should_start()
-                    net_one = self.create_node(PtpNet, start=start)
+                    ptp_class = PtpNet
+                    if self._direct_ptp(node_one, node_two):
+                        ptp_class = DirectPtpNet
+                    net_one = self.create_node(ptp_class, start=start)
 
                 # node to network
                 if node_one and net_one:
@@ -345,9 +387,6 @@ class Session:
                     )
                     ifindex = node_one.newnetif(net_one, interface_one)
                     node_one_interface = node_one.netif(ifindex)
-                    wireless_net = isinstance(net_one, (EmaneNet, WlanNode))
-                    if not wireless_net:
-                        net_one.linkconfig(node_one_interface, options)
 
                 # network to node
                 if node_two and net_one:
@@ -358,9 +397,18 @@ class Session:
                     )
                     ifindex = node_two.newnetif(net_one, interface_two)
                     node_two_interface = node_two.netif(ifindex)
-                    wireless_net = isinstance(net_one, (EmaneNet, WlanNode))
-                    if not options.unidirectional and not wireless_net:
-                        net_one.linkconfig(node_two_interface, options)
+
+                # configure links once both interfaces exist, as direct links
+                # shape traffic on the peer interface
+                wireless_net = isinstance(net_one, (EmaneNet, WlanNode))
+                if node_one_interface and not wireless_net:
+                    net_one.linkconfig(node_one_interface, options)
+                if (
+                    node_two_interface
+                    and not options.unidirectional
+                    and not wireless_net
+                ):
+                    net_one.linkconfig(node_two_interface, options)
 
                 # network to network
                 if net_one and net_two:
@@ -402,6 +450,11 @@ class Session:
             if node_two:
                 node_two.lock.release()
 
+        # networks may now span servers, needing tunnels
+        for net in (net_one, net_two):
+            if net:
+                self.distributed.update_tunnels(net)
+
         self.sdt.add_link(node_one_id, node_two_id)
         return node_one_interface, node_two_interface
 
@@ -756,6 +809,71 @@ class Session:
         elif not has_empty_position:
             node.setposition(x, y, None)
 
+    def move_nodes(
+        self, moves: List[Tuple[int, NodeOptions]], source: str = None
+    ) -> List[NodeBase]:
+        """
+        Move several nodes at once, using the last move provided for each node.
+        Positions are set without invoking interface position hooks, range and
+        emane positions are then updated once per network, and a single node
+        event is broadcast per moved node.
+
+        :param moves: node ids and options with positions to move to
+        :param source: source of moves, None by default
+        :return: moved nodes
+        :raises core.CoreError: when a node to move does not exist
+        """
+        positions = {}
+        for node_id, options in moves:
+            positions[node_id] = (self.get_node(node_id, NodeBase), options)
+
+        # convert all geo moves to x,y at once
+        geo_moves = []
+        for node, options in positions.values():
+            has_empty_position = options.x is None and options.y is None
+            has_lat_lon_alt = None not in (options.lat, options.lon, options.alt)
+            if has_empty_position and has_lat_lon_alt:
+                geo_moves.append((node.id, options.lat, options.lon, options.alt))
+        geo_positions = {}
+        if geo_moves:
+            node_ids, lats, lons, alts = zip(*geo_moves)
+            xs, ys, _ = self.location.getxyz_many(lats, lons, alts)
+            for node_id, x, y in zip(node_ids, xs, ys):
+                geo_positions[node_id] = (float(x), float(y))
+
+        moved = []
+        moved_netifs = {}
+        for node, options in positions.values():
+            if node.id in geo_positions:
+                x, y = geo_positions[node.id]
+                changed = node.position.set(x, y, None)
+                node.position.set_geo(options.lon, options.lat, options.alt)
+            elif options.x is not None or options.y is not None:
+                changed = node.position.set(options.x, options.y, None)
+            else:
+                continue
+            if not changed:
+                continue
+            moved.append(node)
+            if isinstance(node, CoreNodeBase):
+                for netif in node.netifs(sort=True):
+                    if netif.net is not None:
+                        moved_netifs.setdefault(netif.net, []).append(netif)
+
+        # update each network once, after all nodes have moved
+        for net, netifs in moved_netifs.items():
+            if isinstance(net, EmaneNet):
+                net.setnempositions(netifs)
+            elif isinstance(net, WlanNode) and net.model:
+                nodes = [x.node for x in netifs]
+                net.model.update(nodes, netifs)
+
+        for node in moved:
+            _, options = positions[node.id]
+            self.broadcast_node(node, source=source)
+            self.sdt.edit_node(node, options.lon, options.lat, options.alt)
+        return moved
+
     def start_mobility(self, node_ids: List[int] = None) -> None:
         """
         Start mobility for the provided node ids.
@@ -924,6 +1042,10 @@ class Session:
         for handler in self.shutdown_handlers:
             handler(self)
 
+        # stop service validation and shutdown stage thread pools
+        self.validator.shutdown()
+        self.executor.shutdown()
+
     def broadcast_event(self, event_data: EventData) -> None:
         """
         Handle event data that should be provided to event handler.
@@ -1041,6 +1163,31 @@ class Session:
         except IOError:
             logging.exception("error writing state file: %s", state.name)
 
+    def get_profile(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Retrieve timings recorded during session instantiation.
+
+        :return: dict of timing category to stats and slowest timings
+        """
+        return self.profiler.summary()
+
+    def write_profile(self) -> None:
+        """
+        Write timings recorded during session instantiation to a profile file in
+        the session dir.
+
+        :return: nothing
+        """
+        try:
+            stages = self.executor.get_timings()
+            templates = TEMPLATE_CACHE.stats()
+            files = self.manifest.stats()
+            self.profiler.write(
+                self._profile_file, stages=stages, templates=templates, files=files
+            )
+        except IOError:
+            logging.exception("error writing profile file: %s", self._profile_file)
+
     def run_hooks(self, state: EventTypes) -> None:
         """
         Run hook scripts upon changing states. If hooks is not specified, run all hooks
@@ -1368,7 +1515,7 @@ class Session:
                 _, node = self.nodes.popitem()
                 self.sdt.delete_node(node.id)
                 funcs.append((node.shutdown, [], {}))
-            utils.threadpool(funcs)
+            self.executor.run(SHUTDOWN_STAGE, funcs)
 
     def write_nodes(self) -> None:
         """
@@ -1428,34 +1575,56 @@ class Session:
 
         :return: list of service boot errors during startup
         """
+        # record timings until instantiation completes
+        self.profiler.start()
+        self.manifest.reset_stats()
+
         # write current nodes out to session directory file
         self.write_nodes()
 
         # create control net interfaces and network tunnels
         # which need to exist for emane to sync on location events
         # in distributed scenarios
-        self.add_remove_control_net(0, remove=False)
+        with self.profiler.timer(PHASE, "control_net"):
+            self.add_remove_control_net(0, remove=False)
 
         # initialize distributed tunnels
-        self.distributed.start()
+        with self.profiler.timer(PHASE, "distributed"):
+            self.distributed.start()
 
         # instantiate will be invoked again upon emane configure
-        if self.emane.startup() == self.emane.NOT_READY:
+        with self.profiler.timer(PHASE, "emane"):
+            emane_status = self.emane.startup()
+        if emane_status == self.emane.NOT_READY:
             return []
 
-        # boot node services and then start mobility
-        exceptions = self.boot_nodes()
-        if not exceptions:
-            self.mobility.startup()
-
-            # notify listeners that instantiation is complete
-            event = EventData(event_type=EventTypes.INSTANTIATION_COMPLETE)
-            self.broadcast_event(event)
-
-            # assume either all nodes have booted already, or there are some
-            # nodes on slave servers that will be booted and those servers will
-            # send a node status response message
-            self.check_runtime()
+        try:
+            # boot node services and then start mobility
+            with self.profiler.timer(PHASE, "boot_nodes"):
+                exceptions = self.boot_nodes()
+            if not exceptions:
+                with self.profiler.timer(PHASE, "mobility"):
+                    self.mobility.startup()
+
+                # notify listeners that instantiation is complete
+                event = EventData(event_type=EventTypes.INSTANTIATION_COMPLETE)
+                self.broadcast_event(event)
+
+                # assume either all nodes have booted already, or there are some
+                # nodes on slave servers that will be booted and those servers will
+                # send a node status response message
+                self.check_runtime()
+        finally:
+            self.profiler.stop()
+            self.write_profile()
+            self.manifest.save()
+            stats = self.manifest.stats()
+            logging.info(
+                "session(%s) files written(%s) reused(%s)",
+                self.id,
+                stats["written"],
+                stats["reused"],
+            )
         return exceptions
 
     def get_node_count(self) -> int:
@@ -1521,7 +1690,7 @@ class Session:
                     continue
                 args = (node,)
                 funcs.append((self.services.stop_services, args, {}))
-            utils.threadpool(funcs)
+            self.executor.run(SHUTDOWN_STAGE, funcs)
 
         # shutdown emane
         self.emane.shutdown()
@@ -1573,9 +1742,10 @@ class Session:
         :return: nothing
         """
         logging.info("booting node(%s): %s", node.name, [x.name for x in node.services])
-        self.add_remove_control_interface(node=node, remove=False)
-        self.services.boot_services(node)
-        node.start_config_services()
+        with self.profiler.timer(NODE, node.name):
+            self.add_remove_control_interface(node=node, remove=False)
+            self.services.boot_services(node)
+            node.start_config_services()
 
     def boot_nodes(self) -> List[Exception]:
         """
@@ -1587,15 +1757,12 @@ class Session:
         """
         with self._nodes_lock:
             funcs = []
-            start = time.monotonic()
             for _id in self.nodes:
                 node = self.nodes[_id]
                 if isinstance(node, CoreNodeBase) and not isinstance(node, Rj45Node):
                     args = (node,)
                     funcs.append((self.boot_node, args, {}))
-            results, exceptions = utils.threadpool(funcs)
-            total = time.monotonic() - start
-            logging.debug("boot run time: %s", total)
+            results, exceptions = self.executor.run(NODE_STAGE, funcs)
         if not exceptions:
             self.update_control_interface_hosts()
         return exceptions
@@ -56,6 +56,72 @@ class SessionConfig(ConfigurableManager, ConfigurableOptions):
             default=Sdt.DEFAULT_SDT_URL,
             label="SDT3D URL",
         ),
+        Configuration(
+            _id="vnodechannel",
+            _type=ConfigDataTypes.BOOL,
+            default="1",
+            label="Persistent node command channel",
+        ),
+        Configuration(
+            _id="nftables",
+            _type=ConfigDataTypes.BOOL,
+            default="0",
+            label="Use nftables for WLAN filtering",
+        ),
+        Configuration(
+            _id="ptp_veth",
+            _type=ConfigDataTypes.BOOL,
+            default="0",
+            label="Direct veth point-to-point links",
+        ),
+        Configuration(
+            _id="distributed_overlay",
+            _type=ConfigDataTypes.BOOL,
+            default="0",
+            label="Multiplexed distributed overlay",
+        ),
+        Configuration(
+            _id="partition",
+            _type=ConfigDataTypes.BOOL,
+            default="0",
+            label="Partition nodes across distributed servers on start",
+        ),
+        Configuration(
+            _id="node_workers",
+            _type=ConfigDataTypes.UINT32,
+            default="10",
+            label="Node Create Workers",
+        ),
+        Configuration(
+            _id="link_workers",
+            _type=ConfigDataTypes.UINT32,
+            default="10",
+            label="Link Create Workers",
+        ),
+        Configuration(
+            _id="service_workers",
+            _type=ConfigDataTypes.UINT32,
+            default="10",
+            label="Service Boot Workers",
+        ),
+        Configuration(
+            _id="shutdown_workers",
+            _type=ConfigDataTypes.UINT32,
+            default="10",
+            label="Shutdown Workers",
+        ),
+        Configuration(
+            _id="distributed_workers",
+            _type=ConfigDataTypes.UINT32,
+            default="10",
+            label="Distributed Server Workers",
+        ),
+        Configuration(
+            _id="distributed_connections",
+            _type=ConfigDataTypes.UINT32,
+            default="4",
+            label="Connections Per Distributed Server",
+        ),
     ]
     config_type: RegisterTlvs = RegisterTlvs.UTILITY
 
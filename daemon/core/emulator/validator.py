@@ -0,0 +1,316 @@
+"""
+Defines the service validator, scheduling service validation and readiness
+checks on a shared event loop rather than sleeping within pool workers.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, Callable, Iterable, List, Optional, Set
+
+from core.emulator.executor import SERVICE_STAGE
+from core.errors import CoreCommandError
+from core.location.event import EventLoop
+
+if TYPE_CHECKING:
+    from core.emulator.session import Session
+    from core.nodes.base import CoreNodeBase
+
+    Check = Callable[[], bool]
+
+# proc net files checked for ports, and the tcp listen state within them
+PROC_NET_FILES: List[str] = ["tcp", "tcp6", "udp", "udp6"]
+TCP_LISTEN: str = "0A"
+
+
+def port_listening(data: str, port: int, tcp: bool = True) -> bool:
+    """
+    Check proc net file data for a socket bound to a local port, tcp sockets
+    must also be listening.
+
+    :param data: proc net file data
+    :param port: port to check for
+    :param tcp: True if data is for tcp sockets, False otherwise
+    :return: True if port is found, False otherwise
+    """
+    for line in data.splitlines()[1:]:
+        fields = line.split()
+        if len(fields) < 4:
+            continue
+        local_port = int(fields[1].rsplit(":", 1)[1], 16)
+        if local_port == port and (not tcp or fields[3] == TCP_LISTEN):
+            return True
+    return False
+
+
+def _local_pid(node: "CoreNodeBase") -> Optional[str]:
+    # nodes running on this host, with a known pid, can be inspected through proc
+    pid = getattr(node, "pid", None)
+    if node.server is None and pid:
+        return str(pid)
+    return None
+
+
+def file_ready(node: "CoreNodeBase", path: str) -> bool:
+    """
+    Check if a file exists within a node, such as a pidfile or socket.
+
+    :param node: node to check
+    :param path: absolute path of file within node
+    :return: True if file exists, False otherwise
+    """
+    pid = _local_pid(node)
+    if pid is not None:
+        return os.path.exists(f"/proc/{pid}/root{path}")
+    try:
+        node.cmd(f"test -e {path}")
+        return True
+    except CoreCommandError:
+        return False
+
+
+def port_ready(node: "CoreNodeBase", port: int) -> bool:
+    """
+    Check if a port is listening, for tcp, or bound, for udp, within a node.
+
+    :param node: node to check
+    :param port: port to check for
+    :return: True if port is ready, False otherwise
+    """
+    pid = _local_pid(node)
+    for name in PROC_NET_FILES:
+        try:
+            if pid is not None:
+                with open(f"/proc/{pid}/net/{name}", "r") as f:
+                    data = f.read()
+            else:
+                data = node.cmd(f"cat /proc/net/{name}")
+        except (IOError, CoreCommandError):
+            continue
+        if port_listening(data, port, name.startswith("tcp")):
+            return True
+    return False
+
+
+def device_ready(node: "CoreNodeBase", name: str) -> bool:
+    """
+    Check if a network device exists within a node.
+
+    :param node: node to check
+    :param name: name of device
+    :return: True if device exists, False otherwise
+    """
+    pid = _local_pid(node)
+    if pid is not None:
+        try:
+            with open(f"/proc/{pid}/net/dev", "r") as f:
+                data = f.readlines()[2:]
+        except IOError:
+            return False
+        return any(x.partition(":")[0].strip() == name for x in data)
+    try:
+        node.node_net_client.device_show(name)
+        return True
+    except CoreCommandError:
+        return False
+
+
+def readiness_checks(
+    node: "CoreNodeBase", files: Iterable[str], ports: Iterable[int]
+) -> List["Check"]:
+    """
+    Create readiness checks for files and ports expected from a service.
+
+    :param node: node service is running on
+    :param files: files to wait for
+    :param ports: ports to wait for
+    :return: readiness checks
+    """
+    checks = []
+    for path in files:
+        checks.append(lambda x=path: file_ready(node, x))
+    for port in ports:
+        checks.append(lambda x=port: port_ready(node, x))
+    return checks
+
+
+class Validation:
+    """
+    Tracks the state of a scheduled validation.
+    """
+
+    def __init__(
+        self,
+        checks: List["Check"],
+        timeout: float,
+        period: float,
+        error: Optional[Exception],
+    ) -> None:
+        """
+        Create a Validation instance.
+
+        :param checks: checks that must all pass
+        :param timeout: time in seconds to wait for checks to pass
+        :param period: time in seconds between attempts
+        :param error: error to fail with on timeout, None to complete with False
+        """
+        self.checks: List["Check"] = checks
+        self.timeout: float = timeout
+        self.period: float = period
+        self.error: Optional[Exception] = error
+        self.start: float = time.monotonic()
+        self.future: Future = Future()
+
+
+class ServiceValidator:
+    """
+    Schedules service validation for a session. Waiting happens on a shared event
+    loop and checks run on the session service pool, so no worker is blocked
+    while a service becomes ready.
+    """
+
+    def __init__(self, session: "Session") -> None:
+        """
+        Create a ServiceValidator instance.
+
+        :param session: session services are running within
+        """
+        self.session: "Session" = session
+        self.lock: threading.Lock = threading.Lock()
+        self.event_loop: EventLoop = EventLoop()
+        self.futures: Set[Future] = set()
+
+    def _submit(self, func: Callable[..., None], *args: Any) -> None:
+        pool = self.session.executor.get_pool(SERVICE_STAGE)
+        pool.submit(func, *args)
+
+    def _schedule(self, delay: float, func: Callable[..., None], *args: Any) -> None:
+        with self.lock:
+            self.event_loop.run()
+            self.event_loop.add_event(delay, func, *args)
+
+    def _track(self, future: Future) -> Future:
+        with self.lock:
+            self.futures.add(future)
+        future.add_done_callback(self._untrack)
+        return future
+
+    def _untrack(self, future: Future) -> None:
+        with self.lock:
+            self.futures.discard(future)
+
+    def _complete(
+        self, future: Future, result: Any = None, error: Exception = None
+    ) -> None:
+        # claiming the future ensures only the first completion is applied
+        try:
+            if not future.set_running_or_notify_cancel():
+                return
+        except RuntimeError:
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def timer(self, delay: float) -> Future:
+        """
+        Create a future that completes with True after a delay.
+
+        :param delay: time in seconds
+        :return: timer future
+        """
+        future = self._track(Future())
+        self._schedule(delay, self._complete, future, True)
+        return future
+
+    def validate(
+        self,
+        checks: List["Check"],
+        timeout: float,
+        period: float,
+        error: Exception = None,
+    ) -> Future:
+        """
+        Run checks on the service pool every period, until all have passed or the
+        timeout has been reached. Checks that have passed are not run again.
+
+        :param checks: checks that must all pass
+        :param timeout: time in seconds to wait for checks to pass
+        :param period: time in seconds between attempts
+        :param error: error to fail with on timeout, None to complete with False
+        :return: future completing with True when checks pass, False on timeout
+        """
+        validation = Validation(list(checks), timeout, period, error)
+        future = self._track(validation.future)
+        if not validation.checks:
+            self._complete(future, True)
+        else:
+            self._submit(self._check, validation)
+        return future
+
+    def _check(self, validation: Validation) -> None:
+        if validation.future.done():
+            return
+        try:
+            validation.checks = [x for x in validation.checks if not x()]
+        except Exception as e:
+            logging.exception("error running validation check")
+            self._complete(validation.future, error=e)
+            return
+        if not validation.checks:
+            self._complete(validation.future, True)
+        elif time.monotonic() - validation.start > validation.timeout:
+            self._complete(validation.future, False, validation.error)
+        else:
+            self._schedule(validation.period, self._submit, self._check, validation)
+
+    def run_steps(self, steps: List[Callable[[], Future]]) -> Future:
+        """
+        Run steps in order on the service pool, each returning a future, starting
+        the next step once the previous future completes successfully.
+
+        :param steps: steps to run
+        :return: future completing once all steps complete, or failing with the
+            first step error
+        """
+        future = self._track(Future())
+        if steps:
+            self._submit(self._run_step, steps, 0, future)
+        else:
+            self._complete(future)
+        return future
+
+    def _run_step(
+        self, steps: List[Callable[[], Future]], index: int, future: Future
+    ) -> None:
+        try:
+            step_future = steps[index]()
+        except Exception as e:
+            self._complete(future, error=e)
+            return
+
+        def step_done(done: Future) -> None:
+            error = done.exception()
+            if error is not None:
+                self._complete(future, error=error)
+            elif index + 1 < len(steps):
+                self._submit(self._run_step, steps, index + 1, future)
+            else:
+                self._complete(future)
+
+        step_future.add_done_callback(step_done)
+
+    def shutdown(self) -> None:
+        """
+        Stop scheduling, completing any pending validations with False.
+
+        :return: nothing
+        """
+        with self.lock:
+            self.event_loop.stop()
+            futures = list(self.futures)
+        for future in futures:
+            self._complete(future, False)
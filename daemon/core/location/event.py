@@ -1,75 +1,16 @@
 """
-event.py: event loop implementation using a heap queue and threads.
+event.py: event loop implementation using a heap queue and a single dispatcher
+thread.
 """
 
 import heapq
+import logging
 import threading
 import time
 from functools import total_ordering
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
 
-class Timer(threading.Thread):
-    """
-    Based on threading.Timer but cancel() returns if the timer was
-    already running.
-    """
-
-    def __init__(
-        self,
-        interval: float,
-        func: Callable[..., None],
-        args: Tuple[Any] = None,
-        kwargs: Dict[Any, Any] = None,
-    ) -> None:
-        """
-        Create a Timer instance.
-
-        :param interval: time interval
-        :param func: function to call when timer finishes
-        :param args: function arguments
-        :param kwargs: function keyword arguments
-        """
-        super().__init__()
-        self.interval: float = interval
-        self.func: Callable[..., None] = func
-        self.finished: threading.Event = threading.Event()
-        self._running: threading.Lock = threading.Lock()
-        # validate arguments were provided
-        if args is None:
-            args = ()
-        self.args: Tuple[Any] = args
-        # validate keyword arguments were provided
-        if kwargs is None:
-            kwargs = {}
-        self.kwargs: Dict[Any, Any] = kwargs
-
-    def cancel(self) -> bool:
-        """
-        Stop the timer if it hasn't finished yet.  Return False if
-        the timer was already running.
-
-        :return: True if canceled, False otherwise
-        """
-        locked = self._running.acquire(False)
-        if locked:
-            self.finished.set()
-            self._running.release()
-        return locked
-
-    def run(self) -> None:
-        """
-        Run the timer.
-
-        :return: nothing
-        """
-        self.finished.wait(self.interval)
-        with self._running:
-            if not self.finished.is_set():
-                self.func(*self.args, **self.kwargs)
-            self.finished.set()
-
-
 @total_ordering
 class Event:
     """
@@ -99,12 +40,10 @@ class Event:
         self.args: Tuple[Any] = args
         self.kwds: Dict[Any, Any] = kwds
         self.canceled: bool = False
+        self.interval: Optional[float] = None
 
     def __lt__(self, other: "Event") -> bool:
-        result = self.time < other.time
-        if result:
-            result = self.eventnum < other.eventnum
-        return result
+        return (self.time, self.eventnum) < (other.time, other.eventnum)
 
     def run(self) -> None:
         """
@@ -118,7 +57,8 @@ class Event:
 
     def cancel(self) -> None:
         """
-        Cancel event.
+        Cancel event, canceled events are discarded when reaching the head of the
+        queue.
 
         :return: nothing
         """
@@ -127,7 +67,8 @@ class Event:
 
 class EventLoop:
     """
-    Provides an event loop for running events.
+    Provides an event loop for running events, using a single dispatcher thread
+    that waits for the next event to become due.
     """
 
     def __init__(self) -> None:
@@ -135,54 +76,68 @@ class EventLoop:
         Creates a EventLoop instance.
         """
         self.lock: threading.RLock = threading.RLock()
+        self.condition: threading.Condition = threading.Condition(self.lock)
         self.queue: List[Event] = []
         self.eventnum: int = 0
-        self.timer: Optional[Timer] = None
+        self.thread: Optional[threading.Thread] = None
         self.running: bool = False
         self.start: Optional[float] = None
 
-    def _run_events(self) -> None:
+    def _next_event(self) -> Optional[Event]:
         """
-        Run events.
+        Wait for the next due event, discarding canceled events.
 
-        :return: nothing
+        :return: next event to run, None when the loop has been stopped
         """
-        schedule = False
-        while True:
-            with self.lock:
-                if not self.running or not self.queue:
-                    break
-                now = time.monotonic()
-                if self.queue[0].time > now:
-                    schedule = True
-                    break
-                event = heapq.heappop(self.queue)
-            if event.time > now:
-                raise ValueError("invalid event time: %s > %s", event.time, now)
-            event.run()
+        with self.condition:
+            while self.running and self.thread is threading.current_thread():
+                if not self.queue:
+                    self.condition.wait()
+                    continue
+                event = self.queue[0]
+                if event.canceled:
+                    heapq.heappop(self.queue)
+                    continue
+                delay = event.time - time.monotonic()
+                if delay > 0:
+                    self.condition.wait(delay)
+                    continue
+                return heapq.heappop(self.queue)
+        return None
 
-        with self.lock:
-            self.timer = None
-            if schedule:
-                self._schedule_event()
-
-    def _schedule_event(self) -> None:
+    def _run_events(self) -> None:
         """
-        Schedule event.
+        Dispatch events as they become due, until the loop is stopped.
 
         :return: nothing
         """
-        with self.lock:
-            if not self.running:
-                raise ValueError("scheduling event while not running")
-            if not self.queue:
-                return
-            delay = self.queue[0].time - time.monotonic()
-            if self.timer:
-                raise ValueError("timer was already set")
-            self.timer = Timer(delay, self._run_events)
-            self.timer.daemon = True
-            self.timer.start()
+        while True:
+            event = self._next_event()
+            if event is None:
+                break
+            try:
+                event.run()
+            except Exception:
+                logging.exception("error running event: %s", event.func)
+            if event.interval is not None and not event.canceled:
+                with self.condition:
+                    if self.running and self.thread is threading.current_thread():
+                        now = time.monotonic()
+                        event.time = max(event.time + event.interval, now)
+                        event.eventnum = self.eventnum
+                        self.eventnum += 1
+                        self._push_event(event)
+
+    def _push_event(self, event: Event) -> None:
+        """
+        Add event to queue, waking the dispatcher when it is the new head.
+
+        :param event: event to add
+        :return: nothing
+        """
+        heapq.heappush(self.queue, event)
+        if self.running and self.queue[0] is event:
+            self.condition.notify()
 
     def run(self) -> None:
         """
@@ -197,7 +152,8 @@ class EventLoop:
             self.start = time.monotonic()
             for event in self.queue:
                 event.time += self.start
-            self._schedule_event()
+            self.thread = threading.Thread(target=self._run_events, daemon=True)
+            self.thread.start()
 
     def stop(self) -> None:
         """
@@ -208,15 +164,18 @@ class EventLoop:
         with self.lock:
             if not self.running:
                 return
+            for event in self.queue:
+                event.cancel()
             self.queue = []
             self.eventnum = 0
-            if self.timer is not None:
-                self.timer.cancel()
-                self.timer = None
             self.running = False
             self.start = None
+            self.thread = None
+            self.condition.notify_all()
 
-    def add_event(self, delaysec: float, func: Callable, *args: Any, **kwds: Any):
+    def add_event(
+        self, delaysec: float, func: Callable, *args: Any, **kwds: Any
+    ) -> Event:
         """
         Add an event to the event loop.
 
@@ -224,26 +183,32 @@ class EventLoop:
         :param func: event function
         :param args: event arguments
         :param kwds: event keyword arguments
-        :return: created event
+        :return: created event, which can be canceled
         """
         with self.lock:
-            eventnum = self.eventnum
-            self.eventnum += 1
             evtime = float(delaysec)
             if self.running:
                 evtime += time.monotonic()
-            event = Event(eventnum, evtime, func, *args, **kwds)
-
-            if self.queue:
-                prevhead = self.queue[0]
-            else:
-                prevhead = None
-
-            heapq.heappush(self.queue, event)
-            head = self.queue[0]
-            if prevhead is not None and prevhead != head:
-                if self.timer is not None and self.timer.cancel():
-                    self.timer = None
-            if self.running and self.timer is None:
-                self._schedule_event()
+            event = Event(self.eventnum, evtime, func, *args, **kwds)
+            self.eventnum += 1
+            self._push_event(event)
+        return event
+
+    def add_periodic_event(
+        self, interval: float, func: Callable, *args: Any, **kwds: Any
+    ) -> Event:
+        """
+        Add an event to the event loop that runs every interval, until canceled or
+        the event loop is stopped.
+
+        :param interval: interval in seconds between runs, first run occurs after
+            one interval
+        :param func: event function
+        :param args: event arguments
+        :param kwds: event keyword arguments
+        :return: created event, which can be canceled
+        """
+        with self.lock:
+            event = self.add_event(interval, func, *args, **kwds)
+            event.interval = float(interval)
         return event
@@ -3,13 +3,19 @@ Provides conversions from x,y,z to lon,lat,alt.
 """
 
 import logging
-from typing import Tuple
+from typing import Iterable, Optional, Sequence, Tuple
 
 import pyproj
 from pyproj import Transformer
 
 from core.emulator.enumerations import RegisterTlvs
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+    logging.debug("numpy not found, bulk geo conversions will convert per point")
+
 SCALE_FACTOR = 100.0
 CRS_WGS84 = 4326
 CRS_PROJ = 3857
@@ -125,3 +131,65 @@ class GeoLocation:
         alt = self.refgeo[2] + self.pixels2meters(z)
         logging.debug("result lon,lat,alt(%s, %s, %s)", lon, lat, alt)
         return lat, lon, alt
+
+    def getxyz_many(
+        self, lats: Iterable[float], lons: Iterable[float], alts: Iterable[float]
+    ) -> Tuple[Sequence[float], Sequence[float], Sequence[float]]:
+        """
+        Convert provided lon,lat,alt values to x,y,z values, using a single
+        projection transform for all points.
+
+        :param lats: latitude values
+        :param lons: longitude values
+        :param alts: altitude values
+        :return: x,y,z values for each point provided
+        """
+        if np is None:
+            points = [self.getxyz(*x) for x in zip(lats, lons, alts)]
+            xs, ys, zs = zip(*points) if points else ((), (), ())
+            return list(xs), list(ys), list(zs)
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        alts = np.asarray(alts, dtype=float)
+        px, py = self.to_pixels.transform(lons, lats)
+        px = px - self.refproj[0]
+        py = py - self.refproj[1]
+        pz = alts - self.refproj[2]
+        x = self._meters2pixels_many(px) + self.refxyz[0]
+        y = -(self._meters2pixels_many(py) + self.refxyz[1])
+        z = self._meters2pixels_many(pz) + self.refxyz[2]
+        return x, y, z
+
+    def getgeo_many(
+        self,
+        xs: Iterable[float],
+        ys: Iterable[float],
+        zs: Iterable[Optional[float]],
+    ) -> Tuple[Sequence[float], Sequence[float], Sequence[float]]:
+        """
+        Convert provided x,y,z values to lon,lat,alt values, using a single
+        projection transform for all points.
+
+        :param xs: x values
+        :param ys: y values
+        :param zs: z values, may contain None values
+        :return: lat,lon,alt values for each point provided
+        """
+        if np is None:
+            points = [self.getgeo(*x) for x in zip(xs, ys, zs)]
+            lats, lons, alts = zip(*points) if points else ((), (), ())
+            return list(lats), list(lons), list(alts)
+        xs = np.asarray(xs, dtype=float) - self.refxyz[0]
+        ys = -(np.asarray(ys, dtype=float) - self.refxyz[1])
+        zs = [self.refxyz[2] if z is None else z - self.refxyz[2] for z in zs]
+        zs = np.asarray(zs, dtype=float)
+        px = self.refproj[0] + (xs / SCALE_FACTOR) * self.refscale
+        py = self.refproj[1] + (ys / SCALE_FACTOR) * self.refscale
+        lons, lats = self.to_geo.transform(px, py)
+        alts = self.refgeo[2] + (zs / SCALE_FACTOR) * self.refscale
+        return lats, lons, alts
+
+    def _meters2pixels_many(self, values: "np.ndarray") -> "np.ndarray":
+        if self.refscale == 0.0:
+            return np.zeros_like(values)
+        return SCALE_FACTOR * (values / self.refscale)
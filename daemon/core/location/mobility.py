@@ -9,7 +9,7 @@ import os
 import threading
 import time
 from functools import total_ordering
-from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set, Tuple
 
 from core import utils
 from core.config import ConfigGroup, ConfigurableOptions, Configuration, ModelManager
@@ -30,6 +30,12 @@ from core.nodes.network import WlanNode
 if TYPE_CHECKING:
     from core.emulator.session import Session
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+    logging.debug("numpy not installed, range calculations will not be vectorized")
+
 
 class MobilityManager(ModelManager):
     """
@@ -249,11 +255,191 @@ class WirelessModel(ConfigurableOptions):
         pass
 
 
+class RangeGrid:
+    """
+    Uniform grid spatial index for interface positions, using cells the size of
+    the wireless range. Any interface within range of a position is located
+    within the position's cell or one of its eight neighboring cells.
+    """
+
+    def __init__(self, size: float) -> None:
+        """
+        Create a RangeGrid instance.
+
+        :param size: size of grid cells
+        """
+        self.size: float = max(size, 1)
+        self.cells: Dict[Tuple[int, int], Set[CoreInterface]] = {}
+        self.netif_cells: Dict[CoreInterface, Tuple[int, int]] = {}
+
+    def cell(self, x: float, y: float) -> Tuple[int, int]:
+        """
+        Retrieve the cell for a position.
+
+        :param x: x position
+        :param y: y position
+        :return: grid cell
+        """
+        return int(x // self.size), int(y // self.size)
+
+    def update(self, netif: CoreInterface, x: float, y: float) -> None:
+        """
+        Update the cell an interface is indexed within.
+
+        :param netif: interface to update
+        :param x: x position, None to remove from the index
+        :param y: y position, None to remove from the index
+        :return: nothing
+        """
+        current = self.netif_cells.get(netif)
+        cell = None
+        if x is not None and y is not None:
+            cell = self.cell(x, y)
+        if current == cell:
+            return
+        if current is not None:
+            netifs = self.cells[current]
+            netifs.discard(netif)
+            if not netifs:
+                del self.cells[current]
+            del self.netif_cells[netif]
+        if cell is not None:
+            self.cells.setdefault(cell, set()).add(netif)
+            self.netif_cells[netif] = cell
+
+    def nearby(self, netif: CoreInterface) -> Set[CoreInterface]:
+        """
+        Retrieve interfaces within the cells surrounding an interface.
+
+        :param netif: interface to get nearby interfaces for
+        :return: nearby interfaces
+        """
+        nearby = set()
+        cell = self.netif_cells.get(netif)
+        if cell is None:
+            return nearby
+        cell_x, cell_y = cell
+        for x in range(cell_x - 1, cell_x + 2):
+            for y in range(cell_y - 1, cell_y + 2):
+                nearby.update(self.cells.get((x, y), ()))
+        return nearby
+
+
+class RangeMatrix:
+    """
+    Interface positions and linked state held within contiguous NumPy arrays,
+    allowing the range of moved interfaces to all other interfaces to be
+    calculated using vectorized operations.
+    """
+
+    def __init__(self, capacity: int = 64) -> None:
+        """
+        Create a RangeMatrix instance.
+
+        :param capacity: initial number of interfaces to allocate space for
+        """
+        self.index: Dict[CoreInterface, int] = {}
+        self.netifs: List[CoreInterface] = []
+        self.positions: "np.ndarray" = np.full((capacity, 3), np.nan)
+        self.linked: "np.ndarray" = np.zeros((capacity, capacity), dtype=bool)
+
+    def _row(self, netif: CoreInterface) -> int:
+        """
+        Retrieve the row for an interface, adding it when not present.
+
+        :param netif: interface to get row for
+        :return: interface row
+        """
+        row = self.index.get(netif)
+        if row is None:
+            row = len(self.netifs)
+            capacity = len(self.positions)
+            if row == capacity:
+                positions = np.full((capacity * 2, 3), np.nan)
+                positions[:capacity] = self.positions
+                self.positions = positions
+                linked = np.zeros((capacity * 2, capacity * 2), dtype=bool)
+                linked[:capacity, :capacity] = self.linked
+                self.linked = linked
+            self.index[netif] = row
+            self.netifs.append(netif)
+        return row
+
+    def update(self, netif: CoreInterface, x: float, y: float, z: float) -> None:
+        """
+        Update the position of an interface.
+
+        :param netif: interface to update
+        :param x: x position
+        :param y: y position
+        :param z: z position
+        :return: nothing
+        """
+        row = self._row(netif)
+        self.positions[row] = [
+            np.nan if value is None else value for value in (x, y, z)
+        ]
+
+    def set_linked(
+        self, netif: CoreInterface, netif2: CoreInterface, linked: bool
+    ) -> None:
+        """
+        Update the linked state of an interface pair.
+
+        :param netif: interface one
+        :param netif2: interface two
+        :param linked: True when the pair is linked, False otherwise
+        :return: nothing
+        """
+        row = self._row(netif)
+        row2 = self._row(netif2)
+        self.linked[row, row2] = linked
+        self.linked[row2, row] = linked
+
+    def changes(
+        self, netifs: List[CoreInterface], max_range: float
+    ) -> List[Tuple[CoreInterface, CoreInterface, bool]]:
+        """
+        Calculate interface pairs, involving the provided interfaces, whose range
+        no longer matches their linked state.
+
+        :param netifs: moved interfaces to calculate changes for
+        :param max_range: range interfaces are linked within
+        :return: changed interface pairs and if they are now in range
+        """
+        rows = [self.index[x] for x in netifs if x in self.index]
+        if not rows:
+            return []
+        rows = np.unique(rows)
+        count = len(self.netifs)
+        positions = self.positions[:count]
+        moved = positions[rows]
+        delta = moved[:, np.newaxis, :] - positions[np.newaxis, :, :]
+        # ignore z when either interface does not have one
+        delta[..., 2] = np.nan_to_num(delta[..., 2])
+        distance = np.einsum("ijk,ijk->ij", delta, delta)
+        valid = ~np.isnan(positions[:, :2]).any(axis=1)
+        in_range = distance <= max_range * max_range
+        in_range[np.arange(len(rows)), rows] = False
+        changed = (in_range != self.linked[rows, :count]) & valid[np.newaxis, :]
+        changed &= valid[rows][:, np.newaxis]
+        results = {}
+        for i, j in zip(*np.nonzero(changed)):
+            row, row2 = rows[i], j
+            if row == row2:
+                continue
+            key = (min(row, row2), max(row, row2))
+            results[key] = bool(in_range[i, j])
+        return [(self.netifs[a], self.netifs[b], x) for (a, b), x in results.items()]
+
+
 class BasicRangeModel(WirelessModel):
     """
     Basic Range wireless model, calculates range between nodes and links
     and unlinks nodes based on this distance. This was formerly done from
-    the GUI.
+    the GUI. Candidate interfaces are found using a grid spatial index, so only
+    nearby or currently linked interfaces are compared after a move. When NumPy
+    is available, bulk updates calculate ranges using vectorized operations.
     """
 
     name: str = "basic_range"
@@ -303,6 +489,11 @@ class BasicRangeModel(WirelessModel):
         self.wlan: WlanNode = session.get_node(_id, WlanNode)
         self._netifs: Dict[CoreInterface, Tuple[float, float, float]] = {}
         self._netifslock: threading.Lock = threading.Lock()
+        self._grid: RangeGrid = RangeGrid(0)
+        self._peers: Dict[CoreInterface, Set[CoreInterface]] = {}
+        self._matrix: Optional[RangeMatrix] = None
+        if np is not None:
+            self._matrix = RangeMatrix()
         self.range: int = 0
         self.bw: Optional[int] = None
         self.delay: Optional[int] = None
@@ -363,14 +554,12 @@ class BasicRangeModel(WirelessModel):
         :return: nothing
         """
         x, y, z = netif.node.position.get()
-        self._netifslock.acquire()
-        self._netifs[netif] = (x, y, z)
-        if x is None or y is None:
-            self._netifslock.release()
-            return
-        for netif2 in self._netifs:
-            self.calclink(netif, netif2)
-        self._netifslock.release()
+        with self._netifslock:
+            self._store_position(netif, x, y, z)
+            if x is None or y is None:
+                return
+            for netif2 in self._candidates(netif):
+                self.calclink(netif, netif2)
 
     position_callback = set_position
 
@@ -386,16 +575,75 @@ class BasicRangeModel(WirelessModel):
         :return: nothing
         """
         with self._netifslock:
-            while len(moved_netifs):
-                netif = moved_netifs.pop()
+            if self._matrix is not None:
+                moved_netifs = [x for x in moved_netifs if x in self._netifs]
+                for netif in moved_netifs:
+                    self._store_position(netif, *netif.node.getposition())
+                changes = self._matrix.changes(moved_netifs, self.range)
+                for netif, netif2, in_range in changes:
+                    self.setlink(netif, netif2, in_range)
+                return
+            pending = set(moved_netifs)
+            for netif in reversed(moved_netifs):
+                pending.discard(netif)
                 nx, ny, nz = netif.node.getposition()
                 if netif in self._netifs:
-                    self._netifs[netif] = (nx, ny, nz)
-                for netif2 in self._netifs:
-                    if netif2 in moved_netifs:
+                    self._store_position(netif, nx, ny, nz)
+                for netif2 in self._candidates(netif):
+                    if netif2 in pending:
                         continue
                     self.calclink(netif, netif2)
 
+    def _store_position(
+        self, netif: CoreInterface, x: float, y: float, z: float
+    ) -> None:
+        """
+        Store an interface position and update the position indexes.
+
+        :param netif: interface to store position for
+        :param x: x position
+        :param y: y position
+        :param z: z position
+        :return: nothing
+        """
+        self._netifs[netif] = (x, y, z)
+        self._grid.update(netif, x, y)
+        if self._matrix is not None:
+            self._matrix.update(netif, x, y, z)
+
+    def _candidates(self, netif: CoreInterface) -> Set[CoreInterface]:
+        """
+        Retrieve interfaces that may need to be linked or unlinked with the
+        provided interface, those indexed nearby and those currently linked.
+
+        :param netif: interface to get candidates for
+        :return: candidate interfaces
+        """
+        candidates = self._grid.nearby(netif)
+        candidates.update(self._peers.get(netif, ()))
+        return candidates
+
+    def _set_peer(
+        self, netif: CoreInterface, netif2: CoreInterface, linked: bool
+    ) -> None:
+        """
+        Track linked interface pairs, to allow unlinking pairs moving out of
+        nearby cells.
+
+        :param netif: interface one
+        :param netif2: interface two
+        :param linked: True when the pair is linked, False otherwise
+        :return: nothing
+        """
+        if linked:
+            self._peers.setdefault(netif, set()).add(netif2)
+            self._peers.setdefault(netif2, set()).add(netif)
+        else:
+            self._peers.get(netif, set()).discard(netif2)
+            self._peers.get(netif2, set()).discard(netif)
+        if self._matrix is not None:
+            self._matrix.set_linked(netif, netif2, linked)
+
     def calclink(self, netif: CoreInterface, netif2: CoreInterface) -> None:
         """
         Helper used by set_position() and update() to
@@ -418,26 +666,40 @@ class BasicRangeModel(WirelessModel):
                 return
 
             d = self.calcdistance((x, y, z), (x2, y2, z2))
+            self.setlink(netif, netif2, d <= self.range)
+        except KeyError:
+            logging.exception("error getting interfaces during calclinkS")
 
-            # ordering is important, to keep the wlan._linked dict organized
-            a = min(netif, netif2)
-            b = max(netif, netif2)
+    def setlink(
+        self, netif: CoreInterface, netif2: CoreInterface, in_range: bool
+    ) -> None:
+        """
+        Link or unlink two interfaces based on if they are within range, sending
+        link/unlink messages when their linked state changes.
 
-            with self.wlan._linked_lock:
-                linked = self.wlan.linked(a, b)
+        :param netif: interface one
+        :param netif2: interface two
+        :param in_range: True when interfaces are within range, False otherwise
+        :return: nothing
+        """
+        # ordering is important, to keep the wlan._linked dict organized
+        a = min(netif, netif2)
+        b = max(netif, netif2)
 
-            if d > self.range:
-                if linked:
-                    logging.debug("was linked, unlinking")
-                    self.wlan.unlink(a, b)
-                    self.sendlinkmsg(a, b, unlink=True)
-            else:
-                if not linked:
-                    logging.debug("was not linked, linking")
-                    self.wlan.link(a, b)
-                    self.sendlinkmsg(a, b)
-        except KeyError:
-            logging.exception("error getting interfaces during calclinkS")
+        with self.wlan._linked_lock:
+            linked = self.wlan.linked(a, b)
+
+        if not in_range:
+            if linked:
+                logging.debug("was linked, unlinking")
+                self.wlan.unlink(a, b)
+                self.sendlinkmsg(a, b, unlink=True)
+        else:
+            if not linked:
+                logging.debug("was not linked, linking")
+                self.wlan.link(a, b)
+                self.sendlinkmsg(a, b)
+        self._set_peer(a, b, in_range)
 
     @staticmethod
     def calcdistance(
@@ -468,6 +730,10 @@ class BasicRangeModel(WirelessModel):
         if self.range is None:
             self.range = 0
         logging.debug("wlan %s set range to %s", self.wlan.name, self.range)
+        with self._netifslock:
+            self._grid = RangeGrid(self.range)
+            for netif, (x, y, _) in self._netifs.items():
+                self._grid.update(netif, x, y)
         self.bw = self._get_config(self.bw, config, "bandwidth")
         self.delay = self._get_config(self.delay, config, "delay")
         self.loss = self._get_config(self.loss, config, "error")
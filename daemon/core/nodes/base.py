@@ -6,8 +6,10 @@ import logging
 import os
 import shutil
 import threading
+from contextlib import contextmanager
+from functools import partial
 from threading import RLock
-from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Type
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple, Type
 
 import netaddr
 
@@ -17,6 +19,7 @@ from core.constants import MOUNT_BIN, VNODED_BIN
 from core.emulator.data import LinkData, NodeData
 from core.emulator.emudata import InterfaceData, LinkOptions
 from core.emulator.enumerations import LinkTypes, MessageFlags, NodeTypes
+from core.emulator.profiler import COMMAND
 from core.errors import CoreCommandError, CoreError
 from core.nodes.client import VnodeClient
 from core.nodes.interface import CoreInterface, TunTap, Veth
@@ -104,6 +107,7 @@ class NodeBase:
         cwd: str = None,
         wait: bool = True,
         shell: bool = False,
+        data: bytes = None,
     ) -> str:
         """
         Runs a command on the host system or distributed server.
@@ -113,13 +117,15 @@ class NodeBase:
         :param cwd: directory to run command in
         :param wait: True to wait for status, False otherwise
         :param shell: True to use shell, False otherwise
+        :param data: data to provide as standard input, default is None
         :return: combined stdout and stderr
         :raises CoreCommandError: when a non-zero exit status occurs
         """
-        if self.server is None:
-            return utils.cmd(args, env, cwd, wait, shell)
-        else:
-            return self.server.remote_cmd(args, env, cwd, wait)
+        with self.session.profiler.timer(COMMAND, args):
+            if self.server is None:
+                return utils.cmd(args, env, cwd, wait, shell, data)
+            else:
+                return self.server.remote_cmd(args, env, cwd, wait, data)
 
     def setposition(self, x: float = None, y: float = None, z: float = None) -> bool:
         """
@@ -271,6 +277,7 @@ class CoreNodeBase(NodeBase):
         self.config_services: Dict[str, "ConfigService"] = {}
         self.nodedir: Optional[str] = None
         self.tmpnodedir: bool = False
+        self._staged_files: Optional[Dict[str, Tuple[str, int]]] = None
 
     def add_config_service(self, service_class: "ConfigServiceType") -> None:
         """
@@ -300,14 +307,26 @@ class CoreNodeBase(NodeBase):
     def start_config_services(self) -> None:
         """
         Determines startup paths and starts configuration services, based on their
-        dependency chains.
+        dependency chains. Paths are started concurrently, while services within a
+        path start once the previous service has been validated.
 
         :return: nothing
         """
         startup_paths = ConfigServiceDependencies(self.config_services).startup_paths()
+        # generate service files up front for nodes staging files, sending them
+        # to the node at once rather than as each service boots
+        create_files = not self.stages_files()
+        if not create_files:
+            with self.stage_files():
+                for startup_path in startup_paths:
+                    for service in startup_path:
+                        service.create_files()
+        futures = []
         for startup_path in startup_paths:
-            for service in startup_path:
-                service.start()
+            steps = [partial(service.boot, create_files) for service in startup_path]
+            futures.append(self.session.validator.run_steps(steps))
+        for future in futures:
+            future.result()
 
     def makenodedir(self) -> None:
         """
@@ -333,6 +352,7 @@ class CoreNodeBase(NodeBase):
             return
         if self.tmpnodedir:
             self.host_cmd(f"rm -rf {self.nodedir}")
+            self.session.manifest.invalidate(self.nodedir, self.server)
 
     def addnetif(self, netif: CoreInterface, ifindex: int) -> None:
         """
@@ -441,6 +461,58 @@ class CoreNodeBase(NodeBase):
         """
         raise NotImplementedError
 
+    def stages_files(self) -> bool:
+        """
+        Check if node files should be staged and sent in bulk.
+
+        :return: True if node files should be staged, False otherwise
+        """
+        return False
+
+    @contextmanager
+    def stage_files(self) -> Iterator[None]:
+        """
+        Stage node files created within this context, sending them to the node as
+        a single tar stream once the context exits, rather than using round trips
+        per file. Files are written directly for nodes not staging files.
+
+        :return: nothing
+        """
+        if not self.stages_files() or self._staged_files is not None:
+            yield
+            return
+        self._staged_files = {}
+        try:
+            yield
+            files = self._staged_files
+        finally:
+            self._staged_files = None
+        if files:
+            self.put_files(files)
+
+    def stage_file(self, filename: str, contents: str, mode: int) -> bool:
+        """
+        Stage a node file to be sent in bulk, when files are being staged.
+
+        :param filename: name of file to create
+        :param contents: contents of file
+        :param mode: mode for file
+        :return: True if file was staged, False otherwise
+        """
+        if self._staged_files is None:
+            return False
+        self._staged_files[filename] = (contents, mode)
+        return True
+
+    def put_files(self, files: Dict[str, Tuple[str, int]]) -> None:
+        """
+        Create several node files at once, preserving modes.
+
+        :param files: mapping of file names to their contents and mode
+        :return: nothing
+        """
+        raise NotImplementedError
+
     def addfile(self, srcname: str, filename: str) -> None:
         """
         Add a file.
@@ -567,7 +639,8 @@ class CoreNode(CoreNodeBase):
             logging.debug("node(%s) pid: %s", self.name, self.pid)
 
             # create vnode client
-            self.client = VnodeClient(self.name, self.ctrlchnlname)
+            use_channel = self.session.options.get_config("vnodechannel") == "1"
+            self.client = VnodeClient(self.name, self.ctrlchnlname, use_channel)
 
             # bring up the loopback interface
             logging.debug("bringing up loopback interface")
@@ -636,11 +709,12 @@ class CoreNode(CoreNodeBase):
         :return: combined stdout and stderr
         :raises CoreCommandError: when a non-zero exit status occurs
         """
-        if self.server is None:
-            return self.client.check_cmd(args, wait=wait, shell=shell)
-        else:
-            args = self.client.create_cmd(args)
-            return self.server.remote_cmd(args, wait=wait)
+        with self.session.profiler.timer(COMMAND, args):
+            if self.server is None:
+                return self.client.check_cmd(args, wait=wait, shell=shell)
+            else:
+                args = self.client.create_cmd(args)
+                return self.server.remote_cmd(args, wait=wait)
 
     def termcmdstring(self, sh: str = "/bin/sh") -> str:
         """
@@ -729,20 +803,9 @@ class CoreNode(CoreNodeBase):
             )
 
             if self.up:
-                self.net_client.device_ns(veth.name, str(self.pid))
-                self.node_net_client.device_name(veth.name, ifname)
-                self.node_net_client.checksums_off(ifname)
-
+                self._installveth(veth, ifname)
             veth.name = ifname
 
-            if self.up:
-                flow_id = self.node_net_client.get_ifindex(veth.name)
-                veth.flow_id = int(flow_id)
-                logging.debug("interface flow index: %s - %s", veth.name, veth.flow_id)
-                hwaddr = self.node_net_client.get_mac(veth.name)
-                logging.debug("interface mac: %s - %s", veth.name, hwaddr)
-                veth.sethwaddr(hwaddr)
-
             try:
                 # add network interface to the node. If unsuccessful, destroy the
                 # network interface and raise exception.
@@ -754,6 +817,56 @@ class CoreNode(CoreNodeBase):
 
             return ifindex
 
+    def newpeerveth(
+        self, peer: CoreInterface, ifindex: int = None, ifname: str = None
+    ) -> int:
+        """
+        Create a new interface from the host end of the veth pair of another
+        node's interface, linking both nodes directly without a bridge.
+
+        :param peer: interface to take the host end of the veth pair from
+        :param ifindex: index for the new interface
+        :param ifname: name for the new interface
+        :return: interface index
+        """
+        with self.lock:
+            if ifindex is None:
+                ifindex = self.newifindex()
+
+            if ifname is None:
+                ifname = f"eth{ifindex}"
+
+            veth = Veth(
+                self.session, self, peer.localname, None, start=False, server=self.server
+            )
+            if self.up and peer.up:
+                self._installveth(veth, ifname)
+                veth.up = True
+            veth.name = ifname
+            peer.localname = None
+
+            try:
+                self.addnetif(veth, ifindex)
+            except ValueError as e:
+                veth.shutdown()
+                del veth
+                raise e
+
+            return ifindex
+
+    def _installveth(self, veth: Veth, ifname: str) -> None:
+        # query the device before renaming, allowing the rename to be
+        # batched with following interface operations
+        self.net_client.device_ns(veth.name, str(self.pid))
+        self.node_net_client.checksums_off(veth.name)
+        flow_id = self.node_net_client.get_ifindex(veth.name)
+        veth.flow_id = int(flow_id)
+        logging.debug("interface flow index: %s - %s", ifname, veth.flow_id)
+        hwaddr = self.node_net_client.get_mac(veth.name)
+        logging.debug("interface mac: %s - %s", ifname, hwaddr)
+        veth.sethwaddr(hwaddr)
+        self.node_net_client.device_name(veth.name, ifname)
+
     def newtuntap(self, ifindex: int = None, ifname: str = None) -> int:
         """
         Create a new tunnel tap.
@@ -870,13 +983,19 @@ class CoreNode(CoreNodeBase):
                     netif.addaddr(address)
                 return ifindex
             else:
-                ifindex = self.newveth(interface.id, interface.name)
-            self.attachnet(ifindex, net)
-            if interface.mac:
-                self.sethwaddr(ifindex, interface.mac)
-            for address in addresses:
-                self.addaddr(ifindex, address)
-            self.ifup(ifindex)
+                with self.node_net_client.batch():
+                    if net.is_direct and net.numnetif() == 1:
+                        # direct links move the free end of the first veth pair
+                        peer = net.netifs()[0]
+                        ifindex = self.newpeerveth(peer, interface.id, interface.name)
+                    else:
+                        ifindex = self.newveth(interface.id, interface.name)
+                    self.attachnet(ifindex, net)
+                    if interface.mac:
+                        self.sethwaddr(ifindex, interface.mac)
+                    for address in addresses:
+                        self.addaddr(ifindex, address)
+                    self.ifup(ifindex)
             return ifindex
 
     def addfile(self, srcname: str, filename: str) -> None:
@@ -923,7 +1042,63 @@ class CoreNode(CoreNodeBase):
         :param mode: mode for file
         :return: nothing
         """
+        if self.stage_file(filename, contents, mode):
+            return
         hostfilename = self.hostfilename(filename)
+        data = f"{mode:o}\n{contents}".encode()
+        written = self.session.manifest.write(
+            hostfilename,
+            data,
+            lambda: self._write_nodefile(hostfilename, contents, mode),
+            self.server,
+        )
+        if written:
+            logging.debug(
+                "node(%s) added file: %s; mode: 0%o", self.name, hostfilename, mode
+            )
+        else:
+            logging.debug("node(%s) reused file: %s", self.name, hostfilename)
+
+    def stages_files(self) -> bool:
+        """
+        Check if node files should be staged and sent in bulk, which is the case
+        for nodes on distributed servers.
+
+        :return: True if node files should be staged, False otherwise
+        """
+        return self.server is not None
+
+    def put_files(self, files: Dict[str, Tuple[str, int]]) -> None:
+        """
+        Create several node files within a single tar stream, preserving modes.
+
+        :param files: mapping of file names to their contents and mode
+        :return: nothing
+        """
+        hostfiles = []
+        for filename, (contents, mode) in files.items():
+            hostfilename = self.hostfilename(filename)
+            data = f"{mode:o}\n{contents}".encode()
+            hostfiles.append((hostfilename, data, contents, mode))
+
+        def write(indexes: List[int]) -> None:
+            changed = {}
+            for index in indexes:
+                hostfilename, _data, contents, mode = hostfiles[index]
+                changed[hostfilename] = (contents, mode)
+            self.host_cmd("tar -xpf - -C /", data=utils.tar_files(changed))
+
+        written = self.session.manifest.write_many(
+            [(x[0], x[1]) for x in hostfiles], write, self.server
+        )
+        logging.debug(
+            "node(%s) added files(%s) reused files(%s)",
+            self.name,
+            len(written),
+            len(hostfiles) - len(written),
+        )
+
+    def _write_nodefile(self, hostfilename: str, contents: str, mode: int) -> None:
         dirname, _basename = os.path.split(hostfilename)
         if self.server is None:
             if not os.path.isdir(dirname):
@@ -935,9 +1110,6 @@ class CoreNode(CoreNodeBase):
             self.host_cmd(f"mkdir -m {0o755:o} -p {dirname}")
             self.server.remote_put_temp(hostfilename, contents)
             self.host_cmd(f"chmod {mode:o} {hostfilename}")
-        logging.debug(
-            "node(%s) added file: %s; mode: 0%o", self.name, hostfilename, mode
-        )
 
     def nodefilecopy(self, filename: str, srcfilename: str, mode: int = None) -> None:
         """
@@ -968,6 +1140,7 @@ class CoreNetworkBase(NodeBase):
 
     linktype = LinkTypes.WIRED
     is_emane = False
+    is_direct = False
 
     def __init__(
         self,
@@ -1,11 +1,289 @@
 """
 client.py: implementation of the VnodeClient class for issuing commands
 over a control channel to the vnoded process running in a network namespace.
-The control channel can be accessed via calls using the vcmd shell.
+The control channel can be accessed via calls using the vcmd shell, or directly
+using a persistent connection that speaks the vnode message protocol.
 """
 
+import logging
+import os
+import selectors
+import shlex
+import socket
+import struct
+import threading
+from typing import Dict, List, Optional, Tuple
+
 from core import utils
 from core.constants import VCMD_BIN
+from core.errors import CoreCommandError
+
+# vnode message and tlv types, as defined within netns/vnode_msg.h
+VNODE_MSG_CMDREQ = 1
+VNODE_MSG_CMDREQACK = 2
+VNODE_MSG_CMDSTATUS = 3
+VNODE_TLV_CMDID = 1
+VNODE_TLV_CMDARG = 5
+VNODE_TLV_CMDPID = 6
+VNODE_TLV_CMDSTATUS = 7
+VNODE_MSGSIZMAX = 65535
+VNODE_HEADER = struct.Struct("=II")
+VNODE_INT32 = struct.Struct("=i")
+
+
+def pack_message(msg_type: int, tlvs: List[Tuple[int, bytes]]) -> bytes:
+    """
+    Encode a vnode message from its type and tlvs.
+
+    :param msg_type: vnode message type
+    :param tlvs: tlv types and values
+    :return: encoded message
+    """
+    data = b"".join(VNODE_HEADER.pack(x, len(y)) + y for x, y in tlvs)
+    return VNODE_HEADER.pack(msg_type, len(data)) + data
+
+
+def unpack_message(data: bytes) -> Tuple[int, List[Tuple[int, bytes]]]:
+    """
+    Decode a vnode message into its type and tlvs.
+
+    :param data: encoded message
+    :return: vnode message type, tlv types and values
+    """
+    msg_type, datalen = VNODE_HEADER.unpack_from(data)
+    tlvs = []
+    offset = VNODE_HEADER.size
+    end = min(offset + datalen, len(data))
+    while offset + VNODE_HEADER.size <= end:
+        tlv_type, vallen = VNODE_HEADER.unpack_from(data, offset)
+        offset += VNODE_HEADER.size
+        tlvs.append((tlv_type, data[offset : offset + vallen]))
+        offset += vallen
+    return msg_type, tlvs
+
+
+class VnodeCommand:
+    """
+    Tracks the state of a command issued over a vnode channel.
+    """
+
+    def __init__(self, cmdid: int) -> None:
+        """
+        Create a VnodeCommand instance.
+
+        :param cmdid: command id used to correlate channel messages
+        """
+        self.cmdid: int = cmdid
+        self.pid: Optional[int] = None
+        self.status: Optional[int] = None
+        self.done: threading.Event = threading.Event()
+
+    def complete(self, status: int) -> None:
+        """
+        Mark command as complete with the given raw wait status.
+
+        :param status: raw wait status reported by vnoded, -1 for failure
+        :return: nothing
+        """
+        self.status = status
+        self.done.set()
+
+    def returncode(self) -> int:
+        """
+        Convert the raw wait status into a return code.
+
+        :return: exit status, negative signal number when signaled
+        """
+        if self.status == -1:
+            return 1
+        if os.WIFEXITED(self.status):
+            return os.WEXITSTATUS(self.status)
+        if os.WIFSIGNALED(self.status):
+            return -os.WTERMSIG(self.status)
+        return self.status
+
+
+class VnodeChannel:
+    """
+    Persistent connection to the control channel of a vnoded process, allowing
+    many commands to be multiplexed without forking a vcmd process for each one.
+    A reader thread dispatches command statuses as they arrive, so commands only
+    wait on their own completion.
+    """
+
+    def __init__(self, ctrlchnlname: str) -> None:
+        """
+        Create a VnodeChannel instance.
+
+        :param ctrlchnlname: control channel name
+        """
+        self.ctrlchnlname: str = ctrlchnlname
+        self.sock: Optional[socket.socket] = None
+        self.lock: threading.Lock = threading.Lock()
+        self.cmdid: int = 0
+        self.pending: Dict[int, VnodeCommand] = {}
+
+    def connect(self) -> None:
+        """
+        Connect to the vnoded control channel.
+
+        :return: nothing
+        :raises OSError: when the control channel can not be connected to
+        """
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        try:
+            sock.connect(self.ctrlchnlname)
+        except OSError:
+            sock.close()
+            raise
+        self.start(sock)
+
+    def start(self, sock: socket.socket) -> None:
+        """
+        Start using a connected socket and the thread reading messages from it.
+
+        :param sock: connected control channel socket
+        :return: nothing
+        """
+        self.sock = sock
+        thread = threading.Thread(target=self._read, args=(sock,), daemon=True)
+        thread.start()
+
+    def connected(self) -> bool:
+        """
+        Check if the channel is connected.
+
+        :return: True if connected, False otherwise
+        """
+        return self.sock is not None
+
+    def close(self) -> None:
+        """
+        Close the channel, failing any commands still waiting for a status.
+
+        :return: nothing
+        """
+        with self.lock:
+            if self.sock is not None:
+                # wakes the reader thread, which closes the socket
+                try:
+                    self.sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                self.sock = None
+            self._fail_pending()
+
+    def _fail_pending(self) -> None:
+        for command in self.pending.values():
+            command.complete(-1)
+        self.pending.clear()
+
+    def _send_cmdreq(
+        self, argv: List[str], fds: Tuple[int, int, int], track: bool = True
+    ) -> VnodeCommand:
+        with self.lock:
+            if self.sock is None:
+                raise OSError(f"vnode channel not connected: {self.ctrlchnlname}")
+            self.cmdid += 1
+            command = VnodeCommand(self.cmdid)
+            tlvs = [(VNODE_TLV_CMDID, VNODE_INT32.pack(command.cmdid))]
+            for arg in argv:
+                tlvs.append((VNODE_TLV_CMDARG, arg.encode("utf-8") + b"\0"))
+            message = pack_message(VNODE_MSG_CMDREQ, tlvs)
+            if len(message) > VNODE_MSGSIZMAX:
+                raise OSError(f"vnode command too large: {len(message)} bytes")
+            fds = struct.pack("3i", *fds)
+            ancillary = [(socket.SOL_SOCKET, socket.SCM_RIGHTS, fds)]
+            if track:
+                self.pending[command.cmdid] = command
+            try:
+                self.sock.sendmsg([message], ancillary)
+            except OSError:
+                self.pending.pop(command.cmdid, None)
+                raise
+            return command
+
+    def _read(self, sock: socket.socket) -> None:
+        while True:
+            try:
+                data = sock.recv(VNODE_MSGSIZMAX)
+            except OSError:
+                data = b""
+            if not data:
+                break
+            self._dispatch(data)
+        logging.debug("vnode channel closed: %s", self.ctrlchnlname)
+        with self.lock:
+            if self.sock is sock:
+                self.sock = None
+            self._fail_pending()
+        sock.close()
+
+    def _dispatch(self, data: bytes) -> None:
+        msg_type, tlvs = unpack_message(data)
+        values = {}
+        for tlv_type, value in tlvs:
+            if len(value) == VNODE_INT32.size:
+                values[tlv_type] = VNODE_INT32.unpack(value)[0]
+        cmdid = values.get(VNODE_TLV_CMDID)
+        with self.lock:
+            if msg_type == VNODE_MSG_CMDREQACK:
+                command = self.pending.get(cmdid)
+                if command is None:
+                    return
+                command.pid = values.get(VNODE_TLV_CMDPID, -1)
+                if command.pid == -1:
+                    self.pending.pop(cmdid, None)
+                    command.complete(-1)
+            elif msg_type == VNODE_MSG_CMDSTATUS:
+                command = self.pending.pop(cmdid, None)
+                if command is not None:
+                    command.complete(values.get(VNODE_TLV_CMDSTATUS, -1))
+
+    def run(self, argv: List[str], wait: bool = True) -> Tuple[int, str, str]:
+        """
+        Run a command within the node over the channel.
+
+        :param argv: command arguments
+        :param wait: True to wait for status and output, False otherwise
+        :return: return code, stdout, and stderr
+        :raises OSError: when the channel fails
+        """
+        devnull = os.open(os.devnull, os.O_RDWR)
+        if not wait:
+            try:
+                self._send_cmdreq(argv, (devnull, devnull, devnull), track=False)
+            finally:
+                os.close(devnull)
+            return 0, "", ""
+        out_read, out_write = os.pipe()
+        err_read, err_write = os.pipe()
+        try:
+            command = self._send_cmdreq(argv, (devnull, out_write, err_write))
+        except OSError:
+            os.close(out_read)
+            os.close(err_read)
+            raise
+        finally:
+            os.close(devnull)
+            os.close(out_write)
+            os.close(err_write)
+        output = {out_read: b"", err_read: b""}
+        with selectors.DefaultSelector() as selector:
+            selector.register(out_read, selectors.EVENT_READ)
+            selector.register(err_read, selectors.EVENT_READ)
+            while selector.get_map():
+                for key, _ in selector.select():
+                    chunk = os.read(key.fd, 65536)
+                    if chunk:
+                        output[key.fd] += chunk
+                    else:
+                        selector.unregister(key.fd)
+                        os.close(key.fd)
+        command.done.wait()
+        stdout = output[out_read].decode("utf-8").strip()
+        stderr = output[err_read].decode("utf-8").strip()
+        return command.returncode(), stdout, stderr
 
 
 class VnodeClient:
@@ -13,15 +291,20 @@ class VnodeClient:
     Provides client functionality for interacting with a virtual node.
     """
 
-    def __init__(self, name: str, ctrlchnlname: str) -> None:
+    def __init__(self, name: str, ctrlchnlname: str, use_channel: bool = True) -> None:
         """
         Create a VnodeClient instance.
 
         :param name: name for client
         :param ctrlchnlname: control channel name
+        :param use_channel: True to run commands over a persistent control channel
+            connection, False to fork vcmd for every command
         """
         self.name: str = name
         self.ctrlchnlname: str = ctrlchnlname
+        self.use_channel: bool = use_channel
+        self.channel: Optional[VnodeChannel] = None
+        self.channel_lock: threading.Lock = threading.Lock()
 
     def _verify_connection(self) -> None:
         """
@@ -47,7 +330,35 @@ class VnodeClient:
 
         :return: nothing
         """
-        pass
+        with self.channel_lock:
+            if self.channel is not None:
+                self.channel.close()
+                self.channel = None
+
+    def get_channel(self) -> Optional[VnodeChannel]:
+        """
+        Retrieve the persistent control channel, connecting on first use. When a
+        connection can not be made, the current command falls back to forking vcmd
+        and the connection is retried for the next command.
+
+        :return: connected channel, None when not available
+        """
+        with self.channel_lock:
+            if not self.use_channel:
+                return None
+            if self.channel is None or not self.channel.connected():
+                channel = VnodeChannel(self.ctrlchnlname)
+                try:
+                    channel.connect()
+                except OSError as e:
+                    logging.debug(
+                        "node(%s) control channel unavailable, using vcmd: %s",
+                        self.name,
+                        e,
+                    )
+                    return None
+                self.channel = channel
+            return self.channel
 
     def create_cmd(self, args: str) -> str:
         return f"{VCMD_BIN} -c {self.ctrlchnlname} -- {args}"
@@ -63,5 +374,20 @@ class VnodeClient:
         :raises core.CoreCommandError: when there is a non-zero exit status
         """
         self._verify_connection()
+        # shell commands are interpreted by the host shell around vcmd
+        channel = None if shell else self.get_channel()
+        if channel is not None:
+            argv = shlex.split(args)
+            logging.debug("node(%s) channel cmd wait(%s): %s", self.name, wait, args)
+            try:
+                status, stdout, stderr = channel.run(argv, wait)
+            except OSError as e:
+                logging.warning(
+                    "node(%s) control channel error, using vcmd: %s", self.name, e
+                )
+            else:
+                if status != 0:
+                    raise CoreCommandError(status, argv, stdout, stderr)
+                return stdout
         args = self.create_cmd(args)
         return utils.cmd(args, wait=wait, shell=shell)
@@ -2,7 +2,7 @@ import json
 import logging
 import os
 from tempfile import NamedTemporaryFile
-from typing import TYPE_CHECKING, Callable, Dict, Optional
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Tuple
 
 from core import utils
 from core.emulator.distributed import DistributedServer
@@ -67,6 +67,10 @@ class DockerClient:
         args = f"docker cp {source} {self.name}:{destination}"
         return self.run(args)
 
+    def copy_archive(self, data: bytes) -> str:
+        args = f"docker cp - {self.name}:/"
+        return self.run(args, data=data)
+
 
 class DockerNode(CoreNode):
     apitype = NodeTypes.DOCKER
@@ -196,6 +200,8 @@ class DockerNode(CoreNode):
         :param mode: mode for file
         :return: nothing
         """
+        if self.stage_file(filename, contents, mode):
+            return
         logging.debug("nodefile filename(%s) mode(%s)", filename, mode)
         directory = os.path.dirname(filename)
         temp = NamedTemporaryFile(delete=False)
@@ -215,6 +221,25 @@ class DockerNode(CoreNode):
             "node(%s) added file: %s; mode: 0%o", self.name, filename, mode
         )
 
+    def stages_files(self) -> bool:
+        """
+        Check if node files should be staged and sent in bulk, which is always the
+        case for containers.
+
+        :return: True
+        """
+        return True
+
+    def put_files(self, files: Dict[str, Tuple[str, int]]) -> None:
+        """
+        Create several node files within a single tar stream, preserving modes.
+
+        :param files: mapping of file names to their contents and mode
+        :return: nothing
+        """
+        self.client.copy_archive(utils.tar_files(files))
+        logging.debug("node(%s) added files: %s", self.name, ", ".join(files))
+
     def nodefilecopy(self, filename: str, srcfilename: str, mode: int = None) -> None:
         """
         Copy a file to a node, following symlinks and preserving metadata.
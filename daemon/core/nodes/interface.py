@@ -8,6 +8,8 @@ from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
 
 from core import utils
 from core.emulator.enumerations import MessageFlags, TransportType
+from core.emulator.profiler import COMMAND
+from core.emulator.validator import device_ready
 from core.errors import CoreCommandError
 from core.nodes.netclient import LinuxNetClient, get_net_client
 
@@ -86,10 +88,11 @@ class CoreInterface:
         :return: combined stdout and stderr
         :raises CoreCommandError: when a non-zero exit status occurs
         """
-        if self.server is None:
-            return utils.cmd(args, env, cwd, wait, shell)
-        else:
-            return self.server.remote_cmd(args, env, cwd, wait)
+        with self.session.profiler.timer(COMMAND, args):
+            if self.server is None:
+                return utils.cmd(args, env, cwd, wait, shell)
+            else:
+                return self.server.remote_cmd(args, env, cwd, wait)
 
     def startup(self) -> None:
         """
@@ -272,8 +275,9 @@ class Veth(CoreInterface):
         :return: nothing
         :raises CoreCommandError: when there is a command exception
         """
-        self.net_client.create_veth(self.localname, self.name)
-        self.net_client.device_up(self.localname)
+        with self.net_client.batch():
+            self.net_client.create_veth(self.localname, self.name)
+            self.net_client.device_up(self.localname)
         self.up = True
 
     def shutdown(self) -> None:
@@ -296,6 +300,12 @@ class Veth(CoreInterface):
                 self.net_client.delete_device(self.localname)
             except CoreCommandError:
                 logging.info("link already removed: %s", self.localname)
+        elif self.node:
+            # both ends of a direct link live within nodes
+            try:
+                self.node.node_net_client.delete_device(self.name)
+            except CoreCommandError:
+                logging.info("link already removed: %s", self.name)
 
         self.up = False
 
@@ -421,11 +431,7 @@ class TunTap(CoreInterface):
         logging.debug("waiting for device node: %s", self.name)
 
         def nodedevexists():
-            try:
-                self.node.node_net_client.device_show(self.name)
-                return 0
-            except CoreCommandError:
-                return 1
+            return 0 if device_ready(self.node, self.name) else 1
 
         count = 0
         while True:
@@ -456,8 +462,9 @@ class TunTap(CoreInterface):
         self.waitfordevicelocal()
         netns = str(self.node.pid)
         self.net_client.device_ns(self.localname, netns)
-        self.node.node_net_client.device_name(self.localname, self.name)
-        self.node.node_net_client.device_up(self.name)
+        with self.node.node_net_client.batch():
+            self.node.node_net_client.device_name(self.localname, self.name)
+            self.node.node_net_client.device_up(self.name)
 
     def setaddrs(self) -> None:
         """
@@ -466,8 +473,9 @@ class TunTap(CoreInterface):
         :return: nothing
         """
         self.waitfordevicenode()
-        for addr in self.addrlist:
-            self.node.node_net_client.create_address(self.name, str(addr))
+        with self.node.node_net_client.batch():
+            for addr in self.addrlist:
+                self.node.node_net_client.create_address(self.name, str(addr))
 
 
 class GreTap(CoreInterface):
@@ -555,3 +563,82 @@ class GreTap(CoreInterface):
         :return: link data
         """
         return []
+
+
+class Vxlan(CoreInterface):
+    """
+    VXLAN device for a multiplexed overlay between emulation servers. Traffic
+    for several networks is carried by one device, using a VLAN sub interface
+    attached to the bridge of each network.
+    """
+
+    def __init__(
+        self,
+        session: "Session",
+        _id: int,
+        remoteip: str,
+        vni: int,
+        localip: str = None,
+        port: int = 4789,
+        mtu: int = 1450,
+        start: bool = True,
+        server: "DistributedServer" = None,
+    ) -> None:
+        """
+        Creates a Vxlan instance.
+
+        :param session: core session instance
+        :param _id: overlay id, used for the device name
+        :param remoteip: remote address
+        :param vni: VXLAN network identifier
+        :param localip: local address
+        :param port: destination UDP port
+        :param mtu: interface mtu
+        :param start: start flag
+        :param server: remote server node
+            will run on, default is None for localhost
+        :raises CoreCommandError: when there is a command exception
+        """
+        self.id: int = _id
+        sessionid = session.short_session_id()
+        localname = f"vx{self.id}.{sessionid}"
+        super().__init__(session, None, localname, localname, mtu, server)
+        self.vni: int = vni
+        if not start:
+            return
+        if remoteip is None:
+            raise ValueError("missing remote IP required for VXLAN device")
+        with self.net_client.batch():
+            self.net_client.create_vxlan(self.localname, remoteip, localip, vni, port)
+            self.net_client.device_up(self.localname)
+        self.up = True
+
+    def add_vlan(self, vlan_id: int, bridge_name: str) -> str:
+        """
+        Create a VLAN sub interface and attach it to a bridge.
+
+        :param vlan_id: VLAN id for the sub interface
+        :param bridge_name: bridge to attach sub interface to
+        :return: name of sub interface
+        """
+        device = f"{self.localname}.{vlan_id}"
+        if len(device) >= 16:
+            raise ValueError(f"interface name ({device}) too long")
+        with self.net_client.batch():
+            self.net_client.create_vlan(device, self.localname, vlan_id)
+            self.net_client.set_interface_master(bridge_name, device)
+        return device
+
+    def shutdown(self) -> None:
+        """
+        Shutdown logic for a Vxlan, removing sub interfaces along with it.
+
+        :return: nothing
+        """
+        if not self.up:
+            return
+        try:
+            self.net_client.delete_device(self.localname)
+        except CoreCommandError:
+            logging.exception("error during shutdown")
+        self.up = False
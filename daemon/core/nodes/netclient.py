@@ -1,11 +1,18 @@
 """
 Clients for dealing with bridge/interface commands.
 """
-from typing import Callable
+import re
+import shlex
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, List
 
 import netaddr
 
 from core.constants import ETHTOOL_BIN, IP_BIN, OVS_BIN, SYSCTL_BIN, TC_BIN
+from core.errors import CoreCommandError
+
+BATCH_FAILED_REGEX = re.compile(r"^Command failed -:(\d+)$", re.MULTILINE)
 
 
 class LinuxNetClient:
@@ -20,6 +27,95 @@ class LinuxNetClient:
         :param run: function to run commands with
         """
         self.run: Callable[..., str] = run
+        self._batch: threading.local = threading.local()
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Accumulate ip operations issued within this context and run them using a
+        single ip -batch invocation. Commands that are not ip operations, or that
+        return output, flush pending operations first to maintain ordering.
+        Pending operations are discarded when the context raises an error.
+
+        :return: nothing
+        :raises CoreCommandError: when a batched operation fails, reporting the
+            failed operation
+        """
+        if getattr(self._batch, "commands", None) is not None:
+            yield
+            return
+        self._batch.commands = []
+        try:
+            yield
+        except BaseException:
+            # discard pending operations, as they likely depend on failed ones
+            self._batch.commands = None
+            raise
+        commands = self._batch.commands
+        self._batch.commands = None
+        self.run_batch(commands)
+
+    def flush(self) -> None:
+        """
+        Run any ip operations pending within the current batch.
+
+        :return: nothing
+        """
+        commands = getattr(self._batch, "commands", None)
+        if commands:
+            self._batch.commands = []
+            self.run_batch(commands)
+
+    def run_batch(self, commands: List[str]) -> None:
+        """
+        Run ip operations using a single ip -batch invocation.
+
+        :param commands: ip operations to run, without the ip command itself
+        :return: nothing
+        :raises CoreCommandError: when an operation fails, reporting the failed
+            operation
+        """
+        if not commands:
+            return
+        if len(commands) == 1:
+            self.run(f"{IP_BIN} {commands[0]}")
+            return
+        script = "\n".join(commands)
+        script = f"{IP_BIN} -batch - <<'EOF'\n{script}\nEOF"
+        try:
+            self.run(f"sh -c {shlex.quote(script)}")
+        except CoreCommandError as e:
+            stderr = e.stderr or ""
+            match = BATCH_FAILED_REGEX.search(stderr)
+            if match is None:
+                raise
+            command = commands[int(match.group(1)) - 1]
+            stderr = stderr[: match.start()].strip()
+            raise CoreCommandError(e.returncode, f"{IP_BIN} {command}", e.output, stderr)
+
+    def ip(self, args: str) -> None:
+        """
+        Run an ip operation, or queue it when within a batch.
+
+        :param args: ip operation arguments
+        :return: nothing
+        """
+        commands = getattr(self._batch, "commands", None)
+        if commands is None:
+            self.run(f"{IP_BIN} {args}")
+        else:
+            commands.append(args)
+
+    def cmd(self, args: str, **kwargs) -> str:
+        """
+        Run a command that can not be batched, after running pending operations.
+
+        :param args: command to run
+        :param kwargs: keyword arguments for the run function
+        :return: command output
+        """
+        self.flush()
+        return self.run(args, **kwargs)
 
     def set_hostname(self, name: str) -> None:
         """
@@ -28,7 +124,7 @@ class LinuxNetClient:
         :param name: name for hostname
         :return: nothing
         """
-        self.run(f"hostname {name}")
+        self.cmd(f"hostname {name}")
 
     def create_route(self, route: str, device: str) -> None:
         """
@@ -38,7 +134,7 @@ class LinuxNetClient:
         :param device: device to add route to
         :return: nothing
         """
-        self.run(f"{IP_BIN} route add {route} dev {device}")
+        self.ip(f"route add {route} dev {device}")
 
     def device_up(self, device: str) -> None:
         """
@@ -47,7 +143,7 @@ class LinuxNetClient:
         :param device: device to bring up
         :return: nothing
         """
-        self.run(f"{IP_BIN} link set {device} up")
+        self.ip(f"link set {device} up")
 
     def device_down(self, device: str) -> None:
         """
@@ -56,7 +152,7 @@ class LinuxNetClient:
         :param device: device to bring down
         :return: nothing
         """
-        self.run(f"{IP_BIN} link set {device} down")
+        self.ip(f"link set {device} down")
 
     def device_name(self, device: str, name: str) -> None:
         """
@@ -66,7 +162,7 @@ class LinuxNetClient:
         :param name: name to set
         :return: nothing
         """
-        self.run(f"{IP_BIN} link set {device} name {name}")
+        self.ip(f"link set {device} name {name}")
 
     def device_show(self, device: str) -> str:
         """
@@ -75,7 +171,7 @@ class LinuxNetClient:
         :param device: device to get information for
         :return: device information
         """
-        return self.run(f"{IP_BIN} link show {device}")
+        return self.cmd(f"{IP_BIN} link show {device}")
 
     def address_show(self, device: str) -> str:
         """
@@ -84,7 +180,7 @@ class LinuxNetClient:
         :param device: device name
         :return: address information
         """
-        return self.run(f"{IP_BIN} address show {device}")
+        return self.cmd(f"{IP_BIN} address show {device}")
 
     def get_mac(self, device: str) -> str:
         """
@@ -93,7 +189,7 @@ class LinuxNetClient:
         :param device: device to get mac for
         :return: MAC address
         """
-        return self.run(f"cat /sys/class/net/{device}/address")
+        return self.cmd(f"cat /sys/class/net/{device}/address")
 
     def get_ifindex(self, device: str) -> str:
         """
@@ -102,7 +198,7 @@ class LinuxNetClient:
         :param device: device to get ifindex for
         :return: ifindex
         """
-        return self.run(f"cat /sys/class/net/{device}/ifindex")
+        return self.cmd(f"cat /sys/class/net/{device}/ifindex")
 
     def device_ns(self, device: str, namespace: str) -> None:
         """
@@ -112,7 +208,7 @@ class LinuxNetClient:
         :param namespace: namespace to set device to
         :return: nothing
         """
-        self.run(f"{IP_BIN} link set {device} netns {namespace}")
+        self.ip(f"link set {device} netns {namespace}")
 
     def device_flush(self, device: str) -> None:
         """
@@ -121,7 +217,7 @@ class LinuxNetClient:
         :param device: device to flush
         :return: nothing
         """
-        self.run(
+        self.cmd(
             f"[ -e /sys/class/net/{device} ] && "
             f"{IP_BIN} address flush dev {device} || true",
             shell=True,
@@ -135,7 +231,7 @@ class LinuxNetClient:
         :param mac: mac to set
         :return: nothing
         """
-        self.run(f"{IP_BIN} link set dev {device} address {mac}")
+        self.ip(f"link set dev {device} address {mac}")
 
     def delete_device(self, device: str) -> None:
         """
@@ -144,7 +240,7 @@ class LinuxNetClient:
         :param device: device to delete
         :return: nothing
         """
-        self.run(f"{IP_BIN} link delete {device}")
+        self.ip(f"link delete {device}")
 
     def delete_tc(self, device: str) -> None:
         """
@@ -153,7 +249,7 @@ class LinuxNetClient:
         :param device: device to remove tc
         :return: nothing
         """
-        self.run(f"{TC_BIN} qdisc delete dev {device} root")
+        self.cmd(f"{TC_BIN} qdisc delete dev {device} root")
 
     def checksums_off(self, interface_name: str) -> None:
         """
@@ -162,7 +258,7 @@ class LinuxNetClient:
         :param interface_name: interface to update
         :return: nothing
         """
-        self.run(f"{ETHTOOL_BIN} -K {interface_name} rx off tx off")
+        self.cmd(f"{ETHTOOL_BIN} -K {interface_name} rx off tx off")
 
     def create_address(self, device: str, address: str, broadcast: str = None) -> None:
         """
@@ -174,15 +270,13 @@ class LinuxNetClient:
         :return: nothing
         """
         if broadcast is not None:
-            self.run(
-                f"{IP_BIN} address add {address} broadcast {broadcast} dev {device}"
-            )
+            self.ip(f"address add {address} broadcast {broadcast} dev {device}")
         else:
-            self.run(f"{IP_BIN} address add {address} dev {device}")
+            self.ip(f"address add {address} dev {device}")
         if netaddr.valid_ipv6(address.split("/")[0]):
             # IPv6 addresses are removed by default on interface down.
             # Make sure that the IPv6 address we add is not removed
-            self.run(f"{SYSCTL_BIN} -w net.ipv6.conf.{device}.keep_addr_on_down=1")
+            self.cmd(f"{SYSCTL_BIN} -w net.ipv6.conf.{device}.keep_addr_on_down=1")
 
     def delete_address(self, device: str, address: str) -> None:
         """
@@ -192,7 +286,7 @@ class LinuxNetClient:
         :param address: address to remove
         :return: nothing
         """
-        self.run(f"{IP_BIN} address delete {address} dev {device}")
+        self.ip(f"address delete {address} dev {device}")
 
     def create_veth(self, name: str, peer: str) -> None:
         """
@@ -202,7 +296,7 @@ class LinuxNetClient:
         :param peer: peer name
         :return: nothing
         """
-        self.run(f"{IP_BIN} link add name {name} type veth peer name {peer}")
+        self.ip(f"link add name {name} type veth peer name {peer}")
 
     def create_gretap(
         self, device: str, address: str, local: str, ttl: int, key: int
@@ -217,14 +311,43 @@ class LinuxNetClient:
         :param key: key for tap
         :return: nothing
         """
-        cmd = f"{IP_BIN} link add {device} type gretap remote {address}"
+        args = f"link add {device} type gretap remote {address}"
         if local is not None:
-            cmd += f" local {local}"
+            args += f" local {local}"
         if ttl is not None:
-            cmd += f" ttl {ttl}"
+            args += f" ttl {ttl}"
         if key is not None:
-            cmd += f" key {key}"
-        self.run(cmd)
+            args += f" key {key}"
+        self.ip(args)
+
+    def create_vxlan(
+        self, device: str, address: str, local: str, vni: int, port: int
+    ) -> None:
+        """
+        Create a VXLAN device to a remote address.
+
+        :param device: name of device to create
+        :param address: remote address
+        :param local: local address to tie to
+        :param vni: VXLAN network identifier
+        :param port: destination UDP port
+        :return: nothing
+        """
+        args = f"link add {device} type vxlan id {vni} remote {address} dstport {port}"
+        if local is not None:
+            args += f" local {local}"
+        self.ip(args)
+
+    def create_vlan(self, device: str, parent: str, vlan_id: int) -> None:
+        """
+        Create a VLAN sub interface of a device.
+
+        :param device: name of device to create
+        :param parent: device to create sub interface of
+        :param vlan_id: VLAN id
+        :return: nothing
+        """
+        self.ip(f"link add link {parent} name {device} type vlan id {vlan_id}")
 
     def create_bridge(self, name: str) -> None:
         """
@@ -233,12 +356,12 @@ class LinuxNetClient:
         :param name: bridge name
         :return: nothing
         """
-        self.run(f"{IP_BIN} link add name {name} type bridge")
-        self.run(f"{IP_BIN} link set {name} type bridge stp_state 0")
-        self.run(f"{IP_BIN} link set {name} type bridge forward_delay 0")
-        self.run(f"{IP_BIN} link set {name} type bridge mcast_snooping 0")
-        self.run(f"{IP_BIN} link set {name} type bridge group_fwd_mask 65528")
-        self.device_up(name)
+        with self.batch():
+            self.ip(
+                f"link add name {name} type bridge stp_state 0 forward_delay 0 "
+                f"mcast_snooping 0 group_fwd_mask 65528"
+            )
+            self.device_up(name)
 
     def delete_bridge(self, name: str) -> None:
         """
@@ -247,8 +370,9 @@ class LinuxNetClient:
         :param name: bridge name
         :return: nothing
         """
-        self.device_down(name)
-        self.run(f"{IP_BIN} link delete {name} type bridge")
+        with self.batch():
+            self.device_down(name)
+            self.ip(f"link delete {name} type bridge")
 
     def set_interface_master(self, bridge_name: str, interface_name: str) -> None:
         """
@@ -258,8 +382,9 @@ class LinuxNetClient:
         :param interface_name: interface name
         :return: nothing
         """
-        self.run(f"{IP_BIN} link set dev {interface_name} master {bridge_name}")
-        self.device_up(interface_name)
+        with self.batch():
+            self.ip(f"link set dev {interface_name} master {bridge_name}")
+            self.device_up(interface_name)
 
     def delete_interface(self, bridge_name: str, interface_name: str) -> None:
         """
@@ -269,7 +394,7 @@ class LinuxNetClient:
         :param interface_name: interface name
         :return: nothing
         """
-        self.run(f"{IP_BIN} link set dev {interface_name} nomaster")
+        self.ip(f"link set dev {interface_name} nomaster")
 
     def existing_bridges(self, _id: int) -> bool:
         """
@@ -278,7 +403,7 @@ class LinuxNetClient:
         :param _id: node id to check bridges for
         :return: True if there are existing bridges, False otherwise
         """
-        output = self.run(f"{IP_BIN} -o link show type bridge")
+        output = self.cmd(f"{IP_BIN} -o link show type bridge")
         lines = output.split("\n")
         for line in lines:
             values = line.split(":")
@@ -299,7 +424,7 @@ class LinuxNetClient:
         :param name: bridge name
         :return: nothing
         """
-        self.run(f"{IP_BIN} link set {name} type bridge ageing_time 0")
+        self.ip(f"link set {name} type bridge ageing_time 0")
 
 
 class OvsNetClient(LinuxNetClient):
@@ -314,10 +439,10 @@ class OvsNetClient(LinuxNetClient):
         :param name: bridge name
         :return: nothing
         """
-        self.run(f"{OVS_BIN} add-br {name}")
-        self.run(f"{OVS_BIN} set bridge {name} stp_enable=false")
-        self.run(f"{OVS_BIN} set bridge {name} other_config:stp-max-age=6")
-        self.run(f"{OVS_BIN} set bridge {name} other_config:stp-forward-delay=4")
+        self.cmd(
+            f"{OVS_BIN} add-br {name} -- set bridge {name} stp_enable=false "
+            f"other_config:stp-max-age=6 other_config:stp-forward-delay=4"
+        )
         self.device_up(name)
 
     def delete_bridge(self, name: str) -> None:
@@ -328,7 +453,7 @@ class OvsNetClient(LinuxNetClient):
         :return: nothing
         """
         self.device_down(name)
-        self.run(f"{OVS_BIN} del-br {name}")
+        self.cmd(f"{OVS_BIN} del-br {name}")
 
     def set_interface_master(self, bridge_name: str, interface_name: str) -> None:
         """
@@ -338,7 +463,7 @@ class OvsNetClient(LinuxNetClient):
         :param interface_name: interface name
         :return: nothing
         """
-        self.run(f"{OVS_BIN} add-port {bridge_name} {interface_name}")
+        self.cmd(f"{OVS_BIN} add-port {bridge_name} {interface_name}")
         self.device_up(interface_name)
 
     def delete_interface(self, bridge_name: str, interface_name: str) -> None:
@@ -349,7 +474,7 @@ class OvsNetClient(LinuxNetClient):
         :param interface_name: interface name
         :return: nothing
         """
-        self.run(f"{OVS_BIN} del-port {bridge_name} {interface_name}")
+        self.cmd(f"{OVS_BIN} del-port {bridge_name} {interface_name}")
 
     def existing_bridges(self, _id: int) -> bool:
         """
@@ -358,7 +483,7 @@ class OvsNetClient(LinuxNetClient):
         :param _id: node id to check bridges for
         :return: True if there are existing bridges, False otherwise
         """
-        output = self.run(f"{OVS_BIN} list-br")
+        output = self.cmd(f"{OVS_BIN} list-br")
         if output:
             for line in output.split("\n"):
                 fields = line.split(".")
@@ -373,7 +498,7 @@ class OvsNetClient(LinuxNetClient):
         :param name: bridge name
         :return: nothing
         """
-        self.run(f"{OVS_BIN} set bridge {name} other_config:mac-aging-time=0")
+        self.cmd(f"{OVS_BIN} set bridge {name} other_config:mac-aging-time=0")
 
 
 def get_net_client(use_ovs: bool, run: Callable[..., str]) -> LinuxNetClient:
@@ -5,12 +5,12 @@ Defines network nodes used within core.
 import logging
 import threading
 import time
-from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Type
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set, Tuple, Type
 
 import netaddr
 
 from core import utils
-from core.constants import EBTABLES_BIN, TC_BIN
+from core.constants import EBTABLES_BIN, NFT_BIN, TC_BIN
 from core.emulator.data import LinkData, NodeData
 from core.emulator.emudata import LinkOptions
 from core.emulator.enumerations import (
@@ -20,6 +20,7 @@ from core.emulator.enumerations import (
     NodeTypes,
     RegisterTlvs,
 )
+from core.emulator.profiler import COMMAND
 from core.errors import CoreCommandError, CoreError
 from core.nodes.base import CoreNetworkBase
 from core.nodes.interface import CoreInterface, GreTap, Veth
@@ -39,13 +40,16 @@ class EbtablesQueue:
     """
     Helper class for queuing up ebtables commands into rate-limited
     atomic commits. This improves performance and reliability when there are
-    many WLAN link updates.
+    many WLAN link updates. Rules applied for each WLAN are tracked, so that only
+    the rules that have changed are added or deleted on each update.
     """
 
     # update rate is every 300ms
     rate: float = 0.3
     # ebtables
     atomic_file: str = "/tmp/pycore.ebtables.atomic"
+    # max size of a single shell command line used to apply atomic commands
+    max_script: int = 65536
 
     def __init__(self) -> None:
         """
@@ -58,6 +62,8 @@ class EbtablesQueue:
         self.updatelock: threading.Lock = threading.Lock()
         # list of pending ebtables commands
         self.cmds: List[str] = []
+        # rules currently applied to the chain of each WLAN
+        self.rules: Dict["CoreNetwork", Set[str]] = {}
         # list of WLANs requiring update
         self.updates: List["CoreNetwork"] = []
         # timestamps of last WLAN update; this keeps track of WLANs that are
@@ -85,6 +91,7 @@ class EbtablesQueue:
         :return: nothing
         """
         with self.updatelock:
+            self.rules.pop(wlan, None)
             try:
                 del self.last_update_time[wlan]
             except KeyError:
@@ -141,50 +148,97 @@ class EbtablesQueue:
         :return: nothing
         """
         while self.doupdateloop:
-            with self.updatelock:
-                for wlan in self.updates:
-                    # Check if wlan is from a previously closed session. Because of the
-                    # rate limiting scheme employed here, this may happen if a new session
-                    # is started soon after closing a previous session.
-                    # TODO: if these are WlanNodes, this will never throw an exception
-                    try:
-                        wlan.session
-                    except Exception:
-                        # Just mark as updated to remove from self.updates.
-                        self.updated(wlan)
-                        continue
-
-                    if self.lastupdate(wlan) > self.rate:
-                        self.buildcmds(wlan)
-                        self.ebcommit(wlan)
-                        self.updated(wlan)
-
+            self.processupdates()
             time.sleep(self.rate)
 
-    def ebcommit(self, wlan: "CoreNetwork") -> None:
+    def dueupdates(self) -> List["CoreNetwork"]:
         """
-        Perform ebtables atomic commit using commands built in the self.cmds list.
+        Find WLANs with changes pending for longer than the update rate. Must be
+        called while holding the update lock.
 
-        :return: nothing
+        :return: WLANs to update
         """
-        # save kernel ebtables snapshot to a file
-        args = self.ebatomiccmd("--atomic-save")
-        wlan.host_cmd(args)
+        due = []
+        for wlan in list(self.updates):
+            # Check if wlan is from a previously closed session. Because of the
+            # rate limiting scheme employed here, this may happen if a new session
+            # is started soon after closing a previous session.
+            # TODO: if these are WlanNodes, this will never throw an exception
+            try:
+                wlan.session
+            except Exception:
+                # Just mark as updated to remove from self.updates.
+                self.updated(wlan)
+                continue
 
-        # modify the table file using queued ebtables commands
-        for c in self.cmds:
-            args = self.ebatomiccmd(c)
-            wlan.host_cmd(args)
-        self.cmds = []
+            if self.lastupdate(wlan) > self.rate:
+                due.append(wlan)
+        return due
+
+    def processupdates(self) -> None:
+        """
+        Build and commit changes for WLANs needing update. WLANs whose commit
+        failed remain queued, so their chains are rebuilt on the next update.
 
-        # commit the table file to the kernel
-        args = self.ebatomiccmd("--atomic-commit")
-        wlan.host_cmd(args)
+        :return: nothing
+        """
+        with self.updatelock:
+            for wlan in self.dueupdates():
+                self.buildcmds(wlan)
+                if self.ebcommit(wlan):
+                    self.updated(wlan)
+                else:
+                    self.last_update_time[wlan] = time.monotonic()
+
+    def ebscripts(self) -> List[str]:
+        """
+        Build shell scripts that save the kernel ebtables snapshot to a file, modify
+        the table file using queued ebtables commands, commit the table file to the
+        kernel and remove it. Commands are split across scripts only when needed to
+        remain within command line size limits.
+
+        :return: shell scripts to run in order
+        """
+        args = [self.ebatomiccmd("--atomic-save")]
+        args.extend(self.ebatomiccmd(x) for x in self.cmds)
+        args.append(self.ebatomiccmd("--atomic-commit"))
+        args.append(f"rm -f {self.atomic_file}")
+        scripts = []
+        script = []
+        size = 0
+        for arg in args:
+            if script and size + len(arg) > self.max_script:
+                scripts.append(" && ".join(script))
+                script = []
+                size = 0
+            script.append(arg)
+            size += len(arg) + 4
+        scripts.append(" && ".join(script))
+        return scripts
+
+    def ebcommit(self, wlan: "CoreNetwork") -> bool:
+        """
+        Perform ebtables atomic commit using commands built in the self.cmds list.
+        When the commit fails, the WLAN chain will be rebuilt on its next update.
 
+        :return: True if commit succeeded, False otherwise
+        """
+        if not self.cmds:
+            return True
+        scripts = self.ebscripts()
+        self.cmds = []
         try:
-            wlan.host_cmd(f"rm -f {self.atomic_file}")
+            for script in scripts:
+                wlan.host_cmd(script, shell=True)
         except CoreCommandError:
-            logging.exception("error removing atomic file: %s", self.atomic_file)
+            logging.exception("error committing ebtables for wlan: %s", wlan.name)
+            self.rules.pop(wlan, None)
+            try:
+                wlan.host_cmd(f"rm -f {self.atomic_file}")
+            except CoreCommandError:
+                logging.exception("error removing atomic file: %s", self.atomic_file)
+            return False
+        return True
 
     def ebchange(self, wlan: "CoreNetwork") -> None:
         """
@@ -197,46 +251,260 @@ class EbtablesQueue:
             if wlan not in self.updates:
                 self.updates.append(wlan)
 
+    def buildrules(self, wlan: "CoreNetwork") -> Set[str]:
+        """
+        Inspect a _linked dict from a wlan, and build the ebtables rules expected
+        within the chain for that WLAN.
+
+        :param wlan: wlan entity
+        :return: set of rules, without chain name
+        """
+        rules = set()
+        for netif1, v in wlan._linked.items():
+            for netif2, linked in v.items():
+                if wlan.policy == NetworkPolicy.DROP and linked:
+                    target = "ACCEPT"
+                elif wlan.policy == NetworkPolicy.ACCEPT and not linked:
+                    target = "DROP"
+                else:
+                    continue
+                rules.add(f"-i {netif1.localname} -o {netif2.localname} -j {target}")
+                rules.add(f"-o {netif1.localname} -i {netif2.localname} -j {target}")
+        return rules
+
     def buildcmds(self, wlan: "CoreNetwork") -> None:
         """
-        Inspect a _linked dict from a wlan, and rebuild the ebtables chain for that WLAN.
+        Inspect a _linked dict from a wlan, and update the ebtables chain for that
+        WLAN, by deleting and adding only rules that have changed since the last
+        update. The chain is created or flushed and rebuilt when the applied
+        rules are not known.
 
         :return: nothing
         """
         with wlan._linked_lock:
-            if wlan.has_ebtables_chain:
-                # flush the chain
-                self.cmds.append(f"-F {wlan.brname}")
-            else:
+            rules = self.buildrules(wlan)
+            current = self.rules.get(wlan)
+            if not wlan.has_ebtables_chain:
                 wlan.has_ebtables_chain = True
-                self.cmds.extend(
-                    [
-                        f"-N {wlan.brname} -P {wlan.policy.value}",
-                        f"-A FORWARD --logical-in {wlan.brname} -j {wlan.brname}",
-                    ]
-                )
-            # rebuild the chain
-            for netif1, v in wlan._linked.items():
-                for netif2, linked in v.items():
-                    if wlan.policy == NetworkPolicy.DROP and linked:
-                        self.cmds.extend(
-                            [
-                                f"-A {wlan.brname} -i {netif1.localname} -o {netif2.localname} -j ACCEPT",
-                                f"-A {wlan.brname} -o {netif1.localname} -i {netif2.localname} -j ACCEPT",
-                            ]
-                        )
-                    elif wlan.policy == NetworkPolicy.ACCEPT and not linked:
-                        self.cmds.extend(
-                            [
-                                f"-A {wlan.brname} -i {netif1.localname} -o {netif2.localname} -j DROP",
-                                f"-A {wlan.brname} -o {netif1.localname} -i {netif2.localname} -j DROP",
-                            ]
-                        )
+                current = set()
+                self.cmds.extend(self.createcmds(wlan))
+            elif current is None:
+                # flush the chain
+                current = set()
+                self.cmds.append(self.flushcmd(wlan))
+            for rule in sorted(current - rules):
+                self.cmds.append(self.deletecmd(wlan, rule))
+            for rule in sorted(rules - current):
+                self.cmds.append(self.addcmd(wlan, rule))
+            self.rules[wlan] = rules
+
+    def createcmds(self, wlan: "CoreNetwork") -> List[str]:
+        """
+        Build commands to create the chain for a WLAN.
+
+        :param wlan: wlan entity
+        :return: create commands
+        """
+        return [
+            f"-N {wlan.brname} -P {wlan.policy.value}",
+            f"-A FORWARD --logical-in {wlan.brname} -j {wlan.brname}",
+        ]
+
+    def flushcmd(self, wlan: "CoreNetwork") -> str:
+        """
+        Build command to remove all rules from the chain for a WLAN.
+
+        :param wlan: wlan entity
+        :return: flush command
+        """
+        return f"-F {wlan.brname}"
+
+    def addcmd(self, wlan: "CoreNetwork", rule: str) -> str:
+        """
+        Build command to add a rule to the chain for a WLAN.
+
+        :param wlan: wlan entity
+        :param rule: rule to add
+        :return: add command
+        """
+        return f"-A {wlan.brname} {rule}"
+
+    def deletecmd(self, wlan: "CoreNetwork", rule: str) -> str:
+        """
+        Build command to delete a rule from the chain for a WLAN.
+
+        :param wlan: wlan entity
+        :param rule: rule to delete
+        :return: delete command
+        """
+        return f"-D {wlan.brname} {rule}"
+
+    def removecmds(self, wlan: "CoreNetwork") -> List[str]:
+        """
+        Build commands to remove the chain for a WLAN, during shutdown.
+
+        :param wlan: wlan entity
+        :return: remove commands
+        """
+        return [
+            f"{EBTABLES_BIN} -D FORWARD --logical-in {wlan.brname} -j {wlan.brname}",
+            f"{EBTABLES_BIN} -X {wlan.brname}",
+        ]
+
+
+class NftablesQueue(EbtablesQueue):
+    """
+    Helper class for queuing up WLAN filtering changes into rate-limited nftables
+    transactions. Each WLAN has its own bridge table, containing a chain that
+    filters traffic using a set of interface pairs, so linking and unlinking
+    only adds or deletes set elements.
+    """
+
+    def table(self, wlan: "CoreNetwork") -> str:
+        """
+        Name of the nftables bridge table used for a WLAN.
+
+        :param wlan: wlan entity
+        :return: table name
+        """
+        name = wlan.brname.replace(".", "_")
+        return f"bridge core_{name}"
+
+    def buildrules(self, wlan: "CoreNetwork") -> Set[str]:
+        """
+        Inspect a _linked dict from a wlan, and build the interface pair set
+        elements expected for that WLAN. Pairs are allowed for a drop policy and
+        dropped for an accept policy.
+
+        :param wlan: wlan entity
+        :return: set of interface pair elements
+        """
+        elements = set()
+        for netif1, v in wlan._linked.items():
+            for netif2, linked in v.items():
+                if linked == (wlan.policy == NetworkPolicy.DROP):
+                    name1 = netif1.localname
+                    name2 = netif2.localname
+                    elements.add(f'"{name1}" . "{name2}"')
+                    elements.add(f'"{name2}" . "{name1}"')
+        return elements
+
+    def createcmds(self, wlan: "CoreNetwork") -> List[str]:
+        table = self.table(wlan)
+        if wlan.policy == NetworkPolicy.DROP:
+            verdict = "accept"
+        else:
+            verdict = "drop"
+        return [
+            f"add table {table}",
+            f"add set {table} links {{ type ifname . ifname; }}",
+            f"add chain {table} forward "
+            f"{{ type filter hook forward priority 0; policy accept; }}",
+            f'add rule {table} forward meta ibrname != "{wlan.brname}" accept',
+            f"add rule {table} forward iifname . oifname @links {verdict}",
+            f"add rule {table} forward {wlan.policy.value.lower()}",
+        ]
+
+    def flushcmd(self, wlan: "CoreNetwork") -> str:
+        return f"flush set {self.table(wlan)} links"
+
+    def addcmd(self, wlan: "CoreNetwork", rule: str) -> str:
+        return f"add element {self.table(wlan)} links {{ {rule} }}"
+
+    def deletecmd(self, wlan: "CoreNetwork", rule: str) -> str:
+        return f"delete element {self.table(wlan)} links {{ {rule} }}"
+
+    def removecmds(self, wlan: "CoreNetwork") -> List[str]:
+        return [f"{NFT_BIN} delete table {self.table(wlan)}"]
+
+    def ebscripts(self) -> List[str]:
+        """
+        Build shell scripts that apply queued commands as nftables transactions.
+        Commands are split across transactions only when needed to remain within
+        command line size limits.
+
+        :return: shell scripts to run in order
+        """
+        scripts = []
+        script = []
+        size = 0
+        for cmd in self.cmds:
+            if script and size + len(cmd) > self.max_script:
+                scripts.append(script)
+                script = []
+                size = 0
+            script.append(cmd)
+            size += len(cmd) + 1
+        if script:
+            scripts.append(script)
+        return [
+            f"{NFT_BIN} -f - <<'EOF'\n" + "\n".join(x) + "\nEOF" for x in scripts
+        ]
+
+    def processupdates(self) -> None:
+        """
+        Build commands for WLANs needing update while holding the update lock,
+        then apply them after releasing it. Since each WLAN has its own table,
+        link changes are not blocked on nftables transactions for other WLANs.
+        WLANs whose transaction failed are queued again, so their sets are
+        rebuilt on the next update.
+
+        :return: nothing
+        """
+        commits = []
+        with self.updatelock:
+            for wlan in self.dueupdates():
+                self.buildcmds(wlan)
+                commits.append((wlan, self.ebscripts()))
+                self.cmds = []
+                self.updated(wlan)
+        for wlan, scripts in commits:
+            if self.runscripts(wlan, scripts):
+                continue
+            with self.updatelock:
+                self.rules.pop(wlan, None)
+                if wlan in self.last_update_time and wlan not in self.updates:
+                    self.updates.append(wlan)
+
+    def runscripts(self, wlan: "CoreNetwork", scripts: List[str]) -> bool:
+        """
+        Run nftables transaction scripts for a WLAN.
+
+        :param wlan: wlan entity
+        :param scripts: scripts to run in order
+        :return: True if transactions succeeded, False otherwise
+        """
+        try:
+            for script in scripts:
+                wlan.host_cmd(script, shell=True)
+        except CoreCommandError:
+            logging.exception("error committing nftables for wlan: %s", wlan.name)
+            return False
+        return True
+
+    def ebcommit(self, wlan: "CoreNetwork") -> bool:
+        """
+        Apply queued commands within nftables transactions.
+        When a transaction fails, the WLAN set will be rebuilt on its next update.
+
+        :return: True if transactions succeeded, False otherwise
+        """
+        if not self.cmds:
+            return True
+        scripts = self.ebscripts()
+        self.cmds = []
+        if self.runscripts(wlan, scripts):
+            return True
+        self.rules.pop(wlan, None)
+        return False
 
 
 # a global object because all WLANs share the same queue
 # cannot have multiple threads invoking the ebtables commnd
 ebq: EbtablesQueue = EbtablesQueue()
+# nftables WLANs use separate tables, so do not need to share the ebtables queue,
+# transactions are applied without holding the queue update lock
+nftq: NftablesQueue = NftablesQueue()
 
 
 def ebtablescmds(call: Callable[..., str], cmds: List[str]) -> None:
@@ -288,9 +556,15 @@ class CoreNetwork(CoreNetworkBase):
         sessionid = self.session.short_session_id()
         self.brname: str = f"b.{self.id}.{sessionid}"
         self.has_ebtables_chain: bool = False
+        self.filter_queue: EbtablesQueue = ebq
+        if self.session.options.get_config("nftables") == "1":
+            if NFT_BIN:
+                self.filter_queue = nftq
+            else:
+                logging.warning("nft not found, using ebtables for wlan filtering")
         if start:
             self.startup()
-            ebq.startupdateloop(self)
+            self.filter_queue.startupdateloop(self)
 
     def host_cmd(
         self,
@@ -313,8 +587,11 @@ class CoreNetwork(CoreNetworkBase):
         :raises CoreCommandError: when a non-zero exit status occurs
         """
         logging.debug("network node(%s) cmd", self.name)
-        output = utils.cmd(args, env, cwd, wait, shell)
-        self.session.distributed.execute(lambda x: x.remote_cmd(args, env, cwd, wait))
+        with self.session.profiler.timer(COMMAND, args):
+            output = utils.cmd(args, env, cwd, wait, shell)
+            self.session.distributed.execute(
+                lambda x: x.remote_cmd(args, env, cwd, wait)
+            )
         return output
 
     def startup(self) -> None:
@@ -337,16 +614,17 @@ class CoreNetwork(CoreNetworkBase):
         if not self.up:
             return
 
-        ebq.stopupdateloop(self)
+        self.filter_queue.stopupdateloop(self)
 
         try:
             self.net_client.delete_bridge(self.brname)
             if self.has_ebtables_chain:
-                cmds = [
-                    f"{EBTABLES_BIN} -D FORWARD --logical-in {self.brname} -j {self.brname}",
-                    f"{EBTABLES_BIN} -X {self.brname}",
-                ]
-                ebtablescmds(self.host_cmd, cmds)
+                cmds = self.filter_queue.removecmds(self)
+                if self.filter_queue is ebq:
+                    ebtablescmds(self.host_cmd, cmds)
+                else:
+                    for cmd in cmds:
+                        self.host_cmd(cmd)
         except CoreCommandError:
             logging.exception("error during shutdown")
 
@@ -423,7 +701,7 @@ class CoreNetwork(CoreNetworkBase):
                 return
             self._linked[netif1][netif2] = False
 
-        ebq.ebchange(self)
+        self.filter_queue.ebchange(self)
 
     def link(self, netif1: CoreInterface, netif2: CoreInterface) -> None:
         """
@@ -439,7 +717,19 @@ class CoreNetwork(CoreNetworkBase):
                 return
             self._linked[netif1][netif2] = True
 
-        ebq.ebchange(self)
+        self.filter_queue.ebchange(self)
+
+    def tc_device(
+        self, netif: CoreInterface
+    ) -> Tuple[Optional[str], Callable[[str], str]]:
+        """
+        Retrieve the device tc queuing disciplines are applied to, shaping traffic
+        sent to an interface, and the function used to run tc commands.
+
+        :param netif: interface to get tc device for
+        :return: device name, None when not available, and command function
+        """
+        return netif.localname, netif.host_cmd
 
     def linkconfig(
         self, netif: CoreInterface, options: LinkOptions, netif2: CoreInterface = None
@@ -452,7 +742,7 @@ class CoreNetwork(CoreNetworkBase):
         :param netif2: interface two
         :return: nothing
         """
-        devname = netif.localname
+        devname, tc_cmd = self.tc_device(netif)
         tc = f"{TC_BIN} qdisc replace dev {devname}"
         parent = "root"
         changed = False
@@ -464,15 +754,15 @@ class CoreNetwork(CoreNetworkBase):
             limit = 0xFFFF
             tbf = f"tbf rate {bw} burst {burst} limit {limit}"
             if bw > 0:
-                if self.up:
+                if self.up and devname:
                     cmd = f"{tc} {parent} handle 1: {tbf}"
-                    netif.host_cmd(cmd)
+                    tc_cmd(cmd)
                 netif.setparam("has_tbf", True)
                 changed = True
             elif netif.getparam("has_tbf") and bw <= 0:
-                if self.up:
+                if self.up and devname:
                     cmd = f"{TC_BIN} qdisc delete dev {devname} {parent}"
-                    netif.host_cmd(cmd)
+                    tc_cmd(cmd)
                 netif.setparam("has_tbf", False)
                 # removing the parent removes the child
                 netif.setparam("has_netem", False)
@@ -516,16 +806,16 @@ class CoreNetwork(CoreNetworkBase):
             # possibly remove netem if it exists and parent queue wasn't removed
             if not netif.getparam("has_netem"):
                 return
-            if self.up:
+            if self.up and devname:
                 cmd = f"{TC_BIN} qdisc delete dev {devname} {parent} handle 10:"
-                netif.host_cmd(cmd)
+                tc_cmd(cmd)
             netif.setparam("has_netem", False)
         elif len(netem) > 1:
-            if self.up:
+            if self.up and devname:
                 cmd = (
                     f"{TC_BIN} qdisc replace dev {devname} {parent} handle 10: {netem}"
                 )
-                netif.host_cmd(cmd)
+                tc_cmd(cmd)
             netif.setparam("has_netem", True)
 
     def linknet(self, net: CoreNetworkBase) -> CoreInterface:
@@ -978,6 +1268,86 @@ class PtpNet(CoreNetwork):
         return all_links
 
 
+class DirectPtpNet(PtpNet):
+    """
+    Peer to peer network node, linking both nodes directly using a single veth
+    pair moved into each node, without a bridge.
+    """
+
+    is_direct = True
+
+    def startup(self) -> None:
+        """
+        Direct links have no bridge to create.
+
+        :return: nothing
+        """
+        self.up = True
+
+    def shutdown(self) -> None:
+        """
+        Shutdown logic, removing the veth pair when still present.
+
+        :return: nothing
+        """
+        if not self.up:
+            return
+        self.filter_queue.stopupdateloop(self)
+        for netif in self.netifs():
+            netif.shutdown()
+        self._netif.clear()
+        self._linked.clear()
+        del self.session
+        self.up = False
+
+    def attach(self, netif: CoreInterface) -> None:
+        """
+        Attach a network interface, limited to two interfaces and without
+        a bridge to attach to.
+
+        :param netif: network interface
+        :return: nothing
+        """
+        if len(self._netif) >= 2:
+            raise ValueError(
+                "Point-to-point links support at most 2 network interfaces"
+            )
+        CoreNetworkBase.attach(self, netif)
+
+    def detach(self, netif: CoreInterface) -> None:
+        """
+        Detach a network interface.
+
+        :param netif: network interface to detach
+        :return: nothing
+        """
+        CoreNetworkBase.detach(self, netif)
+
+    def tc_device(
+        self, netif: CoreInterface
+    ) -> Tuple[Optional[str], Callable[[str], str]]:
+        """
+        Traffic sent to an interface leaves from the other end of the veth pair,
+        so tc is applied to the peer interface within the peer node.
+
+        :param netif: interface to get tc device for
+        :return: device name, None when not available, and command function
+        """
+        for peer in self.netifs():
+            if peer != netif and peer.up:
+                return peer.name, peer.node.cmd
+        return None, netif.host_cmd
+
+    def addrconfig(self, addrlist: List[str]) -> None:
+        """
+        Direct links have no bridge to set addresses on.
+
+        :param addrlist: address list
+        :return: nothing
+        """
+        pass
+
+
 class SwitchNode(CoreNetwork):
     """
     Provides switch functionality within a core node.
@@ -1051,7 +1421,7 @@ class WlanNode(CoreNetwork):
         """
         super().startup()
         self.net_client.disable_mac_learning(self.brname)
-        ebq.ebchange(self)
+        self.filter_queue.ebchange(self)
 
     def attach(self, netif: CoreInterface) -> None:
         """
@@ -10,12 +10,16 @@ services.
 import enum
 import logging
 import time
+from concurrent.futures import Future
+from functools import partial
 from typing import TYPE_CHECKING, Iterable, List, Tuple, Type
 
 from core import utils
 from core.constants import which
 from core.emulator.data import FileData
 from core.emulator.enumerations import ExceptionLevels, MessageFlags, RegisterTlvs
+from core.emulator.profiler import SERVICE
+from core.emulator.validator import readiness_checks
 from core.errors import CoreCommandError
 from core.nodes.base import CoreNode
 
@@ -462,43 +466,81 @@ class CoreServices:
         :return: nothing
         """
         boot_paths = ServiceDependencies(node.services).boot_paths()
-        funcs = []
+        # generate service files up front for nodes staging files, sending them
+        # to the node at once rather than as each service boots
+        create_files = not node.stages_files()
+        if not create_files:
+            with node.stage_files():
+                for boot_path in boot_paths:
+                    for service in boot_path:
+                        service = self.get_service(
+                            node.id, service.name, default_service=True
+                        )
+                        self.create_service_files(node, service)
+        futures = []
         for boot_path in boot_paths:
-            args = (node, boot_path)
-            funcs.append((self._start_boot_paths, args, {}))
-        result, exceptions = utils.threadpool(funcs)
+            logging.info(
+                "booting node(%s) services: %s",
+                node.name,
+                " -> ".join([x.name for x in boot_path]),
+            )
+            steps = [
+                partial(self._start_boot_path, node, x, create_files)
+                for x in boot_path
+            ]
+            futures.append(self.session.validator.run_steps(steps))
+        exceptions = []
+        for future in futures:
+            exception = future.exception()
+            if exception is not None:
+                exceptions.append(exception)
         if exceptions:
             raise ServiceBootError(*exceptions)
 
-    def _start_boot_paths(self, node: CoreNode, boot_path: List["CoreService"]) -> None:
+    def _start_boot_path(
+        self, node: CoreNode, service: "CoreService", create_files: bool = True
+    ) -> Future:
         """
-        Start all service boot paths found, based on dependencies.
+        Start a service found within a boot path, based on dependencies.
 
-        :param node: node to start services on
-        :param boot_path: service to start in dependent order
-        :return: nothing
+        :param node: node to start service on
+        :param service: service to start
+        :param create_files: True to create service files, False when they have
+            already been created
+        :return: future completed once the service has been validated
         """
-        logging.info(
-            "booting node(%s) services: %s",
-            node.name,
-            " -> ".join([x.name for x in boot_path]),
-        )
-        for service in boot_path:
-            service = self.get_service(node.id, service.name, default_service=True)
-            try:
-                self.boot_service(node, service)
-            except Exception:
-                logging.exception("exception booting service: %s", service.name)
-                raise
+        service = self.get_service(node.id, service.name, default_service=True)
+        name = f"{node.name}:{service.name}"
+        start = time.monotonic()
+        try:
+            future = self.boot_service(node, service, create_files)
+        except Exception:
+            logging.exception("exception booting service: %s", service.name)
+            raise
 
-    def boot_service(self, node: CoreNode, service: "CoreService") -> None:
+        def boot_done(done: Future) -> None:
+            self.session.profiler.record(SERVICE, name, time.monotonic() - start)
+            if done.exception() is not None:
+                logging.error("error booting service %s: %s", name, done.exception())
+
+        future.add_done_callback(boot_done)
+        return future
+
+    def boot_service(
+        self, node: CoreNode, service: "CoreService", create_files: bool = True
+    ) -> Future:
         """
         Start a service on a node. Create private dirs, generate config
-        files, and execute startup commands.
+        files, and execute startup commands. Validation is scheduled, rather
+        than waited for, and may complete early using readiness checks for files
+        and ports provided by the service.
 
         :param node: node to boot services on
         :param service: service to start
-        :return: nothing
+        :param create_files: True to create service files, False when they have
+            already been created
+        :return: future completed once the service has been validated, raising
+            ServiceBootError when validation fails
         """
         logging.info(
             "starting node(%s) service(%s) validation(%s)",
@@ -520,7 +562,8 @@ class CoreServices:
                 )
 
         # create service files
-        self.create_service_files(node, service)
+        if create_files:
+            self.create_service_files(node, service)
 
         # run startup
         wait = service.validation_mode == ServiceMode.BLOCKING
@@ -530,30 +573,34 @@ class CoreServices:
                 "node(%s) service(%s) error during startup" % (node.name, service.name)
             )
 
-        # blocking mode is finished
+        # blocking mode is finished, once ready
+        validator = self.session.validator
+        checks = readiness_checks(
+            node, service.validation_files, service.validation_ports
+        )
         if wait:
-            return
+            error = ServiceBootError(
+                "node(%s) service(%s) failed to become ready" % (node.name, service.name)
+            )
+            return validator.validate(
+                checks, service.validation_timer, service.validation_period, error
+            )
 
-        # timer mode, sleep and return
+        # timer mode, wait for timer or until ready
         if service.validation_mode == ServiceMode.TIMER:
-            time.sleep(service.validation_timer)
+            if not checks:
+                return validator.timer(service.validation_timer)
+            return validator.validate(
+                checks, service.validation_timer, service.validation_period
+            )
         # non-blocking, attempt to validate periodically, up to validation_timer time
-        elif service.validation_mode == ServiceMode.NON_BLOCKING:
-            start = time.monotonic()
-            while True:
-                status = self.validate_service(node, service)
-                if not status:
-                    break
-
-                if time.monotonic() - start > service.validation_timer:
-                    break
-
-                time.sleep(service.validation_period)
-
-            if status:
-                raise ServiceBootError(
-                    "node(%s) service(%s) failed validation" % (node.name, service.name)
-                )
+        checks.insert(0, lambda: self.validate_service(node, service) == 0)
+        error = ServiceBootError(
+            "node(%s) service(%s) failed validation" % (node.name, service.name)
+        )
+        return validator.validate(
+            checks, service.validation_timer, service.validation_period, error
+        )
 
     def copy_service_file(self, node: CoreNode, filename: str, cfg: str) -> bool:
         """
@@ -840,6 +887,10 @@ class CoreService:
     # validation period in seconds, how frequent validation is attempted
     validation_period = 0.5
 
+    # files, such as pidfiles, and ports expected once the service is ready
+    validation_files = ()
+    validation_ports = ()
+
     # metadata associated with this service
     meta = None
 
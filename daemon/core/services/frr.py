@@ -24,6 +24,7 @@ class FRRZebra(CoreService):
     startup = ("sh frrboot.sh zebra",)
     shutdown = ("killall zebra",)
     validate = ("pidof zebra",)
+    validation_ports = (2601,)
 
     @classmethod
     def generate_config(cls, node, filename):
@@ -382,6 +383,7 @@ class FRROspfv2(FrrService):
     startup = ()
     shutdown = ("killall ospfd",)
     validate = ("pidof ospfd",)
+    validation_ports = (2604,)
     ipv4_routing = True
 
     @staticmethod
@@ -445,6 +447,7 @@ class FRROspfv3(FrrService):
     startup = ()
     shutdown = ("killall ospf6d",)
     validate = ("pidof ospf6d",)
+    validation_ports = (2606,)
     ipv4_routing = True
     ipv6_routing = True
 
@@ -526,6 +529,7 @@ class FRRBgp(FrrService):
     startup = ()
     shutdown = ("killall bgpd",)
     validate = ("pidof bgpd",)
+    validation_ports = (2605,)
     custom_needed = True
     ipv4_routing = True
     ipv6_routing = True
@@ -552,6 +556,7 @@ class FRRRip(FrrService):
     startup = ()
     shutdown = ("killall ripd",)
     validate = ("pidof ripd",)
+    validation_ports = (2602,)
     ipv4_routing = True
 
     @classmethod
@@ -576,6 +581,7 @@ class FRRRipng(FrrService):
     startup = ()
     shutdown = ("killall ripngd",)
     validate = ("pidof ripngd",)
+    validation_ports = (2603,)
     ipv6_routing = True
 
     @classmethod
@@ -664,6 +670,7 @@ class FRRIsis(FrrService):
     startup = ()
     shutdown = ("killall isisd",)
     validate = ("pidof isisd",)
+    validation_ports = (2608,)
     ipv4_routing = True
     ipv6_routing = True
 
@@ -23,6 +23,7 @@ class Zebra(CoreService):
     startup = ("sh quaggaboot.sh zebra",)
     shutdown = ("killall zebra",)
     validate = ("pidof zebra",)
+    validation_ports = (2601,)
 
     @classmethod
     def generate_config(cls, node, filename):
@@ -300,6 +301,7 @@ class Ospfv2(QuaggaService):
     startup = ()
     shutdown = ("killall ospfd",)
     validate = ("pidof ospfd",)
+    validation_ports = (2604,)
     ipv4_routing = True
 
     @staticmethod
@@ -374,6 +376,7 @@ class Ospfv3(QuaggaService):
     startup = ()
     shutdown = ("killall ospf6d",)
     validate = ("pidof ospf6d",)
+    validation_ports = (2606,)
     ipv4_routing = True
     ipv6_routing = True
 
@@ -474,6 +477,7 @@ class Bgp(QuaggaService):
     startup = ()
     shutdown = ("killall bgpd",)
     validate = ("pidof bgpd",)
+    validation_ports = (2605,)
     custom_needed = True
     ipv4_routing = True
     ipv6_routing = True
@@ -500,6 +504,7 @@ class Rip(QuaggaService):
     startup = ()
     shutdown = ("killall ripd",)
     validate = ("pidof ripd",)
+    validation_ports = (2602,)
     ipv4_routing = True
 
     @classmethod
@@ -524,6 +529,7 @@ class Ripng(QuaggaService):
     startup = ()
     shutdown = ("killall ripngd",)
     validate = ("pidof ripngd",)
+    validation_ports = (2603,)
     ipv6_routing = True
 
     @classmethod
@@ -2,11 +2,11 @@
 Miscellaneous utility functions, wrappers around some subprocess procedures.
 """
 
-import concurrent.futures
 import fcntl
 import hashlib
 import importlib
 import inspect
+import io
 import json
 import logging
 import logging.config
@@ -15,6 +15,8 @@ import random
 import shlex
 import shutil
 import sys
+import tarfile
+import time
 from subprocess import PIPE, STDOUT, Popen
 from typing import (
     TYPE_CHECKING,
@@ -22,8 +24,6 @@ from typing import (
     Callable,
     Dict,
     Generic,
-    Iterable,
-    List,
     Optional,
     Tuple,
     Type,
@@ -197,6 +197,7 @@ def cmd(
     cwd: str = None,
     wait: bool = True,
     shell: bool = False,
+    data: bytes = None,
 ) -> str:
     """
     Execute a command on the host and return a tuple containing the exit status and
@@ -207,6 +208,7 @@ def cmd(
     :param cwd: directory to run command in
     :param wait: True to wait for status, False otherwise
     :param shell: True to use shell, False otherwise
+    :param data: data to provide as standard input, default is None
     :return: combined stdout and stderr
     :raises CoreCommandError: when there is a non-zero exit status or the file to
         execute is not found
@@ -216,9 +218,18 @@ def cmd(
         args = shlex.split(args)
     try:
         output = PIPE if wait else DEVNULL
-        p = Popen(args, stdout=output, stderr=output, env=env, cwd=cwd, shell=shell)
+        stdin = PIPE if data is not None else None
+        p = Popen(
+            args,
+            stdin=stdin,
+            stdout=output,
+            stderr=output,
+            env=env,
+            cwd=cwd,
+            shell=shell,
+        )
         if wait:
-            stdout, stderr = p.communicate()
+            stdout, stderr = p.communicate(data)
             stdout = stdout.decode("utf-8").strip()
             stderr = stderr.decode("utf-8").strip()
             status = p.wait()
@@ -278,6 +289,28 @@ def file_demunge(pathname: str, header: str) -> None:
         write_file.write("".join(lines))
 
 
+def tar_files(files: Dict[str, Tuple[str, int]]) -> bytes:
+    """
+    Create a tar archive in memory for files, to be extracted relative to the root
+    directory. File modes are preserved and missing parent directories are created
+    during extraction.
+
+    :param files: mapping of absolute file paths to their contents and mode
+    :return: tar archive data
+    """
+    buffer = io.BytesIO()
+    now = time.time()
+    with tarfile.open(fileobj=buffer, mode="w") as tar:
+        for path, (contents, mode) in files.items():
+            data = contents.encode("utf-8")
+            info = tarfile.TarInfo(path.lstrip("/"))
+            info.size = len(data)
+            info.mode = mode
+            info.mtime = now
+            tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
 def expand_corepath(
     pathname: str, session: "Session" = None, node: "CoreNode" = None
 ) -> str:
@@ -392,34 +425,6 @@ def load_logging_config(config_path: str) -> None:
         logging.config.dictConfig(log_config)
 
 
-def threadpool(
-    funcs: List[Tuple[Callable, Iterable[Any], Dict[Any, Any]]], workers: int = 10
-) -> Tuple[List[Any], List[Exception]]:
-    """
-    Run provided functions, arguments, and keywords within a threadpool
-    collecting results and exceptions.
-
-    :param funcs: iterable that provides a func, args, kwargs
-    :param workers: number of workers for the threadpool
-    :return: results and exceptions from running functions with args and kwargs
-    """
-    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
-        futures = []
-        for func, args, kwargs in funcs:
-            future = executor.submit(func, *args, **kwargs)
-            futures.append(future)
-        results = []
-        exceptions = []
-        for future in concurrent.futures.as_completed(futures):
-            try:
-                result = future.result()
-                results.append(result)
-            except Exception as e:
-                logging.exception("thread pool exception")
-                exceptions.append(e)
-    return results, exceptions
-
-
 def random_mac() -> str:
     """
     Create a random mac address using Xen OID 00:16:3E.
@@ -24,16 +24,20 @@ if TYPE_CHECKING:
 T = TypeVar("T")
 
 
-def write_xml_file(
-    xml_element: etree.Element, file_path: str, doctype: str = None
-) -> None:
-    xml_data = etree.tostring(
+def get_xml_data(xml_element: etree.Element, doctype: str = None) -> bytes:
+    return etree.tostring(
         xml_element,
         xml_declaration=True,
         pretty_print=True,
         encoding="UTF-8",
         doctype=doctype,
     )
+
+
+def write_xml_file(
+    xml_element: etree.Element, file_path: str, doctype: str = None
+) -> None:
+    xml_data = get_xml_data(xml_element, doctype)
     with open(file_path, "wb") as xml_file:
         xml_file.write(xml_data)
 
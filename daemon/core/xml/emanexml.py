@@ -10,6 +10,8 @@ from core.config import Configuration
 from core.emane.nodes import EmaneNet
 from core.emulator.distributed import DistributedServer
 from core.emulator.enumerations import TransportType
+from core.emulator.executor import NODE_STAGE
+from core.emulator.manifest import FileManifest
 from core.nodes.interface import CoreInterface
 from core.nodes.network import CtrlNet
 from core.xml import corexml
@@ -59,6 +61,7 @@ def create_file(
     doc_name: str,
     file_path: str,
     server: DistributedServer = None,
+    manifest: FileManifest = None,
 ) -> None:
     """
     Create xml file.
@@ -68,12 +71,21 @@ def create_file(
     :param file_path: file path to write xml file to
     :param server: remote server node
             will run on, default is None for localhost
+    :param manifest: manifest used to skip writing unchanged files
     :return: nothing
     """
     doctype = (
         f'<!DOCTYPE {doc_name} SYSTEM "file:///usr/share/emane/dtd/{doc_name}.dtd">'
     )
-    if server is not None:
+    if manifest is not None:
+        xml_data = corexml.get_xml_data(xml_element, doctype)
+        manifest.write(
+            file_path,
+            xml_data,
+            lambda: create_file(xml_element, doc_name, file_path, server),
+            server,
+        )
+    elif server is not None:
         temp = NamedTemporaryFile(delete=False)
         create_file(xml_element, doc_name, temp.name)
         temp.close()
@@ -237,18 +249,24 @@ def build_node_platform_xml(
         # increment nem id
         nem_id += 1
 
+    # write platform files for all nodes in parallel
+    session = emane_manager.session
     doc_name = "platform"
+    funcs = []
     for key in sorted(platform_xmls.keys()):
         platform_element = platform_xmls[key]
         if key == "host":
             file_name = "platform.xml"
-            file_path = os.path.join(emane_manager.session.session_dir, file_name)
-            create_file(platform_element, doc_name, file_path)
+            server = None
         else:
             file_name = f"platform{key}.xml"
-            file_path = os.path.join(emane_manager.session.session_dir, file_name)
-            linked_node = emane_manager.session.nodes[key]
-            create_file(platform_element, doc_name, file_path, linked_node.server)
+            server = session.nodes[key].server
+        file_path = os.path.join(session.session_dir, file_name)
+        args = (platform_element, doc_name, file_path, server, session.manifest)
+        funcs.append((create_file, args, {}))
+    _, exceptions = session.executor.run(NODE_STAGE, funcs)
+    if exceptions:
+        raise exceptions[0]
 
     return nem_id
 
@@ -338,9 +356,10 @@ def build_transport_xml(
     doc_name = "transport"
     file_name = transport_file_name(node.id, transport_type)
     file_path = os.path.join(emane_manager.session.session_dir, file_name)
-    create_file(transport_element, doc_name, file_path)
+    manifest = emane_manager.session.manifest
+    create_file(transport_element, doc_name, file_path, manifest=manifest)
     emane_manager.session.distributed.execute(
-        lambda x: create_file(transport_element, doc_name, file_path, x)
+        lambda x: create_file(transport_element, doc_name, file_path, x, manifest)
     )
 
 
@@ -367,13 +386,13 @@ def create_phy_xml(
     add_configurations(
         phy_element, emane_model.phy_config, config, emane_model.config_ignore
     )
-    create_file(phy_element, "phy", file_path)
+    manifest = emane_model.session.manifest
     if server is not None:
-        create_file(phy_element, "phy", file_path, server)
+        create_file(phy_element, "phy", file_path, server, manifest)
     else:
-        create_file(phy_element, "phy", file_path)
+        create_file(phy_element, "phy", file_path, manifest=manifest)
         emane_model.session.distributed.execute(
-            lambda x: create_file(phy_element, "phy", file_path, x)
+            lambda x: create_file(phy_element, "phy", file_path, x, manifest)
         )
 
 
@@ -402,13 +421,13 @@ def create_mac_xml(
     add_configurations(
         mac_element, emane_model.mac_config, config, emane_model.config_ignore
     )
-    create_file(mac_element, "mac", file_path)
+    manifest = emane_model.session.manifest
     if server is not None:
-        create_file(mac_element, "mac", file_path, server)
+        create_file(mac_element, "mac", file_path, server, manifest)
     else:
-        create_file(mac_element, "mac", file_path)
+        create_file(mac_element, "mac", file_path, manifest=manifest)
         emane_model.session.distributed.execute(
-            lambda x: create_file(mac_element, "mac", file_path, x)
+            lambda x: create_file(mac_element, "mac", file_path, x, manifest)
         )
 
 
@@ -441,12 +460,13 @@ def create_nem_xml(
         etree.SubElement(nem_element, "transport", definition=transport_definition)
     etree.SubElement(nem_element, "mac", definition=mac_definition)
     etree.SubElement(nem_element, "phy", definition=phy_definition)
+    manifest = emane_model.session.manifest
     if server is not None:
-        create_file(nem_element, "nem", nem_file, server)
+        create_file(nem_element, "nem", nem_file, server, manifest)
     else:
-        create_file(nem_element, "nem", nem_file)
+        create_file(nem_element, "nem", nem_file, manifest=manifest)
         emane_model.session.distributed.execute(
-            lambda x: create_file(nem_element, "nem", nem_file, x)
+            lambda x: create_file(nem_element, "nem", nem_file, x, manifest)
         )
 
 
@@ -456,6 +476,7 @@ def create_event_service_xml(
     device: str,
     file_directory: str,
     server: DistributedServer = None,
+    manifest: FileManifest = None,
 ) -> None:
     """
     Create a emane event service xml file.
@@ -466,6 +487,7 @@ def create_event_service_xml(
     :param file_directory: directory to create  file in
     :param server: remote server node
             will run on, default is None for localhost
+    :param manifest: manifest used to skip writing unchanged files
     :return: nothing
     """
     event_element = etree.Element("emaneeventmsgsvc")
@@ -480,7 +502,7 @@ def create_event_service_xml(
         sub_element.text = value
     file_name = "libemaneeventservice.xml"
     file_path = os.path.join(file_directory, file_name)
-    create_file(event_element, "emaneeventmsgsvc", file_path, server)
+    create_file(event_element, "emaneeventmsgsvc", file_path, server, manifest)
 
 
 def transport_file_name(node_id: int, transport_type: TransportType) -> str:
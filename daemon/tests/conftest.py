@@ -53,6 +53,7 @@ class MockServer:
 def patcher(request):
     patch_manager = PatchManager()
     patch_manager.patch_obj(DistributedServer, "remote_cmd", return_value="1")
+    patch_manager.patch_obj(DistributedServer, "remote_batch", return_value=[])
     if request.config.getoption("mock"):
         patch_manager.patch("os.mkdir")
         patch_manager.patch("core.utils.cmd")
@@ -64,6 +65,8 @@ def patcher(request):
         patch_manager.patch_obj(Session, "write_state")
         patch_manager.patch_obj(Session, "write_nodes")
         patch_manager.patch_obj(EmaneManager, "buildxml")
+        patch_manager.patch("core.emulator.validator.file_ready")
+        patch_manager.patch("core.emulator.validator.port_ready")
     yield patch_manager
     patch_manager.shutdown()
 
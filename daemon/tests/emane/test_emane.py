@@ -2,19 +2,23 @@
 Unit tests for testing CORE EMANE networks.
 """
 import os
+import threading
 from tempfile import TemporaryFile
 from xml.etree import ElementTree
 
 import pytest
+from mock import patch
 
 from core.emane.bypass import EmaneBypassModel
 from core.emane.commeffect import EmaneCommEffectModel
 from core.emane.emanemodel import EmaneModel
 from core.emane.ieee80211abg import EmaneIeee80211abgModel
+from core.emane.linkmonitor import EmaneLinkMonitor
 from core.emane.nodes import EmaneNet
 from core.emane.rfpipe import EmaneRfPipeModel
 from core.emane.tdma import EmaneTdmaModel
 from core.emulator.emudata import IpPrefixes, NodeOptions
+from core.emulator.enumerations import MessageFlags
 from core.emulator.session import Session
 from core.errors import CoreCommandError, CoreError
 from core.nodes.base import CoreNode
@@ -41,6 +45,22 @@ def ping(
     return status
 
 
+class FakeClient:
+    def __init__(self, address, links, event=None):
+        self.address = address
+        self.links = links
+        self.event = event
+
+    def get_links(self, loss_threshold):
+        if self.event:
+            self.event.wait()
+        return list(self.links)
+
+    def stop(self):
+        if self.event:
+            self.event.set()
+
+
 class TestEmane:
     @pytest.mark.parametrize("model", _EMANE_MODELS)
     def test_models(self, session: Session, model: EmaneModel, ip_prefixes: IpPrefixes):
@@ -86,6 +106,105 @@ class TestEmane:
         status = ping(node_one, node_two, ip_prefixes, count=5)
         assert not status
 
+    def test_nem_index(self, session: Session, ip_prefixes: IpPrefixes):
+        # given
+        emane_network = session.add_node(EmaneNet)
+        node_one = session.add_node(CoreNode)
+        node_two = session.add_node(CoreNode)
+        for node in [node_one, node_two]:
+            interface = ip_prefixes.create_interface(node)
+            session.add_link(node.id, emane_network.id, interface_one=interface)
+        netif_one = node_one.netif(0)
+        netif_two = node_two.netif(0)
+
+        # when
+        emane_network.setnemid(netif_one, 1)
+        emane_network.setnemid(netif_two, 2)
+        links = session.emane.get_nem_links([(1, 2), (1, 3)])
+
+        # then
+        assert session.emane.nemlookup(1) == (emane_network, netif_one)
+        assert emane_network.getnemnetif(2) is netif_two
+        assert len(links) == 1
+        assert links[0].node1_id == node_one.id
+        assert links[0].node2_id == node_two.id
+        assert links[0].network_id == emane_network.id
+        netif_two.detachnet()
+        assert session.emane.nemlookup(2) == (None, None)
+        assert emane_network.getnemid(netif_two) is None
+
+    def test_link_monitor(self, session: Session, ip_prefixes: IpPrefixes):
+        # given
+        emane_network = session.add_node(EmaneNet)
+        for nem_id in [1, 2]:
+            node = session.add_node(CoreNode)
+            interface = ip_prefixes.create_interface(node)
+            session.add_link(node.id, emane_network.id, interface_one=interface)
+            emane_network.setnemid(node.netif(0), nem_id)
+        client = FakeClient("10.0.0.1", [(1, 2, 10.0), (2, 1, 12.0)])
+        slow_client = FakeClient("10.0.0.2", [], threading.Event())
+        monitor = EmaneLinkMonitor(session.emane)
+        monitor.clients = [client, slow_client]
+        monitor.loss_threshold = 30
+        monitor.link_interval = 0.1
+        monitor.link_timeout = 4
+        links = []
+        session.link_handlers.append(links.append)
+
+        # when
+        monitor.check_links()
+        monitor.check_links()
+        client.links = [(1, 2, 10.04), (2, 1, 15.0)]
+        monitor.check_links()
+
+        # then
+        metrics = monitor.get_metrics()
+        monitor.stop()
+        assert [x.message_type for x in links] == [MessageFlags.ADD, MessageFlags.NONE]
+        assert links[0].label == "10.0 / 12.0"
+        assert links[1].label == "10.0 / 15.0"
+        assert metrics["10.0.0.1"]["count"] == 3
+        assert metrics["10.0.0.2"]["timeouts"] == 3
+
+    def test_install_netif(self, session: Session, ip_prefixes: IpPrefixes):
+        # given
+        emane_network = session.add_node(EmaneNet)
+        node = session.add_node(CoreNode)
+        interface = ip_prefixes.create_interface(node)
+        session.add_link(node.id, emane_network.id, interface_one=interface)
+        netif = node.netif(0)
+        ready = []
+
+        # when
+        with patch.object(netif, "setaddrs") as setaddrs, patch(
+            "core.emane.nodes.device_ready", side_effect=lambda *x: bool(ready)
+        ), patch("core.emane.nodes.TAP_TIMEOUT", 5.0):
+            future = emane_network.installnetif(netif)
+            assert not future.done()
+            ready.append(True)
+            future.result(timeout=5)
+
+        # then
+        setaddrs.assert_called_once_with()
+
+    def test_install_netif_timeout(self, session: Session, ip_prefixes: IpPrefixes):
+        # given
+        emane_network = session.add_node(EmaneNet)
+        node = session.add_node(CoreNode)
+        interface = ip_prefixes.create_interface(node)
+        session.add_link(node.id, emane_network.id, interface_one=interface)
+        netif = node.netif(0)
+
+        # when
+        with patch("core.emane.nodes.device_ready", return_value=False), patch(
+            "core.emane.nodes.TAP_TIMEOUT", 0.1
+        ):
+            future = emane_network.installnetif(netif)
+
+            # then
+            with pytest.raises(CoreError):
+                future.result(timeout=5)
+
     def test_xml_emane(
         self, session: Session, tmpdir: TemporaryFile, ip_prefixes: IpPrefixes
     ):
@@ -4,16 +4,28 @@ import pytest
 
 from core.config import Configuration
 from core.configservice.base import (
+    TEMPLATE_CACHE,
     ConfigService,
     ConfigServiceBootError,
     ConfigServiceMode,
+    TemplateCache,
 )
 from core.emulator.enumerations import ConfigDataTypes
+from core.emulator.executor import SessionExecutor
+from core.emulator.validator import ServiceValidator
 from core.errors import CoreCommandError, CoreError
 
 TEMPLATE_TEXT = "echo hello"
 
 
+def create_node() -> mock.MagicMock:
+    node = mock.MagicMock()
+    node.session.options.get_config_int.return_value = 1
+    node.session.executor = SessionExecutor(node.session)
+    node.session.validator = ServiceValidator(node.session)
+    return node
+
+
 class MyService(ConfigService):
     name = "MyService"
     group = "MyGroup"
@@ -59,6 +71,38 @@ class TestConfigServices:
         assert MyService.files[0] in service.custom_templates
         assert service.custom_templates[MyService.files[0]] == text
 
+    def test_template_cache(self):
+        # given
+        cache = TemplateCache(maxsize=2)
+        text = "echo ${node.name}"
+
+        # when
+        template = cache.get_text_template(MyService, "test.sh", text)
+        cached = cache.get_text_template(MyService, "test.sh", text)
+        cache.get_text_template(MyService, "one.sh", "echo one")
+        cache.get_text_template(MyService, "two.sh", "echo two")
+
+        # then
+        assert template is cached
+        assert cache.stats() == dict(hits=1, misses=3, size=2, maxsize=2)
+        assert cache.text_key(MyService, "test.sh", text) not in cache.templates
+
+    def test_set_template_invalidates_cache(self):
+        # given
+        node = mock.MagicMock()
+        service = MyService(node)
+        name = MyService.files[0]
+        service.set_template(name, "echo custom")
+        service.create_files()
+        key = TEMPLATE_CACHE.text_key(MyService, name, "echo custom")
+        assert key in TEMPLATE_CACHE.templates
+
+        # when
+        service.set_template(name, "echo changed")
+
+        # then
+        assert key not in TEMPLATE_CACHE.templates
+
     def test_create_directories(self):
         # given
         node = mock.MagicMock()
@@ -129,31 +173,31 @@ class TestConfigServices:
 
     def test_run_validation(self):
         # given
-        node = mock.MagicMock()
+        node = create_node()
         service = MyService(node)
 
         # when
-        service.run_validation()
+        service.run_validation().result()
 
         # then
         node.cmd.assert_called_with(MyService.validate[0])
 
     def test_run_validation_timer(self):
         # given
-        node = mock.MagicMock()
+        node = create_node()
         service = MyService(node)
         service.validation_mode = ConfigServiceMode.TIMER
         service.validation_timer = 0
 
         # when
-        service.run_validation()
+        service.run_validation().result()
 
         # then
         node.cmd.assert_called_with(MyService.validate[0])
 
     def test_run_validation_timer_exception(self):
         # given
-        node = mock.MagicMock()
+        node = create_node()
         node.cmd.side_effect = CoreCommandError(1, "error")
         service = MyService(node)
         service.validation_mode = ConfigServiceMode.TIMER
@@ -162,25 +206,25 @@ class TestConfigServices:
 
         # when
         with pytest.raises(ConfigServiceBootError):
-            service.run_validation()
+            service.run_validation().result()
 
     def test_run_validation_non_blocking(self):
         # given
-        node = mock.MagicMock()
+        node = create_node()
         service = MyService(node)
         service.validation_mode = ConfigServiceMode.NON_BLOCKING
         service.validation_period = 0
         service.validation_timer = 0
 
         # when
-        service.run_validation()
+        service.run_validation().result()
 
         # then
         node.cmd.assert_called_with(MyService.validate[0])
 
     def test_run_validation_non_blocking_exception(self):
         # given
-        node = mock.MagicMock()
+        node = create_node()
         node.cmd.side_effect = CoreCommandError(1, "error")
         service = MyService(node)
         service.validation_mode = ConfigServiceMode.NON_BLOCKING
@@ -189,7 +233,37 @@ class TestConfigServices:
 
         # when
         with pytest.raises(ConfigServiceBootError):
-            service.run_validation()
+            service.run_validation().result()
+
+    def test_wait_ready(self):
+        # given
+        node = create_node()
+        service = MyService(node)
+        service.validation_ports = (2601,)
+        service.validation_period = 0
+
+        # when
+        with mock.patch(
+            "core.emulator.validator.port_ready", side_effect=[False, True]
+        ) as port_ready:
+            service.wait_ready().result()
+
+        # then
+        port_ready.assert_called_with(node, 2601)
+        assert port_ready.call_count == 2
+
+    def test_wait_ready_exception(self):
+        # given
+        node = create_node()
+        service = MyService(node)
+        service.validation_files = ("/var/run/test.pid",)
+        service.validation_period = 0
+        service.validation_timer = 0
+
+        # when
+        with mock.patch("core.emulator.validator.file_ready", return_value=False):
+            with pytest.raises(ConfigServiceBootError):
+                service.wait_ready().result()
 
     def test_render_config(self):
         # given
@@ -246,6 +320,7 @@ class TestConfigServices:
         service.run_startup = mock.MagicMock()
         service.run_validation = mock.MagicMock()
         service.wait_validation = mock.MagicMock()
+        service.wait_ready = mock.MagicMock()
 
         # when
         service.start()
@@ -256,6 +331,7 @@ class TestConfigServices:
         service.run_startup.assert_called_once()
         service.run_validation.assert_not_called()
         service.wait_validation.assert_not_called()
+        service.wait_ready.assert_called_once()
 
     def test_start_timer(self):
         # given
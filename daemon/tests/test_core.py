@@ -3,6 +3,7 @@ Unit tests for testing basic CORE networks.
 """
 
 import os
+import tempfile
 import threading
 from typing import Type
 
@@ -10,6 +11,9 @@ import pytest
 
 from core.emulator.emudata import IpPrefixes, NodeOptions
 from core.emulator.enumerations import MessageFlags
+from core.emulator.executor import NODE_STAGE
+from core.emulator.manifest import FileManifest
+from core.emulator.profiler import COMMAND, PHASE, SessionProfiler
 from core.emulator.session import Session
 from core.errors import CoreCommandError
 from core.location.mobility import BasicRangeModel, Ns2ScriptedMobility
@@ -219,3 +223,80 @@ class TestCore:
 
         # validate we receive a node message for updating its location
         assert event.wait(5)
+
+    def test_executor_run(self, session: Session):
+        # given
+        session.options.set_config("node_workers", "2")
+
+        def fail():
+            raise ValueError("fail")
+
+        funcs = [(lambda x: x * 2, (1,), {}), (fail, (), {})]
+        timings = session.executor.get_timings().get(NODE_STAGE, {})
+        count = timings.get("count", 0)
+
+        # when
+        results, exceptions = session.executor.run(NODE_STAGE, funcs)
+
+        # then
+        assert results == [2]
+        assert len(exceptions) == 1
+        assert session.executor.pool_workers[NODE_STAGE] == 2
+        assert session.executor.get_timings()[NODE_STAGE]["count"] == count + 1
+
+    def test_executor_nested_stage(self, session: Session):
+        # given
+        def nested():
+            results, _ = session.executor.run(NODE_STAGE, [(lambda: 1, (), {})])
+            return results[0]
+
+        # when
+        results, exceptions = session.executor.run(NODE_STAGE, [(nested, (), {})])
+
+        # then
+        assert results == [1]
+        assert not exceptions
+
+    def test_profiler_summary(self):
+        # given
+        profiler = SessionProfiler()
+        profiler.record(PHASE, "ignored", 1.0)
+        profiler.start()
+        for value in range(1, 101):
+            profiler.record(COMMAND, f"cmd{value}", value / 100.0)
+
+        # when
+        summary = profiler.summary(limit=2)
+
+        # then
+        assert not summary[PHASE]["slowest"]
+        stats = summary[COMMAND]["stats"]
+        assert stats["count"] == 100
+        assert stats["p50"] == 0.5
+        assert stats["p99"] == 0.99
+        assert [x["name"] for x in summary[COMMAND]["slowest"]] == ["cmd100", "cmd99"]
+
+    def test_file_manifest(self):
+        # given
+        with tempfile.NamedTemporaryFile() as temp_file:
+            file_path = temp_file.name
+            manifest = FileManifest(f"{file_path}.json")
+            writes = []
+
+            def write(data: bytes) -> None:
+                writes.append(data)
+                with open(file_path, "wb") as f:
+                    f.write(data)
+
+            # when
+            for data in [b"one", b"one", b"two"]:
+                manifest.write(file_path, data, lambda: write(data))
+            manifest.invalidate(os.path.dirname(file_path))
+            manifest.write(file_path, b"two", lambda: write(b"two"))
+            manifest.save()
+
+            # then
+            assert writes == [b"one", b"two", b"two"]
+            assert manifest.stats() == dict(written=3, reused=1)
+            assert os.path.exists(manifest.path)
+            os.unlink(manifest.path)
@@ -1,7 +1,34 @@
-from core.emulator.emudata import NodeOptions
+import io
+import os
+import subprocess
+import tarfile
+import threading
+from types import SimpleNamespace
+
+import netaddr
+from lxml import etree
+from mock import patch
+
+from core.emulator.distributed import DistributedServer
+from core.emulator.emudata import IpPrefixes, NodeOptions
 from core.emulator.session import Session
 from core.nodes.base import CoreNode
-from core.nodes.network import HubNode
+from core.nodes.network import HubNode, SwitchNode
+from core.xml import emanexml
+
+
+# unpatched remote batch, as distributed server commands are patched for tests
+REMOTE_BATCH = DistributedServer.remote_batch
+
+
+class LocalConnection:
+    def run(self, cmd, hide=None, env=None, replace_env=False, warn=False):
+        result = subprocess.run(
+            cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+        )
+        return SimpleNamespace(
+            stdout=result.stdout, stderr=result.stderr, exited=result.returncode
+        )
 
 
 class TestDistributed:
@@ -21,7 +48,7 @@ class TestDistributed:
         assert node.server.name == server_name
         assert node.server.host == host
 
-    def test_remote_bridge(self, session: Session):
+    def test_remote_bridge(self, session: Session, ip_prefixes: IpPrefixes):
         # given
         server_name = "core2"
         host = "127.0.0.1"
@@ -31,6 +58,11 @@ class TestDistributed:
         session.distributed.add_server(server_name, host)
         options = NodeOptions(server=server_name)
         node = session.add_node(HubNode, options=options)
+        local_node = session.add_node(CoreNode)
+        remote_node = session.add_node(CoreNode, options=options)
+        for member in (local_node, remote_node):
+            interface = ip_prefixes.create_interface(member)
+            session.add_link(member.id, node.id, interface)
         session.instantiate()
 
         # then
@@ -38,3 +70,216 @@ class TestDistributed:
         assert node.server.name == server_name
         assert node.server.host == host
         assert len(session.distributed.tunnels) > 0
+
+    def test_spanning_tunnels(self, session: Session, ip_prefixes: IpPrefixes):
+        # given
+        server_name = "core2"
+        host = "127.0.0.1"
+        session.distributed.address = host
+        session.distributed.add_server(server_name, host)
+        options = NodeOptions(server=server_name)
+        local_node = session.add_node(CoreNode)
+        remote_node = session.add_node(CoreNode, options=options)
+        remote_peer = session.add_node(CoreNode, options=options)
+        local_switch = session.add_node(SwitchNode)
+        remote_switch = session.add_node(SwitchNode)
+        interface = ip_prefixes.create_interface(local_node)
+        session.add_link(local_node.id, local_switch.id, interface)
+        interface = ip_prefixes.create_interface(remote_node)
+        session.add_link(remote_node.id, remote_switch.id, interface)
+        interface_one = ip_prefixes.create_interface(remote_node)
+        interface_two = ip_prefixes.create_interface(remote_peer)
+        session.add_link(remote_node.id, remote_peer.id, interface_one, interface_two)
+
+        # when
+        session.instantiate()
+        started_tunnels = len(session.distributed.tunnels)
+        interface = ip_prefixes.create_interface(remote_node)
+        session.add_link(remote_node.id, local_switch.id, interface)
+
+        # then
+        assert started_tunnels == 0
+        assert len(session.distributed.tunnels) == 1
+        server = session.distributed.servers[server_name]
+        key = session.distributed.tunnel_key(
+            local_switch.id, netaddr.IPAddress(server.host).value
+        )
+        assert key in session.distributed.tunnels
+
+    def test_overlay(self, session: Session, ip_prefixes: IpPrefixes):
+        # given
+        server_name = "core2"
+        host = "127.0.0.1"
+        session.distributed.address = host
+        session.distributed.add_server(server_name, host)
+        session.options.set_config("distributed_overlay", "1")
+        options = NodeOptions(server=server_name)
+        local_node = session.add_node(CoreNode)
+        remote_node = session.add_node(CoreNode, options=options)
+        switch_one = session.add_node(SwitchNode)
+        switch_two = session.add_node(SwitchNode)
+        for switch in (switch_one, switch_two):
+            interface = ip_prefixes.create_interface(local_node)
+            session.add_link(local_node.id, switch.id, interface)
+        interface = ip_prefixes.create_interface(remote_node)
+        session.add_link(remote_node.id, switch_one.id, interface)
+
+        # when
+        try:
+            session.instantiate()
+            interface = ip_prefixes.create_interface(remote_node)
+            session.add_link(remote_node.id, switch_two.id, interface)
+        finally:
+            session.options.set_config("distributed_overlay", "0")
+
+        # then
+        assert not session.distributed.tunnels
+        assert len(session.distributed.overlays) == 1
+        overlay = session.distributed.overlays[server_name]
+        assert overlay.vlans == {switch_one.id: 1, switch_two.id: 2}
+
+    def test_stage_files(self, session: Session):
+        # given
+        session.distributed.add_server("core2", "127.0.0.1")
+        options = NodeOptions(server="core2")
+        node = session.add_node(CoreNode, options=options)
+        one = node.hostfilename("/etc/staged/one.conf").lstrip("/")
+        two = node.hostfilename("/etc/staged/two.sh").lstrip("/")
+        remote_cmd = node.server.remote_cmd
+        remote_cmd.reset_mock()
+
+        # when
+        with node.stage_files():
+            node.stage_file("/etc/staged/one.conf", "one", 0o644)
+            node.stage_file("/etc/staged/two.sh", "two", 0o755)
+            assert not remote_cmd.called
+        with node.stage_files():
+            node.stage_file("/etc/staged/one.conf", "one", 0o644)
+
+        # then
+        remote_cmd.assert_called_once()
+        args = remote_cmd.call_args[0]
+        assert args[0] == "tar -xpf - -C /"
+        with tarfile.open(fileobj=io.BytesIO(args[4])) as tar:
+            members = {x.name: x for x in tar.getmembers()}
+            assert set(members) == {one, two}
+            assert members[one].mode == 0o644
+            assert members[two].mode == 0o755
+            assert tar.extractfile(members[two]).read() == b"two"
+
+    def test_partition(self, session: Session, ip_prefixes: IpPrefixes):
+        # given
+        session.distributed.add_server("core2", "127.0.0.1")
+        nodes = [session.add_node(CoreNode) for _ in range(4)]
+        for node_one, node_two in [(nodes[0], nodes[1]), (nodes[2], nodes[3])]:
+            interface_one = ip_prefixes.create_interface(node_one)
+            interface_two = ip_prefixes.create_interface(node_two)
+            session.add_link(node_one.id, node_two.id, interface_one, interface_two)
+
+        # when
+        servers = session.distributed.partition()
+
+        # then
+        assert servers[nodes[0].id] == servers[nodes[1].id]
+        assert servers[nodes[2].id] == servers[nodes[3].id]
+        assert servers[nodes[0].id] != servers[nodes[2].id]
+
+    def test_clear_rewrites_remote_files(self, session: Session):
+        # given
+        session.distributed.add_server("core2", "127.0.0.1")
+        server = session.distributed.servers["core2"]
+        path = os.path.join(session.session_dir, "platform1.xml")
+        element = etree.Element("platform")
+
+        # when
+        with patch.object(DistributedServer, "remote_put") as remote_put:
+            emanexml.create_file(element, "platform", path, server, session.manifest)
+            emanexml.create_file(element, "platform", path, server, session.manifest)
+            written = remote_put.call_count
+            session.clear()
+            session.instantiate()
+            emanexml.create_file(element, "platform", path, server, session.manifest)
+
+        # then
+        assert written == 1
+        assert remote_put.call_count == 2
+
+    def test_remote_batch(self):
+        # given
+        server = DistributedServer("core2", "127.0.0.1", connections=1)
+        server.connections.get()
+        server.connections.put(LocalConnection())
+        cmds = ["echo one", "printf two", "exit 3", "echo four; echo five"]
+
+        # when
+        results = REMOTE_BATCH(server, cmds)
+
+        # then
+        assert results == [(0, "one"), (0, "two"), (3, ""), (0, "four\nfive")]
+
+    def test_shutdown(self, session: Session, ip_prefixes: IpPrefixes):
+        # given
+        server_name = "core2"
+        host = "127.0.0.1"
+        session.distributed.address = host
+        session.distributed.add_server(server_name, host)
+        options = NodeOptions(server=server_name)
+        local_node = session.add_node(CoreNode)
+        remote_node = session.add_node(CoreNode, options=options)
+        switches = [session.add_node(SwitchNode) for _ in range(2)]
+        for switch in switches:
+            for node in (local_node, remote_node):
+                interface = ip_prefixes.create_interface(node)
+                session.add_link(node.id, switch.id, interface)
+        session.instantiate()
+        remote_taps = [x[1].localname for x in session.distributed.tunnels.values()]
+
+        # when
+        with patch.object(DistributedServer, "remote_batch") as remote_batch:
+            with patch.object(DistributedServer, "close") as close:
+                session.distributed.shutdown()
+
+        # then
+        remote_batch.assert_called_once()
+        cmds = remote_batch.call_args[0][0]
+        assert len(remote_taps) == 2
+        for name in remote_taps:
+            assert any(x.endswith(f"link delete {name}") for x in cmds)
+        assert cmds[-1] == f"rm -rf {session.session_dir}"
+        close.assert_called_once()
+
+    def test_close(self):
+        # given
+        server = DistributedServer("core2", "127.0.0.1", connections=2)
+        with server.connection():
+            with server.connection():
+                pass
+        conns = list(server.connections.queue)
+
+        # when
+        with patch("core.emulator.distributed.Connection.close") as close:
+            server.close()
+
+        # then
+        assert len(conns) == 2
+        assert close.call_count == 2
+        assert list(server.connections.queue) == conns
+
+    def test_execute(self, session: Session):
+        # given
+        session.distributed.add_server("core2", "127.0.0.1")
+        session.distributed.add_server("core3", "127.0.0.1")
+        threads = {}
+
+        def func(server: DistributedServer) -> None:
+            threads[server.name] = threading.current_thread().name
+
+        # when
+        try:
+            session.distributed.execute(func)
+        finally:
+            session.distributed.servers.pop("core3")
+
+        # then
+        assert set(threads) == {"core2", "core3"}
+        assert all(x.startswith(f"session-{session.id}-") for x in threads.values())
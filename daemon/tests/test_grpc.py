@@ -1,6 +1,6 @@
 import time
 from queue import Queue
-from tempfile import TemporaryFile
+from tempfile import NamedTemporaryFile, TemporaryFile
 from typing import Optional
 
 import grpc
@@ -10,9 +10,11 @@ from mock import patch
 from core.api.grpc import core_pb2
 from core.api.grpc.client import CoreGrpcClient, InterfaceHelper
 from core.api.grpc.emane_pb2 import EmaneModelConfig
+from core.api.grpc.events import EventBroker
 from core.api.grpc.mobility_pb2 import MobilityAction, MobilityConfig
 from core.api.grpc.server import CoreGrpcServer
 from core.api.grpc.services_pb2 import ServiceAction, ServiceConfig, ServiceFileConfig
+from core.api.grpc.throughputs import ThroughputSampler, read_net_stats
 from core.api.grpc.wlan_pb2 import WlanConfig
 from core.api.tlv.dataconversion import ConfigShim
 from core.api.tlv.enumerations import ConfigFlags
@@ -20,7 +22,13 @@ from core.emane.ieee80211abg import EmaneIeee80211abgModel
 from core.emane.nodes import EmaneNet
 from core.emulator.data import EventData, NodeData
 from core.emulator.emudata import IpPrefixes, NodeOptions
-from core.emulator.enumerations import EventTypes, ExceptionLevels, NodeTypes
+from core.emulator.enumerations import (
+    EventTypes,
+    ExceptionLevels,
+    MessageFlags,
+    NodeTypes,
+)
+from core.emulator.profiler import NODE
 from core.errors import CoreError
 from core.location.mobility import BasicRangeModel, Ns2ScriptedMobility
 from core.nodes.base import CoreNode
@@ -338,6 +346,78 @@ class TestGrpc:
         # then
         assert response.config[key] == value
 
+    def test_get_session_profile(self, grpc_server: CoreGrpcServer):
+        # given
+        client = CoreGrpcClient()
+        session = grpc_server.coreemu.create_session()
+        session.profiler.start()
+        session.profiler.record(NODE, "n1", 2.0)
+        session.profiler.record(NODE, "n2", 1.0)
+        session.profiler.stop()
+
+        # then
+        with client.context_connect():
+            response = client.get_session_profile(session.id)
+
+        # then
+        assert response.nodes.stats.count == 2
+        assert response.nodes.slowest[0].name == "n1"
+        assert response.nodes.slowest[0].max == 2.0
+
+    def test_partition_session(self, grpc_server: CoreGrpcServer):
+        # given
+        client = CoreGrpcClient()
+        session = grpc_server.coreemu.create_session()
+        session.distributed.add_server("core2", "127.0.0.1")
+        switch_one = core_pb2.Node(id=1, type=NodeTypes.SWITCH.value)
+        switch_two = core_pb2.Node(id=6, type=NodeTypes.SWITCH.value)
+        nodes = [switch_one, switch_two]
+        links = []
+        for switch in [switch_one, switch_two]:
+            for node_id in range(switch.id + 1, switch.id + 5):
+                nodes.append(core_pb2.Node(id=node_id, model="router"))
+                links.append(core_pb2.Link(node_one_id=node_id, node_two_id=switch.id))
+        links.append(core_pb2.Link(node_one_id=5, node_two_id=7))
+
+        # then
+        with client.context_connect():
+            response = client.partition_session(session.id, nodes, links)
+
+        # then
+        assert response.cross_links == 1
+        servers = response.servers
+        assert {servers[x] for x in range(1, 6)} != {servers[x] for x in range(6, 11)}
+        assert len({servers[x] for x in range(1, 6)}) == 1
+        assert len({servers[x] for x in range(6, 11)}) == 1
+
+    def test_start_session_partition(self, grpc_server: CoreGrpcServer):
+        # given
+        client = CoreGrpcClient()
+        session = grpc_server.coreemu.create_session()
+        session.distributed.address = "127.0.0.1"
+        session.distributed.add_server("core2", "127.0.0.1")
+        session.options.set_config("partition", "1")
+        node_one = core_pb2.Node(id=1, model="PC")
+        node_two = core_pb2.Node(id=2, model="PC", server="core2")
+        node_three = core_pb2.Node(id=3, model="PC")
+        interface_helper = InterfaceHelper(ip4_prefix="10.83.0.0/16")
+        link = core_pb2.Link(
+            type=core_pb2.LinkType.WIRED,
+            node_one_id=node_two.id,
+            node_two_id=node_three.id,
+            interface_one=interface_helper.create_interface(node_two.id, 0),
+            interface_two=interface_helper.create_interface(node_three.id, 0),
+        )
+
+        # then
+        with client.context_connect():
+            client.start_session(session.id, [node_one, node_two, node_three], [link])
+
+        # then
+        assert session.get_node(1, CoreNode).server is None
+        assert session.get_node(2, CoreNode).server.name == "core2"
+        assert session.get_node(3, CoreNode).server.name == "core2"
+
     def test_set_session_state(self, grpc_server: CoreGrpcServer):
         # given
         client = CoreGrpcClient()
@@ -1022,6 +1102,81 @@ class TestGrpc:
             # then
             queue.get(timeout=5)
 
+    def test_batch_events(self, grpc_server: CoreGrpcServer):
+        # given
+        client = CoreGrpcClient()
+        session = grpc_server.coreemu.create_session()
+        node = session.add_node(CoreNode)
+        queue = Queue()
+
+        def handle_event(event_data):
+            assert event_data.session_id == session.id
+            assert event_data.HasField("node_event")
+            queue.put(event_data)
+
+        # then
+        with client.context_connect():
+            client.batch_events(session.id, handle_event)
+            time.sleep(0.1)
+            session.broadcast_node(node)
+
+            # then
+            event_data = queue.get(timeout=5)
+            assert event_data.node_event.node.id == node.id
+
+    def test_event_broker(self, grpc_server: CoreGrpcServer):
+        # given
+        session = grpc_server.coreemu.create_session()
+        node = session.add_node(CoreNode)
+        node_two = session.add_node(CoreNode)
+        broker = EventBroker(session)
+        streamer = broker.subscribe([core_pb2.EventType.NODE], maxsize=2)
+        session_streamer = broker.subscribe([core_pb2.EventType.SESSION])
+
+        # when
+        node.setposition(10, 10)
+        session.broadcast_node(node)
+        node.setposition(20, 20)
+        session.broadcast_node(node)
+        node_two.setposition(30, 30)
+        session.broadcast_node(node_two)
+        session.broadcast_node(node_two, MessageFlags.ADD)
+
+        # then
+        events = streamer.get(max_events=10)
+        assert [x.event.node_event.node.id for x in events] == [node_two.id] * 2
+        assert events[0].event.node_event.node.position.x == 30
+        assert streamer.coalesced == 1
+        assert streamer.dropped == 1
+        assert events[0].data == events[0].event.SerializeToString()
+        assert session_streamer.get(timeout=0) == []
+        assert not broker.unsubscribe(streamer)
+        assert broker.unsubscribe(session_streamer)
+        assert broker.handle not in session.node_handlers
+
+    def test_event_broker_order(self, grpc_server: CoreGrpcServer):
+        # given
+        session = grpc_server.coreemu.create_session()
+        node = session.add_node(CoreNode)
+        broker = EventBroker(session)
+        streamer = broker.subscribe([core_pb2.EventType.NODE])
+
+        # when
+        node.setposition(10, 10)
+        session.broadcast_node(node)
+        session.broadcast_node(node, MessageFlags.DELETE)
+        node.setposition(20, 20)
+        session.broadcast_node(node, MessageFlags.ADD)
+        node.setposition(30, 30)
+        session.broadcast_node(node)
+        broker.unsubscribe(streamer)
+
+        # then
+        events = streamer.get(max_events=10)
+        positions = [x.event.node_event.node.position.x for x in events]
+        assert positions == [10, 10, 20, 30]
+        assert streamer.coalesced == 0
+
     def test_link_events(self, grpc_server: CoreGrpcServer, ip_prefixes: IpPrefixes):
         # given
         client = CoreGrpcClient()
@@ -1068,6 +1223,63 @@ class TestGrpc:
             # then
             queue.get(timeout=5)
 
+    @pytest.mark.parametrize("interval", [-1, 0.01])
+    def test_throughputs_invalid_interval(
+        self, grpc_server: CoreGrpcServer, interval: float
+    ):
+        # given
+        client = CoreGrpcClient()
+        session = grpc_server.coreemu.create_session()
+        request = core_pb2.ThroughputsRequest(session_id=session.id, interval=interval)
+
+        # then
+        with pytest.raises(grpc.RpcError) as e:
+            with client.context_connect():
+                next(client.stub.Throughputs(request))
+        assert e.value.code() == grpc.StatusCode.INVALID_ARGUMENT
+
+    def test_throughput_sampler(
+        self, grpc_server: CoreGrpcServer, ip_prefixes: IpPrefixes
+    ):
+        # given
+        session = grpc_server.coreemu.create_session()
+        switch = session.add_node(SwitchNode)
+        node = session.add_node(CoreNode)
+        interface = ip_prefixes.create_interface(node)
+        session.add_link(node.id, switch.id, interface)
+        netif = node.netif(0)
+        sampler = ThroughputSampler(session, 1)
+        net_dev = NamedTemporaryFile("w", suffix=".dev")
+        net_dev.write(
+            "header\nheader\n"
+            "  eth0: 1 0 0 0 0 0 0 0 1 0 0 0 0 0 0 0\n"
+            f"{netif.localname}: 100 0 0 0 0 0 0 0 100 0 0 0 0 0 0 0\n"
+            f"{switch.brname}: 300 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0\n"
+        )
+        net_dev.flush()
+
+        # when
+        names = sampler.interfaces()
+        with patch("core.api.grpc.throughputs.NET_DEV_FILE", net_dev.name):
+            stats = read_net_stats(names)
+        last_stats = {netif.localname: (0, 0), switch.brname: (200, 0)}
+        event = sampler.create_event(names, stats, last_stats, 2)
+        subscriber = sampler.subscribe()
+        sampler.publish(core_pb2.ThroughputsEvent())
+        sampler.publish(event)
+
+        # then
+        assert names[netif.localname] == (node.id, 0)
+        assert names[switch.brname] == (switch.id, -1)
+        assert set(stats) == {netif.localname, switch.brname}
+        assert event.interface_throughputs[0].node_id == node.id
+        assert event.interface_throughputs[0].throughput == 800
+        assert event.bridge_throughputs[0].node_id == switch.id
+        assert event.bridge_throughputs[0].throughput == 400
+        assert subscriber.get_nowait() == event
+        assert sampler.unsubscribe(subscriber)
+        assert sampler.stop_event is None
+
     def test_session_events(self, grpc_server: CoreGrpcServer):
         # given
         client = CoreGrpcClient()
@@ -1190,6 +1402,45 @@ class TestGrpc:
         assert node.position.x == x
         assert node.position.y == y
 
+    def test_batch_move_nodes(
+        self, grpc_server: CoreGrpcServer, ip_prefixes: IpPrefixes
+    ):
+        # given
+        client = CoreGrpcClient()
+        session = grpc_server.coreemu.create_session()
+        wlan = session.add_node(WlanNode)
+        wlan.setmodel(BasicRangeModel, BasicRangeModel.default_values())
+        node_one = session.add_node(CoreNode)
+        node_two = session.add_node(CoreNode)
+        for node in [node_one, node_two]:
+            interface = ip_prefixes.create_interface(node)
+            session.add_link(node.id, wlan.id, interface)
+        lon, lat, alt = 10.0, 15.0, 5.0
+        moves = [
+            core_pb2.NodeMove(node_id=node_one.id, position=core_pb2.Position(x=1)),
+            core_pb2.NodeMove(
+                node_id=node_one.id, position=core_pb2.Position(x=10, y=20)
+            ),
+            core_pb2.NodeMove(
+                node_id=node_two.id, geo=core_pb2.Geo(lon=lon, lat=lat, alt=alt)
+            ),
+        ]
+        queue = Queue()
+        session.node_handlers.append(queue.put)
+
+        # then
+        with client.context_connect():
+            with patch.object(wlan.model, "update") as update:
+                response = client.batch_move_nodes(session.id, moves)
+
+        # then
+        assert list(response.node_ids) == [node_one.id, node_two.id]
+        assert node_one.position.get()[:2] == (10, 20)
+        assert node_two.position.get_geo() == (lon, lat, alt)
+        assert update.call_count == 1
+        assert len(update.call_args[0][1]) == 2
+        assert queue.qsize() == 2
+
     def test_move_nodes_geo(self, grpc_server: CoreGrpcServer):
         # given
         client = CoreGrpcClient()
@@ -1,9 +1,10 @@
 from typing import Tuple
 
 from core.emulator.emudata import IpPrefixes, LinkOptions
+from core.emulator.enumerations import NodeTypes
 from core.emulator.session import Session
 from core.nodes.base import CoreNode
-from core.nodes.network import SwitchNode
+from core.nodes.network import DirectPtpNet, SwitchNode
 
 
 def create_ptp_network(
@@ -39,6 +40,37 @@ class TestLinks:
         assert node_one.netif(interface_one.id)
         assert node_two.netif(interface_two.id)
 
+    def test_ptp_veth(self, session: Session, ip_prefixes: IpPrefixes):
+        # given
+        session.options.set_config("ptp_veth", "1")
+        node_one = session.add_node(CoreNode)
+        node_two = session.add_node(CoreNode)
+        interface_one = ip_prefixes.create_interface(node_one)
+        interface_two = ip_prefixes.create_interface(node_two)
+        options = LinkOptions(bandwidth=5000000)
+
+        # when
+        try:
+            session.add_link(
+                node_one.id, node_two.id, interface_one, interface_two, options
+            )
+        finally:
+            session.options.set_config("ptp_veth", "0")
+
+        # then
+        netif_one = node_one.netif(interface_one.id)
+        netif_two = node_two.netif(interface_two.id)
+        assert isinstance(netif_one.net, DirectPtpNet)
+        assert netif_one.net == netif_two.net
+        assert netif_one.localname is None
+        assert netif_two.localname is None
+        links = netif_one.net.all_link_data()
+        assert len(links) == 1
+        assert links[0].node1_id == node_one.id
+        assert links[0].node2_id == node_two.id
+        assert links[0].bandwidth == options.bandwidth
+        assert session.get_node_type(DirectPtpNet) == NodeTypes.PEER_TO_PEER
+
     def test_node_to_net(self, session: Session, ip_prefixes: IpPrefixes):
         # given
         node_one = session.add_node(CoreNode)
@@ -1,6 +1,11 @@
+import threading
+import time
+
 import pytest
 
-from core.location.mobility import WayPoint
+from core.location.event import EventLoop
+from core.location.geo import GeoLocation
+from core.location.mobility import RangeGrid, RangeMatrix, WayPoint, np
 
 POSITION = (0.0, 0.0, 0.0)
 
@@ -17,3 +22,141 @@ class TestMobility:
     )
     def test_waypoint_lessthan(self, wp1, wp2, expected):
         assert (wp1 < wp2) == expected
+
+    def test_range_grid_nearby(self):
+        # given
+        grid = RangeGrid(100)
+        grid.update("netif1", 50, 50)
+        grid.update("netif2", 180, 120)
+        grid.update("netif3", 350, 50)
+
+        # when
+        nearby = grid.nearby("netif1")
+
+        # then
+        assert nearby == {"netif1", "netif2"}
+
+    def test_range_grid_move(self):
+        # given
+        grid = RangeGrid(100)
+        grid.update("netif1", 50, 50)
+        grid.update("netif2", 350, 50)
+
+        # when
+        grid.update("netif2", 150, 50)
+        grid.update("netif3", None, None)
+
+        # then
+        assert grid.nearby("netif1") == {"netif1", "netif2"}
+        assert grid.nearby("netif3") == set()
+        assert len(grid.cells) == 2
+
+    @pytest.mark.skipif(np is None, reason="requires numpy")
+    def test_range_matrix_changes(self):
+        # given
+        matrix = RangeMatrix(capacity=2)
+        matrix.update("netif1", 0, 0, None)
+        matrix.update("netif2", 50, 0, None)
+        matrix.update("netif3", 500, 0, 0)
+        matrix.set_linked("netif1", "netif3", True)
+
+        # when
+        changes = matrix.changes(["netif1"], 100)
+
+        # then
+        assert len(matrix.positions) == 4
+        assert sorted(changes) == [
+            ("netif1", "netif2", True),
+            ("netif1", "netif3", False),
+        ]
+
+
+class TestGeoLocation:
+    def test_many_matches_single(self):
+        # given
+        location = GeoLocation()
+        location.setrefgeo(47.5791667, -122.132322, 2.0)
+        location.refscale = 150.0
+        points = [(100.0, 200.0, None), (0.0, 0.0, 5.0), (750.5, 20.25, 10.0)]
+
+        # when
+        xs, ys, zs = zip(*points)
+        lats, lons, alts = location.getgeo_many(xs, ys, zs)
+        xyzs = location.getxyz_many(lats, lons, alts)
+
+        # then
+        for i, point in enumerate(points):
+            lat, lon, alt = location.getgeo(*point)
+            assert lats[i] == pytest.approx(lat)
+            assert lons[i] == pytest.approx(lon)
+            assert alts[i] == pytest.approx(alt)
+            expected = location.getxyz(lat, lon, alt)
+            assert [x[i] for x in xyzs] == pytest.approx(list(expected))
+
+
+class TestEventLoop:
+    def test_events_ordered(self):
+        # given
+        event_loop = EventLoop()
+        results = []
+        done = threading.Event()
+        event_loop.add_event(0.02, results.append, 2)
+        event_loop.add_event(0.01, results.append, 1)
+        event_loop.add_event(0.03, done.set)
+
+        # when
+        event_loop.run()
+        done.wait(1)
+        event_loop.stop()
+
+        # then
+        assert results == [1, 2]
+
+    def test_event_cancel(self):
+        # given
+        event_loop = EventLoop()
+        results = []
+        done = threading.Event()
+        event_loop.run()
+        event = event_loop.add_event(0.01, results.append, 1)
+        event_loop.add_event(0.02, done.set)
+
+        # when
+        event.cancel()
+        done.wait(1)
+        event_loop.stop()
+
+        # then
+        assert results == []
+
+    def test_periodic_event(self):
+        # given
+        event_loop = EventLoop()
+        results = []
+        event_loop.run()
+
+        # when
+        event = event_loop.add_periodic_event(0.01, results.append, 1)
+        time.sleep(0.1)
+        event.cancel()
+        count = len(results)
+        time.sleep(0.05)
+        event_loop.stop()
+
+        # then
+        assert count > 1
+        assert len(results) == count
+
+    def test_single_dispatcher_thread(self):
+        # given
+        event_loop = EventLoop()
+        event_loop.run()
+        thread_count = threading.active_count()
+
+        # when
+        for _ in range(100):
+            event_loop.add_event(0.05, lambda: None)
+
+        # then
+        assert threading.active_count() == thread_count
+        event_loop.stop()
@@ -1,10 +1,39 @@
+import os
+import socket
+import struct
+import threading
+
 import pytest
+from mock import patch
 
 from core.emulator.emudata import InterfaceData, NodeOptions
+from core.emulator.enumerations import NetworkPolicy
 from core.emulator.session import Session
-from core.errors import CoreError
+from core.errors import CoreCommandError, CoreError
 from core.nodes.base import CoreNode
-from core.nodes.network import HubNode, SwitchNode, WlanNode
+from core.nodes.client import (
+    VNODE_INT32,
+    VNODE_MSG_CMDREQ,
+    VNODE_MSG_CMDREQACK,
+    VNODE_MSG_CMDSTATUS,
+    VNODE_MSGSIZMAX,
+    VNODE_TLV_CMDARG,
+    VNODE_TLV_CMDID,
+    VNODE_TLV_CMDPID,
+    VNODE_TLV_CMDSTATUS,
+    VnodeChannel,
+    VnodeClient,
+    pack_message,
+    unpack_message,
+)
+from core.nodes.netclient import LinuxNetClient
+from core.nodes.network import (
+    EbtablesQueue,
+    HubNode,
+    NftablesQueue,
+    SwitchNode,
+    WlanNode,
+)
 
 MODELS = ["router", "host", "PC", "mdr"]
 NET_TYPES = [SwitchNode, HubNode, WlanNode]
@@ -115,3 +144,380 @@ class TestNodes:
         # then
         assert node
         assert node.up
+
+
+class TestNetClient:
+    def test_batch(self):
+        # given
+        commands = []
+        net_client = LinuxNetClient(lambda args, **kwargs: commands.append(args))
+
+        # when
+        with net_client.batch():
+            net_client.device_name("veth0", "eth0")
+            net_client.device_up("eth0")
+
+        # then
+        assert len(commands) == 1
+        assert "-batch" in commands[0]
+        assert "link set veth0 name eth0\nlink set eth0 up" in commands[0]
+
+    def test_batch_flush_ordering(self):
+        # given
+        commands = []
+        net_client = LinuxNetClient(lambda args, **kwargs: commands.append(args))
+
+        # when
+        with net_client.batch():
+            net_client.device_up("eth0")
+            net_client.checksums_off("eth0")
+            net_client.device_down("eth0")
+
+        # then
+        assert len(commands) == 3
+        assert commands[0].endswith("link set eth0 up")
+        assert "-K eth0" in commands[1]
+        assert commands[2].endswith("link set eth0 down")
+
+    def test_batch_error(self):
+        # given
+        def run(args, **kwargs):
+            stderr = 'Device "eth1" does not exist.\nCommand failed -:2'
+            raise CoreCommandError(1, args, "", stderr)
+
+        net_client = LinuxNetClient(run)
+
+        # when
+        with pytest.raises(CoreCommandError) as e:
+            with net_client.batch():
+                net_client.device_up("eth0")
+                net_client.device_up("eth1")
+
+        # then
+        assert e.value.cmd.endswith("link set eth1 up")
+        assert e.value.stderr == 'Device "eth1" does not exist.'
+
+    def test_batch_body_error(self):
+        # given
+        commands = []
+
+        def run(args, **kwargs):
+            commands.append(args)
+            raise CoreCommandError(1, args, "", 'Cannot find device "eth0"')
+
+        net_client = LinuxNetClient(run)
+
+        # when
+        with pytest.raises(CoreError) as e:
+            with net_client.batch():
+                net_client.device_up("eth0")
+                raise CoreError("failed")
+
+        # then
+        assert str(e.value) == "failed"
+        assert not commands
+        assert getattr(net_client._batch, "commands", None) is None
+
+
+class FakeVnoded:
+    """
+    Serves the vnoded side of a control channel over a socket pair.
+    """
+
+    def __init__(self):
+        self.sock, peer = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        self.channel = VnodeChannel("fake")
+        self.channel.start(peer)
+
+    def receive(self):
+        data, ancdata, _, _ = self.sock.recvmsg(
+            VNODE_MSGSIZMAX, socket.CMSG_SPACE(3 * VNODE_INT32.size)
+        )
+        msg_type, tlvs = unpack_message(data)
+        assert msg_type == VNODE_MSG_CMDREQ
+        cmdid = VNODE_INT32.unpack(tlvs[0][1])[0]
+        assert tlvs[0][0] == VNODE_TLV_CMDID
+        argv = [y[:-1].decode() for x, y in tlvs if x == VNODE_TLV_CMDARG]
+        fds = struct.unpack("3i", ancdata[0][2])
+        return cmdid, argv, fds
+
+    def send(self, msg_type, cmdid, tlv_type, value):
+        tlvs = [
+            (VNODE_TLV_CMDID, VNODE_INT32.pack(cmdid)),
+            (tlv_type, VNODE_INT32.pack(value)),
+        ]
+        self.sock.send(pack_message(msg_type, tlvs))
+
+    def finish(self, cmdid, fds, stdout, status):
+        self.send(VNODE_MSG_CMDREQACK, cmdid, VNODE_TLV_CMDPID, 100)
+        os.write(fds[1], stdout.encode())
+        for fd in fds:
+            os.close(fd)
+        self.send(VNODE_MSG_CMDSTATUS, cmdid, VNODE_TLV_CMDSTATUS, status)
+
+
+def run_thread(channel, argv):
+    results = []
+    thread = threading.Thread(target=lambda: results.append(channel.run(argv)))
+    thread.start()
+    return thread, results
+
+
+class TestVnodeChannel:
+    def test_run(self):
+        # given
+        vnoded = FakeVnoded()
+
+        # when
+        thread, results = run_thread(vnoded.channel, ["echo", "hello world"])
+        cmdid, argv, fds = vnoded.receive()
+        vnoded.finish(cmdid, fds, "hello world\n", 2 << 8)
+        thread.join(5)
+
+        # then
+        assert argv == ["echo", "hello world"]
+        assert results == [(2, "hello world", "")]
+        assert not vnoded.channel.pending
+
+    def test_run_out_of_order(self):
+        # given
+        vnoded = FakeVnoded()
+        first, first_results = run_thread(vnoded.channel, ["sleep", "10"])
+        first_request = vnoded.receive()
+        second, second_results = run_thread(vnoded.channel, ["true"])
+        second_request = vnoded.receive()
+
+        # when
+        vnoded.finish(*second_request[::2], "", 0)
+        second.join(5)
+
+        # then
+        assert second_results == [(0, "", "")]
+        assert first.is_alive()
+        vnoded.finish(*first_request[::2], "", 0)
+        first.join(5)
+        assert first_results == [(0, "", "")]
+
+    def test_run_no_wait(self):
+        # given
+        vnoded = FakeVnoded()
+
+        # when
+        result = vnoded.channel.run(["sleep", "10"], wait=False)
+        _, argv, fds = vnoded.receive()
+
+        # then
+        assert result == (0, "", "")
+        assert argv == ["sleep", "10"]
+        assert not vnoded.channel.pending
+        for fd in fds:
+            assert os.path.samefile(f"/proc/self/fd/{fd}", os.devnull)
+            os.close(fd)
+
+    def test_run_closed(self):
+        # given
+        vnoded = FakeVnoded()
+        thread, results = run_thread(vnoded.channel, ["sleep", "10"])
+        _, _, fds = vnoded.receive()
+
+        # when
+        for fd in fds:
+            os.close(fd)
+        vnoded.sock.close()
+        thread.join(5)
+
+        # then
+        assert results == [(1, "", "")]
+        assert not vnoded.channel.connected()
+        with pytest.raises(OSError):
+            vnoded.channel.run(["true"])
+
+
+class TestVnodeClient:
+    def test_channel_fallback(self):
+        # given
+        client = VnodeClient("node", "/nonexistent/ctrl")
+
+        # when
+        with patch("core.nodes.client.utils.cmd") as cmd:
+            client.check_cmd("echo hello")
+
+        # then
+        cmd.assert_called_once_with(
+            client.create_cmd("echo hello"), wait=True, shell=False
+        )
+        with patch.object(VnodeChannel, "connect"):
+            assert client.get_channel() is not None
+
+
+class FakeInterface:
+    def __init__(self, localname):
+        self.localname = localname
+
+
+class FakeWlan:
+    def __init__(self, commands, failures=0):
+        self.session = None
+        self.name = "wlan"
+        self.brname = "b.1.1"
+        self.policy = NetworkPolicy.DROP
+        self.has_ebtables_chain = False
+        self._linked = {}
+        self._linked_lock = threading.Lock()
+        self.commands = commands
+        self.failures = failures
+
+    def host_cmd(self, args, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise CoreCommandError(1, args, "", "failed")
+        self.commands.append(args)
+
+
+class TestEbtablesQueue:
+
+    def test_buildcmds(self):
+        # given
+        commands = []
+        queue = EbtablesQueue()
+        wlan = FakeWlan(commands)
+        netif1 = FakeInterface("veth1")
+        netif2 = FakeInterface("veth2")
+        netif3 = FakeInterface("veth3")
+        wlan._linked[netif1] = {netif2: True, netif3: False}
+        queue.buildcmds(wlan)
+
+        # when
+        wlan._linked[netif1] = {netif2: False, netif3: True}
+        queue.cmds = []
+        queue.buildcmds(wlan)
+
+        # then
+        assert queue.cmds == [
+            "-D b.1.1 -i veth1 -o veth2 -j ACCEPT",
+            "-D b.1.1 -o veth1 -i veth2 -j ACCEPT",
+            "-A b.1.1 -i veth1 -o veth3 -j ACCEPT",
+            "-A b.1.1 -o veth1 -i veth3 -j ACCEPT",
+        ]
+
+    def test_ebcommit(self):
+        # given
+        commands = []
+        queue = EbtablesQueue()
+        wlan = FakeWlan(commands)
+        queue.buildcmds(wlan)
+
+        # when
+        queue.ebcommit(wlan)
+
+        # then
+        assert len(commands) == 1
+        assert "--atomic-save" in commands[0]
+        assert "--atomic-commit" in commands[0]
+        assert not queue.cmds
+
+    def test_failed_commit_retried(self):
+        # given
+        commands = []
+        queue = EbtablesQueue()
+        queue.rate = 0.0
+        wlan = FakeWlan(commands, failures=1)
+        wlan.has_ebtables_chain = True
+        queue.rules[wlan] = set()
+        queue.last_update_time[wlan] = 0.0
+        netif1 = FakeInterface("veth1")
+        netif2 = FakeInterface("veth2")
+        wlan._linked[netif1] = {netif2: True}
+        queue.ebchange(wlan)
+
+        # when
+        queue.processupdates()
+        failed = list(queue.updates)
+        queue.processupdates()
+
+        # then
+        assert failed == [wlan]
+        assert not queue.updates
+        assert "-F b.1.1" in commands[-1]
+        assert "-A b.1.1 -i veth1 -o veth2 -j ACCEPT" in commands[-1]
+
+
+class TestNftablesQueue:
+    def test_buildcmds(self):
+        # given
+        commands = []
+        queue = NftablesQueue()
+        wlan = FakeWlan(commands)
+        netif1 = FakeInterface("veth1")
+        netif2 = FakeInterface("veth2")
+        wlan._linked[netif1] = {netif2: True}
+        queue.buildcmds(wlan)
+
+        # when
+        wlan._linked[netif1] = {netif2: False}
+        queue.cmds = []
+        queue.buildcmds(wlan)
+
+        # then
+        assert queue.cmds == [
+            'delete element bridge core_b_1_1 links { "veth1" . "veth2" }',
+            'delete element bridge core_b_1_1 links { "veth2" . "veth1" }',
+        ]
+
+    def test_ebcommit(self):
+        # given
+        commands = []
+        queue = NftablesQueue()
+        wlan = FakeWlan(commands)
+        queue.buildcmds(wlan)
+
+        # when
+        queue.ebcommit(wlan)
+
+        # then
+        assert len(commands) == 1
+        assert "-f -" in commands[0]
+        assert "add table bridge core_b_1_1\n" in commands[0]
+
+    def test_failed_commit_retried(self):
+        # given
+        commands = []
+        queue = NftablesQueue()
+        queue.rate = 0.0
+        wlan = FakeWlan(commands, failures=1)
+        wlan.has_ebtables_chain = True
+        queue.rules[wlan] = set()
+        queue.last_update_time[wlan] = 0.0
+        netif1 = FakeInterface("veth1")
+        netif2 = FakeInterface("veth2")
+        wlan._linked[netif1] = {netif2: True}
+        queue.ebchange(wlan)
+
+        # when
+        queue.processupdates()
+        failed = list(queue.updates)
+        queue.processupdates()
+
+        # then
+        assert failed == [wlan]
+        assert not queue.updates
+        assert len(commands) == 1
+        assert "flush set bridge core_b_1_1 links\n" in commands[0]
+        assert '"veth1" . "veth2"' in commands[0]
+
+    def test_commit_unlocked(self):
+        # given
+        queue = NftablesQueue()
+        queue.rate = 0.0
+        locked = []
+        wlan = FakeWlan([])
+        wlan.host_cmd = lambda args, **kwargs: locked.append(queue.updatelock.locked())
+        queue.last_update_time[wlan] = 0.0
+        queue.ebchange(wlan)
+
+        # when
+        queue.processupdates()
+
+        # then
+        assert locked == [False]
+        assert not queue.updates
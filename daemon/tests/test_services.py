@@ -1,12 +1,19 @@
 import os
 
 import pytest
-from mock import MagicMock
+from mock import MagicMock, patch
 
 from core.emulator.session import Session
+from core.emulator.validator import device_ready, port_listening
 from core.errors import CoreCommandError
 from core.nodes.base import CoreNode
-from core.services.coreservices import CoreService, ServiceDependencies, ServiceManager
+from core.services.coreservices import (
+    CoreService,
+    ServiceBootError,
+    ServiceDependencies,
+    ServiceManager,
+    ServiceMode,
+)
 
 _PATH = os.path.abspath(os.path.dirname(__file__))
 _SERVICES_PATH = os.path.join(_PATH, "myservices")
@@ -35,6 +42,14 @@ class ServiceD(CoreService):
     dependencies = ()
 
 
+class ServiceReady(CoreService):
+    name = "Ready"
+    validation_mode = ServiceMode.BLOCKING
+    validation_timer = 0
+    validation_period = 0
+    validation_ports = (2601,)
+
+
 class ServiceBadDependency(CoreService):
     name = "E"
     dependencies = ("Z",)
@@ -287,3 +302,89 @@ class TestServices:
         # when, then
         with pytest.raises(ValueError):
             ServiceDependencies(services).boot_paths()
+
+
+class TestServiceValidator:
+    def test_port_listening(self):
+        # given
+        data = (
+            "  sl  local_address rem_address   st\n"
+            "   0: 00000000:0A1A 00000000:0000 0A\n"
+            "   1: 00000000:0050 00000000:0000 01\n"
+        )
+
+        # then
+        assert port_listening(data, 2586)
+        assert not port_listening(data, 80)
+        assert port_listening(data, 80, tcp=False)
+
+    def test_device_ready(self):
+        # given
+        node = MagicMock(pid=os.getpid(), server=None)
+
+        # then
+        assert device_ready(node, "lo")
+        assert not device_ready(node, "missing0")
+
+    def test_boot_service_ready(self, session: Session):
+        # given
+        node = session.add_node(CoreNode)
+
+        # when
+        with patch("core.emulator.validator.port_ready", return_value=False):
+            future = session.services.boot_service(node, ServiceReady)
+
+        # then
+        with pytest.raises(ServiceBootError):
+            future.result(timeout=5)
+
+    def test_routing_services_ready(self):
+        # given
+        names = ["zebra", "OSPFv2", "OSPFv3", "FRRzebra", "FRROSPFv2", "FRROSPFv3"]
+
+        # then
+        for name in names:
+            assert ServiceManager.get(name).validation_ports
+
+    def test_validate(self, session: Session):
+        # given
+        attempts = []
+
+        def check():
+            attempts.append(True)
+            return len(attempts) == 3
+
+        # when
+        future = session.validator.validate([check], 5, 0.01)
+
+        # then
+        assert future.result(timeout=5)
+        assert len(attempts) == 3
+
+    def test_validate_timeout(self, session: Session):
+        # given
+        error = CoreCommandError(1, "validate")
+
+        # when
+        future = session.validator.validate([lambda: False], 0, 0.01, error)
+
+        # then
+        with pytest.raises(CoreCommandError):
+            future.result(timeout=5)
+
+    def test_run_steps(self, session: Session):
+        # given
+        results = []
+
+        def step(value):
+            results.append(value)
+            return session.validator.timer(0.01)
+
+        steps = [lambda x=x: step(x) for x in range(3)]
+
+        # when
+        future = session.validator.run_steps(steps)
+
+        # then
+        future.result(timeout=5)
+        assert results == [0, 1, 2]